@@ -0,0 +1,100 @@
+"""
+Benchmark chat history persistence: one commit per request versus the
+batched write-behind ChatWriter.
+
+Both variants write to a fresh SQLite file with the application's pragmas.
+The inline variant reproduces the old handler, which committed on the
+event loop for every message.
+
+Usage:
+    python -m benchmarks.bench_chat_writes [--records 5000] [--concurrency 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.config import Base, configure_sqlite
+from src.models.chat import Chat
+from src.services.chat_writer import ChatWriter
+
+
+def make_session_factory(path: str) -> sessionmaker:
+    """Create an empty chat database at path."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", configure_sqlite)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+async def run_clients(records: int, concurrency: int, save) -> float:
+    """Persist records from concurrent clients and return the elapsed seconds."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def client(i: int) -> None:
+        async with semaphore:
+            await save(f"message {i}", f"response {i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(records)))
+    return time.perf_counter() - started
+
+
+async def bench_inline(session_factory: sessionmaker, records: int, concurrency: int) -> float:
+    """Commit every record on the event loop, like the old handler."""
+    async def save(user_message: str, bot_response: str) -> None:
+        db = session_factory()
+        try:
+            db.add(Chat(user_message=user_message, bot_response=bot_response))
+            db.commit()
+        finally:
+            db.close()
+
+    return await run_clients(records, concurrency, save)
+
+
+async def bench_write_behind(
+    session_factory: sessionmaker,
+    records: int,
+    concurrency: int,
+    durability: str
+) -> float:
+    """Queue records on a ChatWriter and include the final drain."""
+    writer = ChatWriter(session_factory, durability=durability)
+    writer.start()
+    started = time.perf_counter()
+    await run_clients(records, concurrency, writer.submit)
+    await writer.stop()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {"records": args.records, "concurrency": args.concurrency}
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = {
+            "inline": lambda f: bench_inline(f, args.records, args.concurrency),
+            "buffered": lambda f: bench_write_behind(f, args.records, args.concurrency, "buffered"),
+            "committed": lambda f: bench_write_behind(f, args.records, args.concurrency, "committed"),
+        }
+        for name, bench in variants.items():
+            session_factory = make_session_factory(os.path.join(tmp, f"{name}.db"))
+            seconds = asyncio.run(bench(session_factory))
+            results[f"{name}_records_per_second"] = args.records / seconds
+
+    results["speedup"] = results["buffered_records_per_second"] / results["inline_records_per_second"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
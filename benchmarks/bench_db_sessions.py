@@ -0,0 +1,136 @@
+"""
+Benchmark sync versus async database sessions under concurrent load.
+
+Each simulated request reads the 20 most recent chats and inserts one,
+as a history-aware chat handler would. The sync variant uses a Session on
+the event loop, like the original handlers; the async variant uses an
+AsyncSession on aiosqlite. Alongside throughput and latency the benchmark
+reports the worst event-loop stall, which is what other requests on the
+same worker experience.
+
+Usage:
+    python -m benchmarks.bench_db_sessions [--requests 2000] [--concurrency 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from src.database.config import (
+    Base,
+    commit,
+    create_async_db_engine,
+    create_db_engine,
+    execute,
+    to_async_url
+)
+from src.models.chat import Chat
+
+RECENT = select(Chat).order_by(Chat.timestamp.desc()).limit(20)
+
+
+async def handle(db, i: int) -> None:
+    """One request: read recent history, then store a new turn."""
+    (await execute(db, RECENT)).scalars().all()
+    db.add(Chat(user_message=f"message {i}", bot_response=f"response {i}"))
+    await commit(db)
+
+
+async def monitor_loop(stalls: List[float], stop: asyncio.Event, interval: float = 0.005) -> None:
+    """Record how late the event loop wakes up from short sleeps."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+
+async def run_load(open_session, requests: int, concurrency: int) -> Dict[str, float]:
+    """Run requests with bounded concurrency and summarize latencies."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    stalls: List[float] = []
+    stop = asyncio.Event()
+
+    async def request(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await open_session(i)
+            latencies.append(time.perf_counter() - started)
+
+    monitor = asyncio.create_task(monitor_loop(stalls, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    latencies.sort()
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "max_loop_stall_ms": max(stalls, default=0.0) * 1000
+    }
+
+
+async def bench_sync(url: str, requests: int, concurrency: int) -> Dict[str, float]:
+    """Serve requests with blocking Sessions on the event loop."""
+    engine = create_db_engine(url)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+
+    async def open_session(i: int) -> None:
+        db = factory()
+        try:
+            await handle(db, i)
+        finally:
+            db.close()
+
+    try:
+        return await run_load(open_session, requests, concurrency)
+    finally:
+        engine.dispose()
+
+
+async def bench_async(url: str, requests: int, concurrency: int) -> Dict[str, float]:
+    """Serve requests with AsyncSessions on the aiosqlite driver."""
+    engine = create_async_db_engine(to_async_url(url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def open_session(i: int) -> None:
+        async with factory() as db:
+            await handle(db, i)
+
+    try:
+        return await run_load(open_session, requests, concurrency)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    results = {"requests": args.requests, "concurrency": args.concurrency}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, bench in (("sync", bench_sync), ("async", bench_async)):
+            url = f"sqlite:///{os.path.join(tmp, f'{name}.db')}"
+            results[name] = asyncio.run(bench(url, args.requests, args.concurrency))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark chat history search: LIKE scans versus the chats_fts index as
+the history grows.
+
+Each size gets a fresh SQLite database filled with synthetic turns built
+from a Zipf-like vocabulary, so some words are common and most are rare.
+Queries of both kinds are timed against the same data.
+
+Usage:
+    python -m benchmarks.bench_history_search [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src.database.config import Base, create_db_engine
+from src.database.migrations import migrate
+from src.services.history_service import search_history
+
+VOCABULARY = [f"term{i}" for i in range(20000)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def populate(engine, rows: int, seed: int) -> None:
+    """Insert synthetic turns through the normal triggers."""
+    rng = random.Random(seed)
+    started = datetime(2024, 1, 1)
+    batch = []
+    with engine.begin() as conn:
+        for i in range(rows):
+            words = rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=24)
+            batch.append({
+                "session_id": f"session{i // 20}",
+                "user_message": " ".join(words[:8]),
+                "bot_response": " ".join(words[8:]),
+                "timestamp": started + timedelta(seconds=i)
+            })
+            if len(batch) == 10000:
+                conn.execute(text(
+                    "INSERT INTO chats (session_id, user_message, bot_response, timestamp) "
+                    "VALUES (:session_id, :user_message, :bot_response, :timestamp)"
+                ), batch)
+                batch = []
+        if batch:
+            conn.execute(text(
+                "INSERT INTO chats (session_id, user_message, bot_response, timestamp) "
+                "VALUES (:session_id, :user_message, :bot_response, :timestamp)"
+            ), batch)
+
+
+def time_ms(fn, repeat: int) -> float:
+    """Median wall time of fn in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_size(path: str, rows: int, seed: int, repeat: int) -> Dict[str, float]:
+    """Build a database of rows turns and time rare and common term queries."""
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    populate(engine, rows, seed)
+    db = sessionmaker(bind=engine)()
+
+    def like(term: str) -> List:
+        pattern = f"%{term}%"
+        return db.execute(text(
+            "SELECT id FROM chats WHERE user_message LIKE :p OR bot_response LIKE :p LIMIT 20"
+        ), {"p": pattern}).all()
+
+    def fts(term: str) -> List:
+        return asyncio.run(search_history(db, term, limit=20))[0]
+
+    # term15000 is rare (a handful of rows per 100k); term5 appears in
+    # many rows, so its cost grows with the number of matches.
+    results = {"rows": rows}
+    for label, term in (("rare", "term15000"), ("common", "term5")):
+        results[f"like_{label}_ms"] = time_ms(lambda: like(term), repeat)
+        results[f"fts_{label}_ms"] = time_ms(lambda: fts(term), repeat)
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            bench_size(os.path.join(tmp, f"history{rows}.db"), rows, args.seed, args.repeat)
+            for rows in args.sizes
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
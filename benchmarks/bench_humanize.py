@@ -0,0 +1,95 @@
+"""
+Microbenchmark the phrase rewriting stage of humanize_response: the previous
+inline chain of str.replace passes versus PhraseReplacer, which keeps the
+same chain behind a configurable table and must not be slower.
+
+Pass --phrases to pad the default table with synthetic phrases and see how
+both scale with table size, and --sparse to use snippets without formal
+phrases except one, like typical search results.
+
+Usage:
+    python -m benchmarks.bench_humanize [--snippets 30] [--phrases 10] [--iterations 2000]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Dict
+
+from src.services.nlp_service import DEFAULT_HUMANIZE_PHRASES, PhraseReplacer
+
+SNIPPET_WORDS = (
+    "python is a programming language that lets you work quickly and integrate "
+    "systems more effectively additionally it is popular furthermore the community "
+    "is large however some find it slow therefore performance matters thus caching "
+    "helps in addition profiling is useful in conclusion measure first enthusiasm"
+).split()
+
+
+def legacy_replace(text: str, phrases: Dict[str, str]) -> str:
+    """The previous replacement loop from humanize_response."""
+    result = text
+    for formal, casual in phrases.items():
+        result = result.replace(formal.lower(), casual)
+    return result
+
+
+def build_phrases(size: int, seed: int) -> Dict[str, str]:
+    """Default phrase table padded with random words up to size entries."""
+    rng = random.Random(seed)
+    phrases = dict(DEFAULT_HUMANIZE_PHRASES)
+    while len(phrases) < size:
+        word = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(5, 12)))
+        phrases[word] = "x"
+    return phrases
+
+
+def build_blob(snippets: int, seed: int, sparse: bool = False) -> str:
+    """
+    Join search-snippet-sized sentences into one lowercase blob. A sparse
+    blob leaves out the phrase words and ends with a single phrase.
+    """
+    rng = random.Random(seed)
+    words = SNIPPET_WORDS
+    if sparse:
+        phrase_words = {word for phrase in DEFAULT_HUMANIZE_PHRASES for word in phrase.split()}
+        words = [word for word in SNIPPET_WORDS if word not in phrase_words]
+    blob = " ".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(20, 40))) + "."
+        for _ in range(snippets)
+    ).lower()
+    return f"{blob} however." if sparse else blob
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--snippets", type=int, default=30)
+    parser.add_argument("--phrases", type=int, default=len(DEFAULT_HUMANIZE_PHRASES))
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sparse", action="store_true")
+    args = parser.parse_args()
+
+    blob = build_blob(args.snippets, args.seed, args.sparse)
+    phrases = build_phrases(args.phrases, args.seed)
+    timings = {}
+    for name, replace in (
+        ("legacy", lambda text: legacy_replace(text, phrases)),
+        ("replacer", PhraseReplacer(phrases).replace)
+    ):
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            replace(blob)
+        timings[name] = (time.perf_counter() - started) / args.iterations * 1e6
+
+    print(json.dumps({
+        "blob_chars": len(blob),
+        "phrases": len(phrases),
+        "legacy_us": timings["legacy"],
+        "replacer_us": timings["replacer"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark keyword extraction: per-call TfidfVectorizer refit versus the
+pre-fitted KeywordModel.
+
+Usage:
+    python -m benchmarks.bench_keywords [--texts 2000] [--top-n 5]
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Callable, List
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.services.keyword_model import KeywordModel
+
+WORDS = (
+    "python java rust programming language machine learning neural network data "
+    "science model training inference cloud server database query index search "
+    "engine cache memory latency throughput request response api client user "
+    "message history weather climate energy solar battery car city travel food "
+    "recipe health sleep exercise music film book history science space planet"
+).split()
+FILLER = "the a is of and to in for on with what how why does can you tell me about".split()
+
+
+def build_corpus(size: int, seed: int) -> List[str]:
+    """Generate chat-like messages mixing topic words and filler words."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        length = rng.randint(6, 40)
+        corpus.append(" ".join(
+            rng.choice(WORDS) if rng.random() < 0.5 else rng.choice(FILLER)
+            for _ in range(length)
+        ))
+    return corpus
+
+
+def legacy_extract(vectorizer: TfidfVectorizer, text: str, top_n: int) -> List[str]:
+    """The previous NLPProcessor.extract_keywords implementation."""
+    tfidf_matrix = vectorizer.fit_transform([text])
+    feature_names = vectorizer.get_feature_names_out()
+    dense = tfidf_matrix.todense()
+    scores = [(score, term) for term, score in zip(feature_names, dense[0].tolist()[0])]
+    return [term for score, term in sorted(scores, reverse=True)[:top_n]]
+
+
+def measure(extract: Callable[[str], List[str]], texts: List[str]) -> dict:
+    """Time extract over all texts."""
+    started = time.perf_counter()
+    for text in texts:
+        extract(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": elapsed,
+        "us_per_call": elapsed / len(texts) * 1e6,
+        "calls_per_second": len(texts) / elapsed
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.texts * 5, args.seed)
+    texts = corpus[:args.texts]
+    model = KeywordModel.fit(corpus)
+    vectorizer = TfidfVectorizer()
+
+    legacy = measure(lambda t: legacy_extract(vectorizer, t, args.top_n), texts)
+    fitted = measure(lambda t: model.extract(t, args.top_n), texts)
+    print(json.dumps({
+        "texts": len(texts),
+        "legacy_refit": legacy,
+        "prefitted_model": fitted,
+        "speedup": legacy["seconds"] / fitted["seconds"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Load test the running application against a stub search server.
+
+Starts the stub search server in-process, launches the app with uvicorn in
+a subprocess pointed at the stub, replays a seeded mix of chat, search and
+NLP requests at a fixed concurrency and reports throughput, latency
+percentiles per request kind and the server's memory use.
+
+Usage:
+    python -m benchmarks.bench_load [--requests 2000] [--concurrency 32]
+        [--mix chat=6,search=3,analyze=1] [--latency 0.05] [--failure-rate 0.05]
+        [--workers 4] [--output results.json] [--baseline baseline.json]
+
+With --workers the app runs under the pre-fork launcher (src.serve) and
+memory is reported for the whole process tree.
+
+Compare runs only against baselines taken on the same machine with the
+same options; the exit status is 1 if any metric regressed by more than
+--tolerance.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.bench_query_cache import build_query_log
+from benchmarks.report import environment, finish, summarize
+from benchmarks.stub_search import StubSearchServer, serve_in_thread, stub_environment
+
+FOLLOW_UPS = ["and why?", "how so?", "tell me more", "any examples?"]
+
+ENDPOINTS = {
+    "chat": "/chat/chat",
+    "search": "/search/search",
+    "analyze": "/nlp/analyze",
+}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "chat=6,search=3" into request kind weights."""
+    weights = {}
+    for part in mix.split(","):
+        kind, weight = part.split("=")
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown request kind: {kind}")
+        weights[kind] = float(weight)
+    return weights
+
+
+def build_workload(size: int, mix: Dict[str, float], follow_up_rate: float, seed: int) -> List[Tuple[str, Dict]]:
+    """
+    Generate (kind, JSON body) requests with Zipf-distributed topics.
+
+    Chat requests marked as follow-ups are sent in the session of the
+    worker's previous chat turn.
+    """
+    rng = random.Random(seed)
+    queries = build_query_log(size, seed)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=size)
+    workload = []
+    for kind, query in zip(kinds, queries):
+        if kind == "chat":
+            follow_up = rng.random() < follow_up_rate
+            workload.append((kind, {"message": rng.choice(FOLLOW_UPS) if follow_up else query, "follow_up": follow_up}))
+        elif kind == "search":
+            workload.append((kind, {"query": query, "num_results": 3}))
+        else:
+            workload.append((kind, {"text": query}))
+    return workload
+
+
+async def run_load(base_url: str, workload: List[Tuple[str, Dict]], concurrency: int) -> Dict:
+    """Send the workload from concurrency workers and collect latencies."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    position = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal position
+        session_id: Optional[str] = None
+        while position < len(workload):
+            kind, body = workload[position]
+            position += 1
+            if kind == "chat":
+                body = {"message": body["message"], "session_id": session_id if body["follow_up"] else None}
+            started = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINTS[kind], json=body)
+                status = str(response.status_code)
+                if kind == "chat" and response.status_code == 200:
+                    session_id = response.json().get("session_id")
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[kind].append(time.perf_counter() - started)
+            statuses[kind][status] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    succeeded = sum(counts.get("200", 0) for counts in statuses.values())
+    return {
+        "seconds": elapsed,
+        "throughput_per_second": len(all_latencies) / elapsed,
+        "successful_per_second": succeeded / elapsed,
+        "latency": dict(
+            {"all": summarize(all_latencies)},
+            **{kind: summarize(values) for kind, values in latencies.items()}
+        ),
+        "statuses": {kind: dict(counts) for kind, counts in statuses.items()}
+    }
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """Read current and peak resident memory of a process from /proc (Linux only)."""
+    memory = {}
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key = "rss_mb" if line.startswith("VmRSS") else "peak_rss_mb"
+                    memory[key] = int(line.split()[1]) / 1024
+        # Proportional set size splits shared pages between the processes
+        # sharing them, so it shows what copy-on-write sharing saves.
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    memory["pss_mb"] = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return memory
+
+
+def process_tree(pid: int) -> List[int]:
+    """Return pid and all its descendants (Linux only)."""
+    pids = [pid]
+    for parent in pids:
+        try:
+            with open(f"/proc/{parent}/task/{parent}/children", encoding="utf-8") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+
+def tree_memory(pid: int) -> Dict[str, float]:
+    """Sum the memory of a process and its descendants."""
+    total: Dict[str, float] = defaultdict(float)
+    pids = process_tree(pid)
+    for member in pids:
+        for key, value in process_memory(member).items():
+            total[key] += value
+    total["processes"] = len(pids)
+    return dict(total)
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    """Poll /health until the app answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Application exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError("Application did not become ready")
+
+
+def server_command(port: int, workers: Optional[int]) -> List[str]:
+    """Command line starting the app with uvicorn, or the pre-fork launcher."""
+    if workers:
+        return [sys.executable, "-m", "src.serve", "--workers", str(workers),
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "src.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict:
+    """Start the stub and the app, replay the workload and collect results."""
+    stub = StubSearchServer(args.latency, args.jitter, args.failure_rate, args.seed)
+    stub_server = serve_in_thread(stub, args.stub_port)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update(stub_environment(f"http://127.0.0.1:{args.stub_port}"))
+        env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        env.setdefault("RATE_LIMIT_ENABLED", "0")
+        if args.workers:
+            env.setdefault("SEARCH_DISK_CACHE_PATH", os.path.join(tmp, "search_cache.db"))
+        subprocess.run([sys.executable, "-m", "src.init_db"], env=env, check=True)
+        server = subprocess.Popen(server_command(args.port, args.workers), env=env)
+        try:
+            wait_until_ready(base_url, server)
+            idle_memory = tree_memory(server.pid)
+            workload = build_workload(args.requests, parse_mix(args.mix), args.follow_up_rate, args.seed)
+            load = asyncio.run(run_load(base_url, workload, args.concurrency))
+            memory = tree_memory(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+            stub_server.should_exit = True
+
+    return {
+        **load,
+        "server_memory": {"idle": idle_memory, "after_load": memory},
+        "stub": stub.stats()
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options shared with bench_scaling."""
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default="chat=6,search=3,analyze=1")
+    parser.add_argument("--follow-up-rate", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub upstream latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stub-port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=7)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--workers", type=int, help="run under src.serve with this many workers")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = {
+        "options": vars(args),
+        "environment": environment(),
+        **run_benchmark(args)
+    }
+    return finish(results, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Microbenchmarks for NLPProcessor methods, SearchService caching and
+ResponseGenerator, with upstream search answered by an in-process stub.
+
+NLP-dependent sections are skipped, and say so in the results, when the
+NLTK resources are not installed.
+
+Usage:
+    python -m benchmarks.bench_micro [--texts 500] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+import httpx
+
+from benchmarks.bench_keywords import build_corpus
+from benchmarks.bench_query_cache import build_query_log
+from benchmarks.report import environment, finish, summarize
+from benchmarks.stub_search import StubSearchServer, stub_environment
+from src.services.cache import SearchCache
+from src.services.nlp_executor import NLPExecutor
+from src.services.nlp_service import NLPProcessor, verify_nltk_resources
+from src.services.query_normalizer import QueryNormalizer
+from src.services.response_service import ResponseGenerator
+from src.services.search_service import SearchService
+
+NLP_METHODS = ("tokenize_text", "extract_keywords", "get_context", "format_search_query", "humanize_response")
+
+
+def time_calls(func: Callable, inputs: List) -> List[float]:
+    """Call func on each input and return the per-call durations."""
+    durations = []
+    for value in inputs:
+        started = time.perf_counter()
+        func(value)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def bench_nlp(texts: List[str]) -> Dict:
+    """Time each NLPProcessor method on distinct texts, then on repeats."""
+    results = {}
+    for method in NLP_METHODS:
+        processor = NLPProcessor()
+        processor.warm_up()
+        func = getattr(processor, method)
+        cold = time_calls(func, texts)
+        warm = time_calls(func, texts)
+        results[method] = {
+            "cold": summarize(cold, "us"),
+            "repeat": summarize(warm, "us"),
+            "cold_calls_per_second": len(cold) / sum(cold)
+        }
+    return results
+
+
+def stub_search_service(stub: StubSearchServer) -> SearchService:
+    """SearchService whose providers are served by stub through an in-process transport."""
+    os.environ.update(stub_environment("http://stub"))
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub))
+    return SearchService(
+        http_client=client,
+        cache=SearchCache(max_entries=100000),
+        normalizer=QueryNormalizer("fold")
+    )
+
+
+async def bench_search_cache(queries: List[str]) -> Dict:
+    """
+    Time aggregate_search_results on cache misses and hits.
+
+    Keys are folded rather than lemmatized so that the numbers measure the
+    cache and the upstream round-trip, not NLP.
+    """
+    stub = StubSearchServer(latency=0)
+    service = stub_search_service(stub)
+    distinct = list(dict.fromkeys(queries))
+
+    async def timed(query_list: List[str]) -> List[float]:
+        durations = []
+        for query in query_list:
+            started = time.perf_counter()
+            await service.aggregate_search_results(query, num_results=3)
+            durations.append(time.perf_counter() - started)
+        return durations
+
+    misses = await timed(distinct)
+    hits = await timed(distinct)
+    upstream_before = stub.requests
+    replay = await timed(queries)
+    await service.http_client.aclose()
+    return {
+        "miss": summarize(misses, "us"),
+        "hit": summarize(hits, "us"),
+        "hit_calls_per_second": len(hits) / sum(hits),
+        "replay_hit_rate": 1 - (stub.requests - upstream_before) / len(queries)
+    }
+
+
+async def bench_response(queries: List[str]) -> Dict:
+    """Time ResponseGenerator.generate_response with inline NLP and a zero-latency stub."""
+    stub = StubSearchServer(latency=0)
+    service = stub_search_service(stub)
+    processor = NLPProcessor()
+    processor.warm_up()
+    generator = ResponseGenerator(processor, service, NLPExecutor(mode="inline"))
+    durations = []
+    for query in queries:
+        started = time.perf_counter()
+        await generator.generate_response(query)
+        durations.append(time.perf_counter() - started)
+    await service.http_client.aclose()
+    return {"generate_response": summarize(durations, "us")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    texts = build_corpus(args.texts, args.seed)
+    queries = build_query_log(args.texts, args.seed)
+    missing = verify_nltk_resources(os.getenv("NLTK_DATA_DIR"))
+    skipped = {"skipped": f"missing NLTK resources: {', '.join(missing)}"}
+
+    results = {
+        "options": vars(args),
+        "environment": environment(),
+        "nlp": skipped if missing else bench_nlp(texts),
+        "search_cache": asyncio.run(bench_search_cache(queries)),
+        "response": skipped if missing else asyncio.run(bench_response(queries))
+    }
+    return finish(results, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
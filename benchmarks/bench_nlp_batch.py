@@ -0,0 +1,63 @@
+"""
+Benchmark NLP throughput: one request per text versus the NDJSON batch endpoints.
+
+Requests go through the ASGI app in-process, so the single-text numbers
+exclude network overhead and understate the real gap.
+
+Usage:
+    python -m benchmarks.bench_nlp_batch [--endpoint search-query] [--texts 2000]
+"""
+
+import argparse
+import json
+import os
+import time
+
+# Thousands of requests from one client would otherwise be rate limited.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+# pylint: disable=wrong-import-position
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_keywords import build_corpus
+from src.main import app
+
+FIELDS = {
+    "analyze": "analysis",
+    "search-query": "search_query",
+    "humanize": "humanized_text",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint", choices=sorted(FIELDS), default="search-query")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    texts = build_corpus(args.texts, args.seed)
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        for text in texts:
+            client.post(f"/nlp/{args.endpoint}", json={"text": text}).raise_for_status()
+        single_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = client.post(f"/nlp/batch/{args.endpoint}", json={"texts": texts})
+        response.raise_for_status()
+        lines = response.text.splitlines()
+        batch_seconds = time.perf_counter() - started
+
+    assert len(lines) == len(texts), lines[-1]
+    print(json.dumps({
+        "endpoint": args.endpoint,
+        "texts": len(texts),
+        "single_texts_per_second": len(texts) / single_seconds,
+        "batch_texts_per_second": len(texts) / batch_seconds,
+        "speedup": single_seconds / batch_seconds
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark search cache hit rates under different cache-key normalization modes.
+
+Replays a synthetic query log in which popular topics are asked with varying
+case, word order and phrasing, and reports the cache hit rate for each mode.
+
+Usage:
+    python -m benchmarks.bench_query_cache [--queries 5000] [--seed 7]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Dict, List
+
+from src.services.cache import SearchCache
+from src.services.query_normalizer import QueryNormalizer, SimilarityIndex
+from src.services.search_providers import SearchResult
+from src.services.search_service import SearchService
+
+TOPICS = [
+    "python", "machine learning", "climate change", "black holes", "sourdough bread",
+    "electric cars", "the french revolution", "quantum computing", "photosynthesis",
+    "the stock market", "vaccines", "blockchain", "jazz music", "volcanoes",
+    "remote work", "solar panels", "the roman empire", "neural networks",
+    "marathon training", "coffee", "inflation", "dinosaurs", "meditation", "chess",
+]
+
+TEMPLATES = [
+    "What is {t}?",
+    "what is {t}",
+    "WHAT IS {T}",
+    "{t} what is",
+    "Tell me about {t}",
+    "tell me about {t} please",
+    "Explain {t}",
+    "explain {t} to me",
+    "How does {t} work?",
+    "how do {t} work",
+    "{t} explained",
+    "Information about {t}",
+]
+
+
+def build_query_log(size: int, seed: int) -> List[str]:
+    """Generate queries with Zipf-distributed topic popularity."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+    log = []
+    for _ in range(size):
+        topic = rng.choices(TOPICS, weights=weights)[0]
+        template = rng.choice(TEMPLATES)
+        log.append(template.format(t=topic, T=topic.upper()))
+    return log
+
+
+async def replay(log: List[str], normalizer: QueryNormalizer, similarity: float) -> Dict:
+    """Replay the log against a SearchService backed by a stub upstream."""
+    upstream_calls = 0
+
+    async def stub_search(query: str, num_results: int = 5) -> List[SearchResult]:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        return [SearchResult(query, "http://stub.test", query, "stub")]
+
+    service = SearchService(
+        cache=SearchCache(max_entries=100000),
+        normalizer=normalizer,
+        similarity_index=SimilarityIndex(threshold=similarity) if similarity > 0 else None
+    )
+    service.search = stub_search
+
+    for query in log:
+        await service.aggregate_search_results(query, num_results=3)
+
+    return {
+        "upstream_calls": upstream_calls,
+        "hit_rate": 1 - upstream_calls / len(log),
+        "similar_hits": service.similar_hits
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--similarity", type=float, default=0.75)
+    args = parser.parse_args()
+
+    log = build_query_log(args.queries, args.seed)
+    report = {"queries": len(log), "distinct_queries": len(set(log)), "modes": {}}
+    for mode in ("fold", "lemma", "sorted"):
+        report["modes"][mode] = await replay(log, QueryNormalizer(mode), 0)
+    report["modes"]["sorted+similarity"] = await replay(
+        log, QueryNormalizer("sorted"), args.similarity
+    )
+
+    baseline = report["modes"]["fold"]["hit_rate"]
+    for result in report["modes"].values():
+        result["hit_rate_gain"] = result["hit_rate"] - baseline
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
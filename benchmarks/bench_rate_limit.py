@@ -0,0 +1,70 @@
+"""
+Benchmark the per-request overhead of RateLimitMiddleware.
+
+Requests are driven straight through the ASGI callables with a no-op
+application, so the difference between the two timings is the cost the
+middleware adds to every admitted request.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--requests 200000] [--clients 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.middleware.rate_limit import RateLimiter, RateLimitMiddleware
+
+
+async def noop_app(scope, receive, send):
+    """Respond without doing any work."""
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def drive(app, scopes) -> float:
+    """Send every scope through app and return the elapsed seconds."""
+    async def send(_message):
+        pass
+
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, None, send)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--clients", type=int, default=1000)
+    args = parser.parse_args()
+
+    paths = ["/chat/chat", "/search/", "/nlp/analyze"]
+    scopes = [
+        {
+            "type": "http",
+            "path": paths[i % len(paths)],
+            "client": (f"10.0.{i % args.clients // 256}.{i % 256}", 40000),
+            "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")]
+        }
+        for i in range(args.requests)
+    ]
+    # Limits high enough that every request is admitted and fully measured.
+    limits = {path.rsplit("/", 1)[0] or path: (1e9, 1e9) for path in paths}
+    limiter = RateLimiter(limits, max_concurrency=256)
+
+    baseline = asyncio.run(drive(noop_app, scopes))
+    limited = asyncio.run(drive(RateLimitMiddleware(noop_app, limiter), scopes))
+    print(json.dumps({
+        "requests": args.requests,
+        "clients": args.clients,
+        "baseline_us_per_request": baseline / args.requests * 1e6,
+        "rate_limited_us_per_request": limited / args.requests * 1e6,
+        "overhead_us_per_request": (limited - baseline) / args.requests * 1e6,
+        "admitted": limiter.stats()["admitted"]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark request latency for hot queries whose cache entries keep
+expiring: plain TTL expiry, stale-while-revalidate, and stale-while-
+revalidate with the refresh-ahead job.
+
+A stub provider answers after --upstream-latency seconds and a fixed set
+of hot queries is requested in a loop for --duration seconds with a
+short cache TTL, so every query expires several times during the run.
+The cache is filled before timing starts.
+
+Usage:
+    python -m benchmarks.bench_refresh [--duration 5] [--ttl 0.5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.report import finish, summarize
+from src.services.cache import SearchCache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.popularity import HeavyHitters
+from src.services.query_normalizer import QueryNormalizer
+from src.services.search_providers import ProviderBudget, SearchProvider, SearchResult
+from src.services.search_refresh import SearchRefresher
+from src.services.search_service import SearchService
+
+
+class SleepingProvider(SearchProvider):
+    """Provider answering every query after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency: float):
+        super().__init__(None, "http://stub.test", CircuitBreaker(self.name))
+        self.delay = latency
+        self.calls = 0
+
+    async def search(self, query: str, num_results: int) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [
+            SearchResult(f"{query} {i}", f"http://stub.test/{query}/{i}", query, self.name)
+            for i in range(num_results)
+        ]
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> Dict:
+    """Request the hot queries for args.duration seconds in one mode."""
+    provider = SleepingProvider(args.upstream_latency)
+    service = SearchService(
+        cache=SearchCache(ttl=args.ttl, stale_ttl=0 if mode == "expire" else 60),
+        normalizer=QueryNormalizer("fold"),
+        providers=[provider],
+        popularity=HeavyHitters(k=64)
+    )
+    queries = [f"hot query {i}" for i in range(args.queries)]
+    # Start from a warm cache; only expiries during the run are measured.
+    await asyncio.gather(*(service.aggregate_search_results(query, num_results=3) for query in queries))
+    provider.calls = 0
+    refresher = None
+    if mode == "refresh_ahead":
+        refresher = SearchRefresher(
+            service, ProviderBudget(rate=100, burst=100),
+            interval=args.ttl / 4, refresh_ahead=args.ttl / 2, min_hits=1
+        )
+        job = asyncio.create_task(refresher.run())
+
+    latencies = []
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        for query in queries:
+            started = time.perf_counter()
+            await service.aggregate_search_results(query, num_results=3)
+            latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(args.think_time)
+
+    if refresher is not None:
+        job.cancel()
+        await asyncio.gather(job, return_exceptions=True)
+    result = summarize(latencies)
+    result["upstream_calls"] = provider.calls
+    result["slow_requests"] = sum(1 for latency in latencies if latency >= args.upstream_latency / 2)
+    result["stale_hits"] = service.cache.stale_hits
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    """Run every mode one after another."""
+    return {mode: await run_mode(mode, args) for mode in ("expire", "stale", "refresh_ahead")}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--ttl", type=float, default=0.5)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--upstream-latency", type=float, default=0.2)
+    parser.add_argument("--think-time", type=float, default=0.01)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    return finish(asyncio.run(run(args)), args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
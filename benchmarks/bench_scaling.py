@@ -0,0 +1,69 @@
+"""
+Measure how throughput and memory scale with the number of workers of
+the pre-fork launcher.
+
+Runs the bench_load workload against src.serve once per worker count and
+reports throughput, latency, upstream search calls and the memory of the
+whole process tree relative to the first worker count. Speedup is bounded
+by the CPU cores available; "environment" records how many there were.
+
+Usage:
+    python -m benchmarks.bench_scaling [--workers 1,2,4] [--requests 2000]
+        [--output results.json] [--baseline baseline.json]
+"""
+
+import argparse
+import sys
+from typing import Dict
+
+from benchmarks.bench_load import add_arguments, run_benchmark
+from benchmarks.report import environment, finish
+
+
+def scaling_summary(run: Dict) -> Dict:
+    """Pick the figures compared across worker counts from one load run."""
+    idle = run["server_memory"]["idle"]
+    loaded = run["server_memory"]["after_load"]
+    return {
+        "throughput_per_second": run["throughput_per_second"],
+        "successful_per_second": run["successful_per_second"],
+        "p50_ms": run["latency"]["all"]["p50_ms"],
+        "p99_ms": run["latency"]["all"]["p99_ms"],
+        "upstream_requests": run["stub"]["requests"],
+        "processes": idle.get("processes", 0),
+        "idle_rss_mb": idle.get("rss_mb", 0.0),
+        "idle_pss_mb": idle.get("pss_mb", 0.0),
+        "loaded_pss_mb": loaded.get("pss_mb", 0.0),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(parser)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+    counts = [int(count) for count in args.workers.split(",")]
+
+    runs = {}
+    port, stub_port = args.port, args.stub_port
+    for index, workers in enumerate(counts):
+        # Fresh ports per run, so a server still shutting down cannot clash.
+        args.port, args.stub_port = port + 2 * index, stub_port + 2 * index
+        args.workers = workers
+        runs[f"workers_{workers}"] = scaling_summary(run_benchmark(args))
+
+    first = runs[f"workers_{counts[0]}"]
+    for summary in runs.values():
+        summary["speedup"] = summary["throughput_per_second"] / first["throughput_per_second"]
+        summary["idle_pss_ratio"] = summary["idle_pss_mb"] / first["idle_pss_mb"] if first["idle_pss_mb"] else 0.0
+
+    args.port, args.stub_port, args.workers = port, stub_port, ",".join(map(str, counts))
+    results = {"options": vars(args), "environment": environment(), **runs}
+    return finish(results, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Benchmark the memory and serialization cost of cached search results:
+per-result dicts versus SearchResult.
+
+Result lists are built the way the disk cache hands them back (freshly
+decoded JSON, so every dict has its own key and source strings), and
+measured with tracemalloc. Serialization covers the /search/search
+response through FastAPI's own path, serialize_response and then the
+JSONResponse render: dicts as the route returned them before it declared
+a response model (so FastAPI fell back to jsonable_encoder), and
+SearchResult objects against the route's SearchResponse model. The disk
+cache encoding is timed as well; aggregation compares += snippet concatenation with a single
+join.
+
+Usage:
+    python -m benchmarks.bench_search_results [--lists 5000] [--per-list 5]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from src.routes.search_routes import router
+from src.services.search_providers import SearchResult
+
+
+def encoded_lists(lists: int, per_list: int) -> List[str]:
+    """JSON documents of result lists as stored in the disk cache."""
+    documents = []
+    for i in range(lists):
+        documents.append(json.dumps([{
+            "title": f"Result {j} for query {i}",
+            "link": f"https://example.test/{i}/{j}",
+            "snippet": f"Snippet {j} describing query {i} in a sentence or two of text.",
+            "source": "google" if j % 2 else "duckduckgo"
+        } for j in range(per_list)]))
+    return documents
+
+
+def measure_memory(build: Callable[[], List]) -> int:
+    """Bytes still allocated by what build() returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return allocated
+
+
+def timed(func: Callable[[], object], repeat: int) -> float:
+    """Average seconds per call of func."""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def timed_response(content: Any, field: Optional[Any], repeat: int) -> float:
+    """
+    Average seconds to turn a route's return value into a response body,
+    as FastAPI's request handler does.
+
+    Args:
+        content: Value returned by the endpoint
+        field: Response model field of the route, or None without one
+        repeat: Number of calls to average over
+    """
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            JSONResponse(await serialize_response(field=field, response_content=content))
+        return (time.perf_counter() - started) / repeat
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lists", type=int, default=5000)
+    parser.add_argument("--per-list", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    documents = encoded_lists(args.lists, args.per_list)
+    results_count = args.lists * args.per_list
+    dict_bytes = measure_memory(lambda: [json.loads(document) for document in documents])
+    slotted_bytes = measure_memory(lambda: [
+        [SearchResult.from_dict(item) for item in json.loads(document)] for document in documents
+    ])
+
+    as_dicts: List[Dict] = json.loads(documents[0])
+    as_results = [SearchResult.from_dict(item) for item in as_dicts]
+    route = next(r for r in router.routes if isinstance(r, APIRoute) and r.path == "/search")
+    report = {
+        "results": results_count,
+        "dict_bytes_per_result": dict_bytes / results_count,
+        "slotted_bytes_per_result": slotted_bytes / results_count,
+        "memory_saving": 1 - slotted_bytes / dict_bytes,
+        "dict_response_us": timed_response(
+            {"status": "success", "query": "q", "results": as_dicts}, None, args.repeat
+        ) * 1e6,
+        "slotted_response_us": timed_response(
+            {"status": "success", "query": "q", "results": as_results},
+            route.secure_cloned_response_field,
+            args.repeat
+        ) * 1e6,
+        "slotted_disk_encode_us": timed(
+            lambda: json.dumps([result.to_dict() for result in as_results]), args.repeat
+        ) * 1e6,
+        "dict_disk_encode_us": timed(lambda: json.dumps(as_dicts), args.repeat) * 1e6,
+    }
+
+    snippets = [result.snippet for result in as_results] * 20
+
+    def concatenate() -> str:
+        combined = ""
+        for snippet in snippets:
+            combined += f"{snippet} "
+        return combined
+
+    report["concatenate_snippets_us"] = timed(concatenate, args.repeat) * 1e6
+    report["join_snippets_us"] = timed(lambda: " ".join(snippets), args.repeat) * 1e6
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
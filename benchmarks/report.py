@@ -0,0 +1,126 @@
+"""
+Helpers shared by the benchmark suite: latency summaries, JSON result files
+and regression checks against a saved baseline.
+
+Result keys state their direction: *_ms, *_us and *_mb are better when
+lower; keys containing per_second, throughput or hit_rate are better when
+higher. Maxima are too noisy to compare, and other numbers are reported
+but not compared.
+"""
+
+import json
+import math
+import platform
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LOWER_IS_BETTER = ("_ms", "_us", "_mb")
+HIGHER_IS_BETTER = ("per_second", "throughput", "hit_rate")
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(seconds: Sequence[float], unit: str = "ms") -> Dict[str, float]:
+    """
+    Summarize durations.
+
+    Args:
+        seconds: Durations in seconds
+        unit: "ms" or "us" for the reported values
+
+    Returns:
+        count, mean, p50, p95, p99 and max, the latter suffixed with the unit
+    """
+    scale = 1e3 if unit == "ms" else 1e6
+    values = sorted(seconds)
+    summary: Dict[str, float] = {"count": len(values)}
+    summary[f"mean_{unit}"] = sum(values) / len(values) * scale if values else 0.0
+    for pct in (50, 95, 99):
+        summary[f"p{pct}_{unit}"] = percentile(values, pct) * scale
+    summary[f"max_{unit}"] = values[-1] * scale if values else 0.0
+    return summary
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine so results from different hosts are not mixed up."""
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+
+def _leaves(results: Dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yield (dotted.path, value) for every number in nested results."""
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _leaves(value, f"{path}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float = 0.1) -> List[Dict]:
+    """
+    Find metrics that got worse than the baseline by more than tolerance.
+
+    Args:
+        results: Current results
+        baseline: Results of an earlier run with the same options
+        tolerance: Allowed relative change, e.g. 0.1 for 10%
+
+    Returns:
+        One {"metric", "baseline", "current", "change"} dict per regression
+    """
+    previous = dict(_leaves(baseline))
+    regressions = []
+    for path, current in _leaves(results):
+        name = path.rsplit(".", 1)[-1]
+        before = previous.get(path)
+        if before is None or before == 0 or name.startswith("max_"):
+            continue
+        change = (current - before) / abs(before)
+        if name.endswith(LOWER_IS_BETTER):
+            worse = change > tolerance
+        elif any(marker in name for marker in HIGHER_IS_BETTER):
+            worse = change < -tolerance
+        else:
+            continue
+        if worse:
+            regressions.append({
+                "metric": path, "baseline": before, "current": current, "change": change
+            })
+    return regressions
+
+
+def finish(results: Dict, output: Optional[str], baseline_path: Optional[str], tolerance: float) -> int:
+    """
+    Print results, save them and compare them with a baseline.
+
+    Args:
+        results: Benchmark results
+        output: Path to write the results JSON to, if any
+        baseline_path: Path of a baseline results JSON, if any
+        tolerance: Allowed relative change before a metric is a regression
+
+    Returns:
+        Process exit status: 1 if any metric regressed, otherwise 0
+    """
+    status = 0
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), tolerance)
+        results["regressions"] = regressions
+        status = 1 if regressions else 0
+    print(json.dumps(results, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return status
@@ -0,0 +1,135 @@
+"""
+Stub search server answering in the Google Custom Search and DuckDuckGo
+response formats, with configurable latency and failure injection.
+
+Benchmarks point the application at it through GOOGLE_SEARCH_URL and
+DUCKDUCKGO_SEARCH_URL so that load tests never reach the real APIs.
+
+Usage:
+    python -m benchmarks.stub_search [--port 8081] [--latency 0.05] [--failure-rate 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Dict
+from urllib.parse import parse_qs
+
+import uvicorn
+
+GOOGLE_PATH = "/customsearch/v1"
+
+
+class StubSearchServer:
+    """
+    ASGI application imitating the upstream search APIs.
+
+    Requests to GOOGLE_PATH get a Google-style {"items": [...]} body and
+    any other path a DuckDuckGo-style {"RelatedTopics": [...]} body. Each
+    response is delayed by latency plus uniform jitter, and failure_rate of
+    them are answered with a 500 and a non-JSON body.
+    """
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 7):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+
+    @staticmethod
+    def _google(query: str, num: int) -> Dict:
+        return {"items": [{
+            "title": f"{query} result {i}",
+            "link": f"https://google.stub/{query.replace(' ', '-')}/{i}",
+            "snippet": f"{query.capitalize()} is described in result {i}. It has details worth reading."
+        } for i in range(num)]}
+
+    @staticmethod
+    def _duckduckgo(query: str) -> Dict:
+        return {"RelatedTopics": [{
+            "Text": f"{query.capitalize()} topic {i}. More about {query} here.",
+            "FirstURL": f"https://duckduckgo.stub/{query.replace(' ', '-')}/{i}"
+        } for i in range(5)]}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.requests += 1
+        delay = self.latency + self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            status, body = 500, b"stub failure"
+        else:
+            params = parse_qs(scope.get("query_string", b"").decode())
+            query = params.get("q", [""])[0]
+            if scope["path"] == GOOGLE_PATH:
+                payload = self._google(query, int(params.get("num", ["5"])[0]))
+            else:
+                payload = self._duckduckgo(query)
+            status, body = 200, json.dumps(payload).encode()
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> Dict:
+        """Return request and injected failure counts."""
+        return {"requests": self.requests, "failures": self.failures}
+
+
+def stub_environment(base_url: str) -> Dict[str, str]:
+    """Environment variables pointing both search providers at a stub server."""
+    return {
+        "GOOGLE_SEARCH_URL": f"{base_url}{GOOGLE_PATH}",
+        "DUCKDUCKGO_SEARCH_URL": f"{base_url}/",
+        "GOOGLE_API_KEY": "stub",
+        "GOOGLE_CX": "stub",
+    }
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    """
+    Serve an ASGI app on 127.0.0.1:port from a daemon thread.
+
+    Returns:
+        Started server; set should_exit to stop it
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="stub-search", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Stub search server could not start on port {port}")
+        time.sleep(0.01)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        StubSearchServer(args.latency, args.jitter, args.failure_rate),
+        host="127.0.0.1",
+        port=args.port,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
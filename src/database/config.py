@@ -1,25 +1,177 @@
 """
 Database configuration module for SQLAlchemy setup.
+
+The database is configured from the environment:
+    DATABASE_URL: synchronous SQLAlchemy URL (default sqlite:///./chatbot.db)
+    DATABASE_ASYNC: set to 1 to hand routes an AsyncSession instead of a Session
+    DATABASE_ASYNC_URL: async driver URL; derived from DATABASE_URL if unset
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING: connection pool settings for both engines
 """
 
-from sqlalchemy import create_engine
+import os
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine
+)
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./chatbot.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./chatbot.db")
+
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "0") == "1"
+
+# Async drivers used when DATABASE_ASYNC_URL is not given.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def configure_sqlite(dbapi_connection, _connection_record) -> None:
+    """
+    Apply write-friendly pragmas to every new SQLite connection.
+
+    WAL lets readers proceed while the single writer commits; with
+    synchronous=NORMAL a commit is not fsynced until the next WAL
+    checkpoint, which survives application crashes but may lose the last
+    transactions on power loss. Set SQLITE_SYNCHRONOUS=FULL to fsync
+    every commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')}")
+    cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))}")
+    cursor.close()
+
+
+def to_async_url(url: str) -> str:
+    """
+    Derive the async driver URL for a synchronous database URL.
+
+    Args:
+        url: Synchronous SQLAlchemy URL, e.g. sqlite:///./chatbot.db
+
+    Returns:
+        URL using the backend's async driver, e.g. sqlite+aiosqlite:///./chatbot.db
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver known for {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """
+    Build create_engine() keyword arguments for a URL from the environment.
+
+    In-memory SQLite databases use a single shared connection, so pool
+    sizing does not apply to them; file databases are pooled with either
+    driver.
+
+    Args:
+        url: SQLAlchemy URL, sync or async
+
+    Returns:
+        Keyword arguments for create_engine() or create_async_engine()
+    """
+    parsed = make_url(url)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "3600")),
+    }
+    if parsed.get_backend_name() == "sqlite":
+        if parsed.get_driver_name() == "pysqlite":
+            options["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            return options
+        if parsed.get_driver_name() == "aiosqlite":
+            # aiosqlite defaults to NullPool, opening a connection (and its
+            # thread) per checkout; pool file connections like other backends.
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    )
+    return options
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create a synchronous engine with pool settings and SQLite pragmas."""
+    db_engine = create_engine(url, **engine_options(url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", configure_sqlite)
+    return db_engine
+
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """
+    Create an AsyncEngine with pool settings and SQLite pragmas.
+
+    Requires the async driver for the backend (aiosqlite for SQLite).
+    """
+    async_engine = create_async_engine(url, **engine_options(url))
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", configure_sqlite)
+    return async_engine
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the process-wide AsyncEngine, creating it on first use so the
+    async driver is only needed when it is used.
+
+    Returns:
+        AsyncEngine for DATABASE_ASYNC_URL, or DATABASE_URL's async equivalent
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = os.getenv("DATABASE_ASYNC_URL") or to_async_url(SQLALCHEMY_DATABASE_URL)
+        _async_engine = create_async_db_engine(url)
+        _async_session_factory = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Return the session factory bound to the shared AsyncEngine."""
+    get_async_engine()
+    return _async_session_factory
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections of both engines."""
+    global _async_engine, _async_session_factory
+    engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_session_factory = None
+
+
+def get_sync_db():
     """
-    Database session dependency.
-    
+    Synchronous database session dependency.
+
     Yields:
         Session: Database session
     """
@@ -27,4 +179,44 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async database session dependency.
+
+    Yields:
+        AsyncSession: Database session
+    """
+    async with get_async_session_factory()() as db:
+        yield db
+
+
+# Routes depend on get_db; DATABASE_ASYNC selects which session type it yields.
+get_db = get_async_db if DATABASE_ASYNC else get_sync_db
+
+
+async def execute(db: Union[Session, AsyncSession], statement: Any) -> Any:
+    """
+    Execute a statement on a Session or AsyncSession.
+
+    Args:
+        db: Session or AsyncSession
+        statement: SQLAlchemy executable
+
+    Returns:
+        Result of the statement
+    """
+    if isinstance(db, AsyncSession):
+        return await db.execute(statement)
+    return db.execute(statement)
+
+
+async def commit(db: Union[Session, AsyncSession]) -> None:
+    """Commit a Session or AsyncSession."""
+    if isinstance(db, AsyncSession):
+        await db.commit()
+    else:
+        db.commit()
+
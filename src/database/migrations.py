@@ -0,0 +1,146 @@
+"""
+Schema migration module for upgrading existing databases in place.
+
+create_all() only creates missing tables, so columns and indexes added to
+existing models are applied here, along with SQLite objects that have no
+model: the chats_fts full-text index and the triggers that keep it in
+sync with chats. Every step checks the live schema first and is safe to
+run repeatedly.
+
+Upgrade the configured database with:
+    python -m src.database.migrations
+Re-index all stored chats for full-text search with:
+    python -m src.database.migrations --rebuild-fts
+"""
+
+import argparse
+from typing import List
+
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from src.models.chat import Chat
+
+
+def upgrade(connection: Connection) -> List[str]:
+    """
+    Bring the chats table up to date with the Chat model.
+
+    Args:
+        connection: Connection inside a transaction
+
+    Returns:
+        Descriptions of the steps that were applied
+    """
+    inspector = inspect(connection)
+    if not inspector.has_table(Chat.__tablename__):
+        return []
+
+    applied = []
+    columns = {column["name"] for column in inspector.get_columns(Chat.__tablename__)}
+    if "session_id" not in columns:
+        connection.execute(text("ALTER TABLE chats ADD COLUMN session_id VARCHAR(64)"))
+        applied.append("add column chats.session_id")
+
+    indexes = {index["name"] for index in inspector.get_indexes(Chat.__tablename__)}
+    for index in Chat.__table__.indexes:
+        if index.name not in indexes:
+            index.create(connection)
+            applied.append(f"create index {index.name}")
+
+    applied.extend(create_fts(connection))
+    return applied
+
+
+FTS_TABLE = "chats_fts"
+
+# External-content FTS5 index over chats; the triggers mirror every write
+# to chats so the index never needs to be rebuilt on the request path.
+_FTS_SCHEMA = {
+    "chats_fts": "CREATE VIRTUAL TABLE chats_fts USING fts5("
+    "user_message, bot_response, content='chats', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "chats_fts_insert": "CREATE TRIGGER chats_fts_insert AFTER INSERT ON chats BEGIN "
+    "INSERT INTO chats_fts(rowid, user_message, bot_response) "
+    "VALUES (new.id, new.user_message, new.bot_response); END",
+    "chats_fts_delete": "CREATE TRIGGER chats_fts_delete AFTER DELETE ON chats BEGIN "
+    "INSERT INTO chats_fts(chats_fts, rowid, user_message, bot_response) "
+    "VALUES ('delete', old.id, old.user_message, old.bot_response); END",
+    "chats_fts_update": "CREATE TRIGGER chats_fts_update AFTER UPDATE ON chats BEGIN "
+    "INSERT INTO chats_fts(chats_fts, rowid, user_message, bot_response) "
+    "VALUES ('delete', old.id, old.user_message, old.bot_response); "
+    "INSERT INTO chats_fts(rowid, user_message, bot_response) "
+    "VALUES (new.id, new.user_message, new.bot_response); END",
+}
+
+
+def fts_supported(connection: Connection) -> bool:
+    """Whether the database is SQLite compiled with FTS5."""
+    if connection.dialect.name != "sqlite":
+        return False
+    options = connection.execute(text("PRAGMA compile_options")).scalars().all()
+    return "ENABLE_FTS5" in options
+
+
+def create_fts(connection: Connection) -> List[str]:
+    """
+    Create the chats_fts index and its triggers if they are missing, and
+    re-index the stored rows if anything had to be created.
+
+    Args:
+        connection: Connection inside a transaction
+
+    Returns:
+        Descriptions of the steps that were applied
+    """
+    if not fts_supported(connection):
+        return []
+    existing = set(connection.execute(
+        text("SELECT name FROM sqlite_master WHERE name IN :names").bindparams(
+            bindparam("names", expanding=True)
+        ),
+        {"names": list(_FTS_SCHEMA)}
+    ).scalars())
+
+    applied = []
+    for name, statement in _FTS_SCHEMA.items():
+        if name not in existing:
+            connection.execute(text(statement))
+            applied.append(f"create {name}")
+    if applied:
+        rebuild_fts(connection)
+    return applied
+
+
+def rebuild_fts(connection: Connection) -> None:
+    """Re-index every stored chat, e.g. after a bulk load with triggers off."""
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Run upgrade() on a synchronous engine in one transaction."""
+    with engine.begin() as connection:
+        return upgrade(connection)
+
+
+async def migrate_async(engine) -> List[str]:
+    """Run upgrade() on an AsyncEngine in one transaction."""
+    async with engine.begin() as connection:
+        return await connection.run_sync(upgrade)
+
+
+if __name__ == "__main__":
+    from src.database.config import engine as default_engine
+
+    parser = argparse.ArgumentParser(description="Upgrade the chat database schema.")
+    parser.add_argument(
+        "--rebuild-fts", action="store_true", help="re-index all chats for full-text search"
+    )
+    args = parser.parse_args()
+
+    for step in migrate(default_engine) or ["schema is up to date"]:
+        print(step)
+    if args.rebuild_fts:
+        with default_engine.begin() as conn:
+            rebuild_fts(conn)
+        print(f"rebuilt {FTS_TABLE}")
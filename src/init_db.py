@@ -1,14 +1,28 @@
 """
 Database initialization module.
-Creates all defined tables in the database.
+Creates all defined tables in the database and upgrades existing ones.
 """
 
-from src.database.config import engine
+import asyncio
+
+from src.database.config import DATABASE_ASYNC, engine, get_async_engine
+from src.database.migrations import migrate, migrate_async
 from src.models.chat import Base
 
 def init_db():
     """Initialize the database by creating all defined tables."""
     Base.metadata.create_all(bind=engine)
+    migrate(engine)
+
+async def init_db_async():
+    """Initialize the database through the async engine."""
+    async_engine = get_async_engine()
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await migrate_async(async_engine)
 
 if __name__ == "__main__":
-    init_db()
\ No newline at end of file
+    if DATABASE_ASYNC:
+        asyncio.run(init_db_async())
+    else:
+        init_db()
@@ -3,21 +3,120 @@ Main application module for the Chatbot API.
 Configures FastAPI application, middleware, and routes.
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import nltk
-from src.routes import nlp_routes, search_routes, chat_routes
+from src.database.config import dispose_engines
+from src.middleware.metrics import MetricsMiddleware
+from src.middleware.rate_limit import RateLimitMiddleware, rate_limiter_from_env
+from src.routes import nlp_routes, search_routes, chat_routes, metrics_routes
+from src.services.answer_index import get_answer_index
+from src.services.chat_writer import get_chat_writer
+from src.services.http_client import get_http_client, close_http_client
+from src.services.metrics import REGISTRY, monitor_event_loop_lag
+from src.services.nlp_executor import get_nlp_executor
+from src.services.nlp_service import get_nlp_processor, verify_nltk_resources
+from src.services.profiler import get_profiler
+from src.services.search_refresh import refresher_from_env, warm_up_queries_from_env
+from src.services.search_service import DISK_CACHE
+
+logger = logging.getLogger(__name__)
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+def _primary_worker() -> bool:
+    """
+    Whether this process runs the once-per-host background jobs; true
+    unless it is one of the secondary workers started by src.serve.
+    """
+    return os.getenv("WORKER_ID", "0") == "0"
+
+async def _warm_up_search(refresher) -> None:
+    """Warm the search cache from the configured queries, then keep refreshing it."""
+    try:
+        queries = await warm_up_queries_from_env()
+        if queries:
+            await refresher.warm_up(queries)
+    except Exception:
+        logger.exception("Search cache warm-up failed")
+    await refresher.run()
 
-# Download required NLTK datasets
-nltk.download('punkt')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('wordnet')
-nltk.download('stopwords')
+async def _warm_up_nlp(timings: dict) -> None:
+    """Load NLTK models in a worker thread and record how long it took."""
+    started = time.perf_counter()
+    await asyncio.to_thread(get_nlp_processor().warm_up)
+    timings["nlp_warm_up_seconds"] = time.perf_counter() - started
+    logger.info("NLP models warmed up in %.3fs", timings["nlp_warm_up_seconds"])
+
+@asynccontextmanager
+async def lifespan(app_: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    started = time.perf_counter()
+    timings = app_.state.startup_timings = {"import_seconds": IMPORT_SECONDS}
+
+    missing = verify_nltk_resources(os.getenv("NLTK_DATA_DIR"))
+    if missing:
+        message = f"Missing NLTK resources: {', '.join(missing)}"
+        if os.getenv("NLTK_STRICT", "0") == "1":
+            raise RuntimeError(message)
+        logger.error(message)
+
+    get_http_client()
+    get_nlp_executor().start()
+    if os.getenv("CHAT_WRITE_BEHIND", "1") == "1":
+        get_chat_writer().start()
+    background_tasks = []
+    if not missing:
+        warm_up = _warm_up_nlp(timings)
+        if os.getenv("NLP_WARM_UP", "background") == "blocking":
+            await warm_up
+        else:
+            background_tasks.append(asyncio.create_task(warm_up))
+    primary = _primary_worker()
+    if DISK_CACHE is not None and primary:
+        interval = float(os.getenv("SEARCH_DISK_CACHE_COMPACT_INTERVAL", "300"))
+        background_tasks.append(asyncio.create_task(DISK_CACHE.run_compaction(interval)))
+    refresher = refresher_from_env(search_routes.search_service) if primary else None
+    if refresher is not None:
+        REGISTRY.register_collector("search_refresh", refresher.stats)
+        background_tasks.append(asyncio.create_task(_warm_up_search(refresher)))
+    lag_interval = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+    if lag_interval > 0:
+        background_tasks.append(asyncio.create_task(monitor_event_loop_lag(lag_interval)))
+
+    timings["lifespan_seconds"] = time.perf_counter() - started
+    timings["total_seconds"] = time.perf_counter() - _IMPORT_STARTED
+    logger.info("Startup completed in %.3fs", timings["total_seconds"])
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    get_profiler().stop()
+    await get_chat_writer().stop()
+    answer_index = get_answer_index()
+    if answer_index is not None and primary:
+        # The log also holds the answers added by the other workers.
+        stats = answer_index.stats()
+        if stats["pending"] or stats["log_bytes"]:
+            await asyncio.to_thread(answer_index.save, os.getenv("ANSWER_INDEX_PATH"))
+    await dispose_engines()
+    await close_http_client()
+    await asyncio.to_thread(get_nlp_executor().shutdown)
 
 app = FastAPI(
     title="Chatbot API",
     description="An AI-powered chatbot API using NLP",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -29,12 +128,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-client rate limits and the in-flight request bound; added after CORS so
+# it runs before it and rejects requests before any other work is done.
+rate_limiter = rate_limiter_from_env()
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+    REGISTRY.register_collector("rate_limit", rate_limiter.stats)
+
+# Outermost, so that requests rejected by the rate limiter are measured too.
+app.add_middleware(MetricsMiddleware, profiler=get_profiler())
+
 # Include routers
 app.include_router(nlp_routes.router, prefix="/nlp", tags=["NLP"])
 app.include_router(search_routes.router, prefix="/search", tags=["Search"])
 app.include_router(chat_routes.router, prefix="/chat", tags=["Chat"])
+app.include_router(metrics_routes.router, prefix="/metrics", tags=["Metrics"])
 
 @app.get("/")
 async def root():
     """Root endpoint returning welcome message."""
-    return {"message": "Welcome to the Chatbot API"}
\ No newline at end of file
+    return {"message": "Welcome to the Chatbot API"}
+
+@app.get("/health")
+async def health():
+    """Health endpoint reporting startup timings."""
+    return {
+        "status": "ok",
+        "startup": getattr(app.state, "startup_timings", {}),
+        "rate_limit": rate_limiter.stats() if rate_limiter is not None else None
+    }
@@ -0,0 +1,42 @@
+"""
+Metrics middleware recording the duration and status of every HTTP
+request, labelled by route template so paths with IDs share one series.
+"""
+
+import time
+from typing import Optional
+
+from src.services.metrics import HTTP_REQUEST_SECONDS
+from src.services.profiler import SamplingProfiler
+
+
+class MetricsMiddleware:
+    """ASGI middleware observing request durations and slow-request profiles."""
+
+    def __init__(self, app, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finished = time.perf_counter()
+            # The router stores the matched route in the scope.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(finished - started, scope["method"], route, str(status))
+            if self.profiler is not None and self.profiler.running:
+                self.profiler.record_request(scope["method"], scope["path"], started, finished)
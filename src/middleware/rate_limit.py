@@ -0,0 +1,258 @@
+"""
+Rate limiting module providing per-client token buckets and a global
+concurrency limit as ASGI middleware.
+
+Requests are grouped by their first path segment (/nlp, /search, /chat)
+and each client gets one bucket per group, keyed by API key when the
+request carries one of the configured keys and by client IP otherwise. A
+request that finds its bucket empty is rejected with 429; a request
+arriving while the application already serves max_concurrency requests
+is shed with 503. Both carry a Retry-After header.
+
+WebSocket connections are admitted like requests when they open and
+count as in flight until they close; every message a client sends is
+charged to the bucket of the connection's group, and a client that runs
+out is disconnected.
+
+The middleware is plain ASGI rather than BaseHTTPMiddleware so that an
+admitted request costs a few microseconds and streaming responses pass
+through untouched.
+"""
+
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.services.token_bucket import take_token
+
+# Requests per second and burst size per route group.
+DEFAULT_LIMITS = {
+    "/chat": (2.0, 10.0),
+    "/search": (5.0, 20.0),
+    "/nlp": (20.0, 50.0),
+}
+
+
+class RateLimitBackend:
+    """
+    Storage for token buckets.
+
+    The in-memory backend limits each worker process separately; a shared
+    backend (e.g. Redis) can implement acquire() to enforce limits across
+    workers.
+    """
+
+    async def acquire(self, key: str, rate: float, burst: float) -> float:
+        """
+        Take one token from the bucket for key.
+
+        Args:
+            key: Bucket key
+            rate: Tokens added per second
+            burst: Bucket capacity
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets in a bounded in-process LRU.
+
+    Evicting an idle bucket is equivalent to letting it refill, so the
+    bound only forgets clients that have been quiet the longest.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, burst: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, time.monotonic()]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return take_token(bucket, rate, burst)
+
+
+class RateLimiter:
+    """Per-group limits, client identification and admission counters."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        max_concurrency: Optional[int] = None,
+        key_header: str = "x-api-key",
+        trust_forwarded: bool = False,
+        exempt: Iterable[str] = ("/", "/health"),
+        api_keys: Iterable[str] = ()
+    ):
+        self.limits = DEFAULT_LIMITS if limits is None else limits
+        self.backend = backend or MemoryRateLimitBackend()
+        self.max_concurrency = max_concurrency
+        self.key_header = key_header.lower().encode("latin-1")
+        # Only known keys identify a client; otherwise any client could get
+        # a fresh bucket per request by sending a new random key.
+        self.api_keys = frozenset(key.encode("latin-1") for key in api_keys)
+        self.trust_forwarded = trust_forwarded
+        self.exempt = frozenset(exempt)
+        self.active = 0
+        self.admitted = 0
+        self.limited = 0
+        self.shed = 0
+
+    def group(self, path: str) -> Optional[str]:
+        """Return the route group of a path, or None if it is not limited."""
+        end = path.find("/", 1)
+        group = path if end == -1 else path[:end]
+        return group if group in self.limits else None
+
+    def client_key(self, scope: Dict) -> str:
+        """Identify the client by known API key, forwarded address or peer address."""
+        forwarded = None
+        for name, value in scope.get("headers", ()):
+            if name == self.key_header and value in self.api_keys:
+                return "key:" + value.decode("latin-1")
+            if self.trust_forwarded and name == b"x-forwarded-for":
+                forwarded = value.decode("latin-1").split(",")[0].strip()
+        if forwarded:
+            return "ip:" + forwarded
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def stats(self) -> Dict:
+        """Return limits and admission counters."""
+        return {
+            "limits": {group: {"rate": rate, "burst": burst} for group, (rate, burst) in self.limits.items()},
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "admitted": self.admitted,
+            "limited": self.limited,
+            "shed": self.shed
+        }
+
+
+def _parse_limit(value: str) -> Tuple[float, float]:
+    """Parse a "rate,burst" limit such as "2,10"."""
+    rate, burst = value.split(",")
+    return float(rate), float(burst)
+
+
+def rate_limiter_from_env() -> Optional[RateLimiter]:
+    """
+    Build the RateLimiter configured by the environment.
+
+    RATE_LIMIT_ENABLED=0 disables limiting; RATE_LIMIT_CHAT,
+    RATE_LIMIT_SEARCH and RATE_LIMIT_NLP override the "rate,burst" of a
+    group; MAX_CONCURRENT_REQUESTS bounds in-flight requests (0 for no
+    bound); RATE_LIMIT_API_KEYS lists the comma-separated API keys that
+    get a bucket of their own instead of their client IP's.
+
+    Returns:
+        RateLimiter, or None if rate limiting is disabled
+    """
+    if os.getenv("RATE_LIMIT_ENABLED", "1") != "1":
+        return None
+    limits = dict(DEFAULT_LIMITS)
+    for group in DEFAULT_LIMITS:
+        override = os.getenv(f"RATE_LIMIT_{group.strip('/').upper()}")
+        if override:
+            limits[group] = _parse_limit(override)
+    max_concurrency = int(os.getenv("MAX_CONCURRENT_REQUESTS", "256"))
+    return RateLimiter(
+        limits,
+        max_concurrency=max_concurrency or None,
+        key_header=os.getenv("RATE_LIMIT_KEY_HEADER", "x-api-key"),
+        trust_forwarded=os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1",
+        api_keys=[key for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",") if key]
+    )
+
+
+class RateLimitMiddleware:
+    """ASGI middleware enforcing a RateLimiter on HTTP requests and WebSockets."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        if scope["type"] not in ("http", "websocket") or scope["path"] in limiter.exempt:
+            await self.app(scope, receive, send)
+            return
+        websocket = scope["type"] == "websocket"
+        reject = self._close if websocket else self._reject
+
+        if limiter.max_concurrency is not None and limiter.active >= limiter.max_concurrency:
+            limiter.shed += 1
+            await reject(send, 503, "Server is at capacity", 1.0)
+            return
+
+        group = limiter.group(scope["path"])
+        if group is not None:
+            bucket = f"{group}|{limiter.client_key(scope)}"
+            rate, burst = limiter.limits[group]
+            wait = await limiter.backend.acquire(bucket, rate, burst)
+            if wait > 0:
+                limiter.limited += 1
+                await reject(send, 429, "Rate limit exceeded", wait)
+                return
+            if websocket:
+                receive = self._limit_messages(receive, send, bucket, rate, burst)
+
+        limiter.admitted += 1
+        limiter.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.active -= 1
+
+    def _limit_messages(self, receive, send, bucket: str, rate: float, burst: float):
+        """
+        Wrap a WebSocket's receive so that each client message takes a
+        token; a client without tokens is disconnected with code 1008.
+        """
+        limiter = self.limiter
+
+        async def limited_receive():
+            message = await receive()
+            if message["type"] == "websocket.receive":
+                if await limiter.backend.acquire(bucket, rate, burst) > 0:
+                    limiter.limited += 1
+                    await send({"type": "websocket.close", "code": 1008, "reason": "Rate limit exceeded"})
+                    return {"type": "websocket.disconnect", "code": 1008}
+            return message
+
+        return limited_receive
+
+    @staticmethod
+    async def _close(send, status: int, detail: str, retry_after: float) -> None:
+        """
+        Refuse a WebSocket before it is accepted; the server answers the
+        handshake with 403. Takes the same arguments as _reject().
+        """
+        await send({"type": "websocket.close", "code": 1013 if status == 503 else 1008, "reason": detail})
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+        """Send an error response with a Retry-After header in whole seconds."""
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -3,7 +3,7 @@ Chat model module for database schema definition.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Index, Integer, String, DateTime
 from src.database.config import Base
 
 class Chat(Base):
@@ -12,14 +12,20 @@ class Chat(Base):
     
     Attributes:
         id (int): Primary key
+        session_id (str): Conversation the turn belongs to
         user_message (str): Message from user
         bot_response (str): Response from bot
         timestamp (datetime): Message timestamp
     """
     
     __tablename__ = "chats"
+    __table_args__ = (
+        Index("ix_chats_session_id_timestamp", "session_id", "timestamp"),
+        Index("ix_chats_timestamp", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(64))
     user_message = Column(String)
     bot_response = Column(String)
     timestamp = Column(DateTime, default=datetime.utcnow)
@@ -2,25 +2,111 @@
 Chat routes module handling conversation endpoints.
 """
 
-from typing import List, Dict
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+import json
+import uuid
+from typing import Any, AsyncIterator, List, Dict, Optional, Tuple, Union
+from fastapi import APIRouter, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from src.services.chat_writer import get_chat_writer
+from src.services.history_service import (
+    HistorySearchUnavailableError,
+    InvalidCursorError,
+    fetch_history,
+    get_conversation_cache,
+    recent_turns,
+    search_history
+)
+from src.services.metrics import DB_COMMIT_SECONDS, REGISTRY
+from src.services.nlp_executor import NLPOverloadedError
 from src.services.response_service import ResponseGenerator
-from src.database.config import get_db
+from src.database.config import commit, get_db
 from src.models.chat import Chat
 
 router = APIRouter()
 response_generator = ResponseGenerator()
+chat_writer = get_chat_writer()
+conversation_cache = get_conversation_cache()
+REGISTRY.register_collector("chat_writer", chat_writer.stats)
+REGISTRY.register_collector("conversation_cache", conversation_cache.stats)
+if response_generator.answer_index is not None:
+    REGISTRY.register_collector("answer_index", response_generator.answer_index.stats)
 
 class ChatRequest(BaseModel):
-    """Chat request model."""
+    """Chat request model; omit session_id to start a new conversation."""
     message: str
+    session_id: Optional[str] = Field(None, max_length=64)
 
 class ChatResponse(BaseModel):
     """Chat response model."""
     response: str
     sources: List[Dict[str, str]]
+    session_id: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+class HistoryResponse(BaseModel):
+    """Chat history page model."""
+    session_id: str
+    turns: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+class HistorySearchResponse(BaseModel):
+    """Chat history search results page model."""
+    query: str
+    turns: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    # True if only the HISTORY_SEARCH_RANK_WINDOW most recent matches
+    # were ranked and older ones are left out.
+    truncated: bool = False
+
+async def load_session(
+    db: Union[Session, AsyncSession],
+    session_id: Optional[str]
+) -> Tuple[str, List[Dict]]:
+    """
+    Resolve the conversation of a request and its recent turns.
+
+    Args:
+        db: Database session
+        session_id: Session ID sent by the client, or None for a new session
+
+    Returns:
+        (session_id, prior turns oldest first)
+    """
+    if session_id is None:
+        session_id = uuid.uuid4().hex
+        conversation_cache.set(session_id, [])
+        return session_id, []
+    return session_id, await recent_turns(db, session_id, conversation_cache)
+
+async def save_chat(
+    db: Union[Session, AsyncSession],
+    user_message: str,
+    bot_response: str,
+    session_id: Optional[str] = None
+) -> None:
+    """
+    Persist one completed conversation turn and add it to the session's
+    cached recent turns.
+
+    Goes through the background chat writer when it is running and falls
+    back to an inline insert on the request's session otherwise.
+    """
+    if session_id is not None:
+        conversation_cache.append(session_id, user_message, bot_response)
+    if chat_writer.running:
+        await chat_writer.submit(user_message, bot_response, session_id)
+        return
+    chat_entry = Chat(
+        session_id=session_id,
+        user_message=user_message,
+        bot_response=bot_response
+    )
+    db.add(chat_entry)
+    with DB_COMMIT_SECONDS.time("inline"):
+        await commit(db)
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest, db: Session = Depends(get_db)):
@@ -35,18 +121,198 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
         ChatResponse containing bot's response and sources
     """
     try:
-        result = await response_generator.generate_response(request.message)
+        session_id, history = await load_session(db, request.session_id)
+        result = await response_generator.generate_response(request.message, history)
         
-        chat_entry = Chat(
-            user_message=request.message,
-            bot_response=result["response"]
-        )
-        db.add(chat_entry)
-        db.commit()
+        await save_chat(db, request.message, result["response"], session_id)
         
         return {
             "response": result["response"],
-            "sources": result["sources"]
+            "sources": result["sources"],
+            "session_id": session_id,
+            "metadata": result["metadata"]
         }
+    except NLPOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, db: Session = Depends(get_db)):
+    """
+    Process chat request and stream the response as Server-Sent Events.
+
+    Emits context, source, chunk and done events (see
+    ResponseGenerator.stream_response); a failure mid-stream ends the
+    stream with an error event. The conversation is persisted once the
+    done event has been produced; its data carries the session_id.
+
+    Args:
+        request: Chat request containing user message
+        db: Database session
+
+    Returns:
+        text/event-stream response
+    """
+    # Produce the first event before committing to a 200 response so an
+    # overloaded or failing NLP stage still maps to an HTTP error status.
+    try:
+        session_id, history = await load_session(db, request.session_id)
+        events = response_generator.stream_response(request.message, history)
+        first = await events.__anext__()
+    except NLPOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+    async def replay() -> AsyncIterator[Dict]:
+        yield first
+        async for event in events:
+            yield event
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for event in replay():
+                if event["event"] == "done":
+                    event["data"]["session_id"] = session_id
+                    await save_chat(db, request.message, event["data"]["response"], session_id)
+                yield _sse(event["event"], event["data"])
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, db: Session = Depends(get_db)):
+    """
+    Stream chat responses over a WebSocket.
+
+    Each JSON message {"message": ..., "session_id": ...} from the client
+    is answered with the events of ResponseGenerator.stream_response, one
+    JSON message {"event", "data"} each; errors are sent as an error event
+    and the connection stays open for the next message. Messages without a
+    session_id continue the connection's own session.
+
+    Args:
+        websocket: Client connection
+        db: Database session
+    """
+    await websocket.accept()
+    connection_session: Optional[str] = None
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            message = payload.get("message") if isinstance(payload, dict) else None
+            if not isinstance(message, str):
+                await websocket.send_json({"event": "error", "data": {"detail": "message is required"}})
+                continue
+            try:
+                session_id, history = await load_session(
+                    db, payload.get("session_id") or connection_session
+                )
+                connection_session = connection_session or session_id
+                async for event in response_generator.stream_response(message, history):
+                    if event["event"] == "done":
+                        event["data"]["session_id"] = session_id
+                        await save_chat(db, message, event["data"]["response"], session_id)
+                    await websocket.send_json(event)
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"event": "error", "data": {"detail": str(e)}})
+    except WebSocketDisconnect:
+        pass
+
+@router.get("/answers/stats")
+async def answer_index_stats():
+    """
+    Report the answer index size and the fraction of chat requests
+    answered from past conversations.
+
+    Returns:
+        Dict containing answer index statistics
+    """
+    index = response_generator.answer_index
+    if index is None:
+        return {"enabled": False}
+    return dict(index.stats(), enabled=True, threshold=response_generator.answer_threshold)
+
+@router.get("/writer/stats")
+async def chat_writer_stats():
+    """
+    Report the background chat writer's queue depth and write counters.
+
+    Returns:
+        Dict containing writer statistics
+    """
+    return chat_writer.stats()
+
+
+@router.get("/sessions/{session_id}/history", response_model=HistoryResponse)
+async def chat_history(
+    session_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Page through a session's turns, newest first.
+
+    Args:
+        session_id: Conversation to read
+        limit: Maximum number of turns per page
+        cursor: next_cursor from the previous page
+        db: Database session
+
+    Returns:
+        HistoryResponse with the turns and the cursor of the next page
+    """
+    try:
+        turns, next_cursor = await fetch_history(db, session_id, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return {"session_id": session_id, "turns": turns, "next_cursor": next_cursor}
+
+@router.get("/history/search", response_model=HistorySearchResponse)
+async def chat_history_search(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Search stored conversations by content, best match first.
+
+    Args:
+        q: Words that must all appear in a turn
+        limit: Maximum number of turns per page
+        cursor: next_cursor from the previous page
+        session_id: Optionally restrict the search to one conversation
+        db: Database session
+
+    Returns:
+        HistorySearchResponse with ranked turns, highlighted snippets,
+        the cursor of the next page and whether older matches were left out
+    """
+    try:
+        turns, next_cursor, truncated = await search_history(db, q, limit, cursor, session_id)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except HistorySearchUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) from e
+    return {"query": q, "turns": turns, "next_cursor": next_cursor, "truncated": truncated}
@@ -0,0 +1,85 @@
+"""
+Metrics routes module exposing metrics in the Prometheus text format and
+controlling the sampling profiler at runtime.
+"""
+
+import os
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from src.services.metrics import get_metrics_registry
+from src.services.profiler import get_profiler
+
+router = APIRouter()
+
+EXPOSITION_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _require_profiler() -> None:
+    """Reject profiler control unless PROFILER_ENABLED=1."""
+    if os.getenv("PROFILER_ENABLED", "0") != "1":
+        raise HTTPException(status_code=403, detail="Profiler control is disabled; set PROFILER_ENABLED=1")
+
+@router.get("")
+async def metrics():
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        Plain text exposition
+    """
+    return PlainTextResponse(
+        get_metrics_registry().render(), media_type=EXPOSITION_CONTENT_TYPE
+    )
+
+@router.post("/profiler/start")
+async def start_profiler(interval: Optional[float] = Query(None, gt=0, le=1)):
+    """
+    Start the sampling profiler.
+
+    Args:
+        interval: Seconds between samples
+
+    Returns:
+        Dict containing profiler state
+    """
+    _require_profiler()
+    profiler = get_profiler()
+    profiler.start(interval)
+    return {"status": "success", "profiler": profiler.stats()}
+
+@router.post("/profiler/stop")
+async def stop_profiler():
+    """
+    Stop the sampling profiler, keeping its samples.
+
+    Returns:
+        Dict containing profiler state
+    """
+    _require_profiler()
+    profiler = get_profiler()
+    profiler.stop()
+    return {"status": "success", "profiler": profiler.stats()}
+
+@router.get("/profiler/stacks")
+async def profiler_stacks():
+    """
+    Return the collected samples as collapsed stacks for flame graph tools.
+
+    Returns:
+        Plain text with one "stack count" line per distinct stack
+    """
+    _require_profiler()
+    return PlainTextResponse(get_profiler().collapsed())
+
+@router.get("/profiler/slow")
+async def profiler_slow_requests():
+    """
+    Return collapsed stacks sampled during recent slow requests.
+
+    Returns:
+        Dict containing the slow requests, oldest first
+    """
+    _require_profiler()
+    profiler = get_profiler()
+    return {"status": "success", "profiler": profiler.stats(), "requests": profiler.slow_requests()}
@@ -2,17 +2,71 @@
 NLP routes module handling natural language processing endpoints.
 """
 
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator, List
+
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from src.services.nlp_service import NLPProcessor
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from src.services.metrics import REGISTRY
+from src.services.nlp_executor import NLPOverloadedError, get_nlp_executor
+from src.services.nlp_service import get_nlp_processor
 
 router = APIRouter()
-nlp_processor = NLPProcessor()
+nlp_executor = get_nlp_executor()
+REGISTRY.register_collector("nlp_executor", nlp_executor.stats)
+REGISTRY.register_collector(
+    "nlp_analysis_cache", lambda: get_nlp_processor().cache_stats()["analysis"]
+)
+
+BATCH_CHUNK_SIZE = 256
 
 class TextRequest(BaseModel):
     """Request model for text processing endpoints."""
     text: str
 
+class BatchTextRequest(BaseModel):
+    """Request model for batch text processing endpoints."""
+    texts: List[str] = Field(..., max_length=100000)
+
+async def _stream_batch(method: str, field: str, texts: List[str]) -> AsyncIterator[str]:
+    """
+    Run a batch NLP method over texts in chunks and yield NDJSON lines in
+    input order. Up to one chunk per executor worker runs at a time.
+    """
+    chunks = [texts[i:i + BATCH_CHUNK_SIZE] for i in range(0, len(texts), BATCH_CHUNK_SIZE)]
+    window = max(1, min(nlp_executor.workers, nlp_executor.max_pending))
+    pending = deque()
+    next_chunk = 0
+    index = 0
+    try:
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < window:
+                pending.append(asyncio.ensure_future(nlp_executor.run(method, chunks[next_chunk])))
+                next_chunk += 1
+            try:
+                results = await pending.popleft()
+            except NLPOverloadedError as e:
+                yield json.dumps({"status": "error", "detail": str(e)}) + "\n"
+                return
+            for result in results:
+                yield json.dumps({"index": index, field: result}) + "\n"
+                index += 1
+    finally:
+        for future in pending:
+            future.cancel()
+
+def _batch_response(method: str, field: str, request: BatchTextRequest) -> StreamingResponse:
+    """Stream batch results as NDJSON, or fail with 503 if the executor is saturated."""
+    if nlp_executor.pending >= nlp_executor.max_pending:
+        raise HTTPException(status_code=503, detail="NLP executor saturated")
+    return StreamingResponse(
+        _stream_batch(method, field, request.texts),
+        media_type="application/x-ndjson"
+    )
+
 @router.post("/analyze")
 async def analyze_text(request: TextRequest):
     """
@@ -25,11 +79,13 @@ async def analyze_text(request: TextRequest):
         Dict containing analysis results
     """
     try:
-        context = nlp_processor.get_context(request.text)
+        context = await nlp_executor.run("get_context", request.text)
         return {
             "status": "success",
             "analysis": context
         }
+    except NLPOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -45,11 +101,13 @@ async def format_search_query(request: TextRequest):
         Dict containing formatted search query
     """
     try:
-        query = nlp_processor.format_search_query(request.text)
+        query = await nlp_executor.run("format_search_query", request.text)
         return {
             "status": "success",
             "search_query": query
         }
+    except NLPOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -65,10 +123,77 @@ async def humanize_text(request: TextRequest):
         Dict containing humanized text
     """
     try:
-        response = nlp_processor.humanize_response(request.text)
+        response = await nlp_executor.run("humanize_response", request.text)
         return {
             "status": "success",
             "humanized_text": response
         }
+    except NLPOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.post("/batch/analyze")
+async def analyze_batch(request: BatchTextRequest):
+    """
+    Analyze many texts, streaming one NDJSON line per text.
+    
+    Args:
+        request: BatchTextRequest containing texts to analyze
+    
+    Returns:
+        NDJSON stream of {"index", "analysis"} objects in input order
+    """
+    return _batch_response("get_context_batch", "analysis", request)
+
+@router.post("/batch/search-query")
+async def format_search_query_batch(request: BatchTextRequest):
+    """
+    Format many texts into search queries, streaming one NDJSON line per text.
+    
+    Args:
+        request: BatchTextRequest containing texts to format
+    
+    Returns:
+        NDJSON stream of {"index", "search_query"} objects in input order
+    """
+    return _batch_response("format_search_query_batch", "search_query", request)
+
+@router.post("/batch/humanize")
+async def humanize_batch(request: BatchTextRequest):
+    """
+    Humanize many texts, streaming one NDJSON line per text.
+    
+    Args:
+        request: BatchTextRequest containing texts to humanize
+    
+    Returns:
+        NDJSON stream of {"index", "humanized_text"} objects in input order
+    """
+    return _batch_response("humanize_response_batch", "humanized_text", request)
+
+@router.get("/executor/stats")
+async def executor_stats():
+    """
+    Report NLP worker pool usage.
+    
+    Returns:
+        Dict containing pool mode, size and queue counters
+    """
+    return {
+        "status": "success",
+        "executor": nlp_executor.stats()
+    }
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report lemma and analysis cache usage of this process's NLP processor.
+    
+    Returns:
+        Dict containing cache sizes and hit rates
+    """
+    return {
+        "status": "success",
+        "cache": get_nlp_processor().cache_stats()
+    }
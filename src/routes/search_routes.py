@@ -2,19 +2,30 @@
 Search routes module handling search functionality endpoints.
 """
 
+from typing import List
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from src.services.metrics import REGISTRY
+from src.services.search_providers import SearchResult
 from src.services.search_service import SearchService
 
 router = APIRouter()
 search_service = SearchService()
+REGISTRY.register_collector("search_cache", search_service.cache.stats)
 
 class SearchRequest(BaseModel):
     """Search request model containing query parameters."""
     query: str
     num_results: int = 5
 
-@router.post("/search")
+class SearchResponse(BaseModel):
+    """Search response model; results are serialized from SearchResult directly."""
+    status: str
+    query: str
+    results: List[SearchResult]
+
+@router.post("/search", response_model=SearchResponse)
 async def search(request: SearchRequest):
     """
     Process search request and return results.
@@ -37,4 +48,33 @@ async def search(request: SearchRequest):
             "results": results
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) from e
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """
+    Report shared search cache usage.
+    
+    Returns:
+        Dict containing cache size, hit, miss, eviction and coalesced counters
+    """
+    disk_cache = search_service.disk_cache
+    return {
+        "status": "success",
+        "cache": search_service.cache.stats(),
+        "similar_hits": search_service.similar_hits,
+        "disk_cache": disk_cache.stats() if disk_cache is not None else None
+    }
+
+@router.get("/providers")
+async def provider_status():
+    """
+    Report circuit breaker state and adaptive timeouts per search provider.
+    
+    Returns:
+        Dict containing one status entry per provider
+    """
+    return {
+        "status": "success",
+        "providers": search_service.provider_status()
+    }
@@ -0,0 +1,217 @@
+"""
+Pre-fork launcher running the API in several worker processes.
+
+The parent process imports the application, loads the NLTK models, the
+keyword model and the answer index, then forks the workers, so every
+worker shares those pages copy-on-write instead of loading its own copy.
+All workers accept connections on one listening socket.
+
+State is shared across the workers as follows:
+    search cache: each worker keeps its in-memory SearchCache in front
+        of the SQLite disk cache, which all workers read and write;
+        SEARCH_DISK_CACHE_PATH defaults to ./search_cache.db
+    chat history: workers forward their Chat batches to one writer
+        process, the only process writing the chats table; a batch the
+        writer does not take within CHAT_WRITER_PROCESS_TIMEOUT seconds
+        (default 5) is dropped and counted
+    answer index: every worker appends the answers it adds to the log
+        at ANSWER_INDEX_PATH.log; worker 0 merges the log into the saved
+        index on shutdown, and the next start replays what is left
+    background jobs: disk cache compaction and search refresh run in
+        worker 0 only
+    conversation history: the in-memory conversation cache is disabled
+        (CONVERSATION_CACHE_TTL=0) with more than one worker, since a
+        worker cannot see turns that another worker appended; every turn
+        reads the session's recent history from the database instead,
+        which lacks turns still queued for the writer process
+
+Per-worker state that is not shared: rate limiter buckets (limits apply
+per worker) and /metrics.
+
+Run with:
+    python -m src.serve --workers 4 [--host 0.0.0.0] [--port 8000]
+"""
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISK_CACHE_PATH = "./search_cache.db"
+
+# Workers that exit sooner than this after starting are not restarted,
+# so a broken configuration does not fork in a loop.
+MIN_WORKER_UPTIME = 5.0
+
+
+def preload() -> Any:
+    """
+    Import the application and load the read-only models it uses, so that
+    forked workers inherit them.
+
+    Returns:
+        ASGI application
+    """
+    from src.main import app
+    from src.services.answer_index import get_answer_index
+    from src.services.nlp_service import get_nlp_processor, verify_nltk_resources
+
+    started = time.perf_counter()
+    if not verify_nltk_resources(os.getenv("NLTK_DATA_DIR")):
+        get_nlp_processor().warm_up()
+    get_answer_index()
+    # Objects that exist now live for the whole process; freezing them keeps
+    # the collector from writing to (and so copying) their shared pages.
+    gc.collect()
+    gc.freeze()
+    logger.info("Preloaded application in %.3fs", time.perf_counter() - started)
+    return app
+
+
+def fork(target: Callable[[], Any]) -> int:
+    """Run target in a forked child process and return its PID."""
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            target()
+            status = 0
+        except BaseException:  # pylint: disable=broad-except
+            logger.exception("Process %d failed", os.getpid())
+        finally:
+            os._exit(status)  # pylint: disable=protected-access
+    return pid
+
+
+class Launcher:
+    """Forks and supervises the chat writer process and the workers."""
+
+    def __init__(self, app: Any, workers: int, host: str, port: int, log_level: str, channel: Any):
+        import uvicorn
+
+        self.workers = workers
+        self.channel = channel
+        self.config = uvicorn.Config(app, host=host, port=port, log_level=log_level)
+        self.socket = self.config.bind_socket()
+        self.pids: Dict[int, int] = {}
+        self.started: Dict[int, float] = {}
+        self.writer_pid: Optional[int] = None
+        self.stopping = False
+
+    def _serve(self, worker_id: int) -> None:
+        """Body of a worker process."""
+        import uvicorn
+        from src.database.config import engine
+
+        os.environ["WORKER_ID"] = str(worker_id)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        # Never share pooled connections with the parent.
+        engine.dispose(close=False)
+        uvicorn.Server(self.config).run(sockets=[self.socket])
+
+    def _write(self) -> None:
+        """Body of the chat writer process."""
+        from src.database.config import engine
+        from src.services.chat_writer import run_writer_process
+
+        engine.dispose(close=False)
+        run_writer_process(self.channel, batch_size=int(os.getenv("CHAT_WRITE_BATCH_SIZE", "500")))
+
+    def spawn(self, worker_id: int) -> None:
+        """Fork worker worker_id."""
+        pid = fork(lambda: self._serve(worker_id))
+        self.pids[pid] = worker_id
+        self.started[pid] = time.monotonic()
+        logger.info("Started worker %d (pid %d)", worker_id, pid)
+
+    def stop(self, *_: Any) -> None:
+        """Ask every worker to shut down gracefully."""
+        self.stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """
+        Start the writer and the workers, restart workers that die, and
+        stop the writer once every worker has exited.
+
+        Returns:
+            Process exit status
+        """
+        self.writer_pid = fork(self._write)
+        for worker_id in range(self.workers):
+            self.spawn(worker_id)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        status = 0
+        while self.pids:
+            pid, wait_status = os.wait()
+            if pid == self.writer_pid:
+                logger.error("Chat writer process exited; stopping workers")
+                self.writer_pid = None
+                status = 1
+                self.stop()
+                continue
+            worker_id = self.pids.pop(pid, None)
+            if worker_id is None:
+                continue
+            uptime = time.monotonic() - self.started.pop(pid)
+            if self.stopping:
+                continue
+            logger.error(
+                "Worker %d (pid %d) exited with status %d",
+                worker_id, pid, os.waitstatus_to_exitcode(wait_status)
+            )
+            if uptime < MIN_WORKER_UPTIME:
+                status = 1
+                self.stop()
+            else:
+                self.spawn(worker_id)
+
+        if self.writer_pid is not None:
+            # Workers have flushed their queues; let the writer drain and stop.
+            self.channel.put(None)
+            os.waitpid(self.writer_pid, 0)
+        self.socket.close()
+        return status
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper())
+
+    # Configuration read at import time must be in place before preload().
+    os.environ.setdefault("SEARCH_DISK_CACHE_PATH", DEFAULT_DISK_CACHE_PATH)
+    if args.workers > 1:
+        os.environ["CONVERSATION_CACHE_TTL"] = "0"
+    context = multiprocessing.get_context("fork")
+    channel = context.Queue(maxsize=int(os.getenv("CHAT_WRITER_PROCESS_QUEUE", "1000")))
+    from src.services.chat_writer import use_writer_process
+
+    use_writer_process(channel)
+    app = preload()
+    return Launcher(app, args.workers, args.host, args.port, args.log_level, channel).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,547 @@
+"""
+Answer index module for serving repeat questions from past conversations.
+
+Stored user_message/bot_response pairs are indexed as hashed term vectors
+in an inverted index over the hash buckets. Looking up a new question
+scores only the stored questions sharing a term with it, so a
+near-repeat can be answered without a search round-trip.
+
+The index persists to a directory of .npy arrays and a text blob that are
+memory-mapped on load, so a large index starts instantly and its pages
+are shared between worker processes. Pairs added at runtime are kept in
+an in-memory delta that is merged into the arrays on save(). Each added
+pair is also appended to a log next to the index directory as soon as it
+is added. The log is replayed on load, so pairs survive a crash between
+saves. Worker processes share the log under a file lock, and save()
+rebuilds the delta from the log, so one process saving the index keeps
+the pairs every other process added.
+
+Every pair keeps the time it was added, so lookups can skip answers
+older than a maximum age instead of serving them forever.
+
+Build an index from stored chat history with:
+    python -m src.services.answer_index data/answer_index
+"""
+
+import contextlib
+import json
+import logging
+import math
+import os
+import shutil
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import timezone
+from typing import IO, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process owns the log
+    fcntl = None
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Tokenizer = Callable[[str], List[str]]
+
+_ARRAYS = ("feature_ptr", "doc_ids", "weights", "text_offsets", "added_at")
+
+
+@contextlib.contextmanager
+def _locked_log(path: str) -> Iterator[IO[str]]:
+    """Open the log at path for appending and reading, locked against other processes."""
+    with open(path, "a+", encoding="utf-8") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield f
+
+
+def _read_log(f: IO[str]) -> Iterator[Tuple[str, str, float]]:
+    """
+    Yield the logged (question, answer, added_at) entries from the start
+    of f. Lines written without a time are dated by the log's mtime.
+    """
+    f.seek(0)
+    modified = os.fstat(f.fileno()).st_mtime
+    for line in f:
+        try:
+            question, answer, *added_at = json.loads(line)
+        except ValueError:
+            # A line cut short by a crash while it was written.
+            continue
+        yield question, answer, added_at[0] if added_at else modified
+
+
+def default_tokenizer(text: str) -> List[str]:
+    """Tokenize with NLPProcessor's preprocessing (stopwords removed, lemmatized)."""
+    from src.services.nlp_service import get_nlp_processor
+
+    return get_nlp_processor().tokenize_text(text.lower())["words"]
+
+
+class AnswerIndex:
+    """
+    Top-k cosine lookup of stored questions over hashed term vectors.
+
+    Questions are vectorized as sublinear term frequencies hashed into
+    n_features buckets and L2-normalized; the score of a stored question
+    is the cosine similarity of the two vectors.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 2 ** 18,
+        tokenizer: Optional[Tokenizer] = None,
+        log_path: Optional[str] = None
+    ):
+        self.n_features = n_features
+        self._tokenizer = tokenizer
+        # JSON lines of the pairs added since the last save().
+        self.log_path = log_path
+        # Base index, possibly memory-mapped: postings of bucket f are
+        # doc_ids[feature_ptr[f]:feature_ptr[f + 1]] with matching weights.
+        self._feature_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        self._doc_ids = np.empty(0, dtype=np.int32)
+        self._weights = np.empty(0, dtype=np.float32)
+        # Question and answer of doc i are texts 2i and 2i + 1 of the blob.
+        self._text_offsets = np.zeros(1, dtype=np.int64)
+        self._texts = np.empty(0, dtype=np.uint8)
+        # Unix time each doc was added.
+        self._added_at = np.empty(0, dtype=np.float64)
+        self._base_docs = 0
+        # Pairs added since the index was loaded.
+        self._delta_postings: Dict[int, List[Tuple[int, float]]] = {}
+        self._delta_docs: List[Tuple[str, str]] = []
+        self._delta_added_at: List[float] = []
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return self._base_docs + len(self._delta_docs)
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        """Tokenizer used to vectorize questions."""
+        return self._tokenizer or default_tokenizer
+
+    def vectorize(self, text: str) -> Dict[int, float]:
+        """
+        Hash a text into a sparse, L2-normalized term vector.
+
+        Args:
+            text: Question text
+
+        Returns:
+            Mapping of hash bucket to weight; empty if no terms remain
+        """
+        counts = Counter(
+            zlib.crc32(token.encode()) % self.n_features for token in self.tokenizer(text)
+        )
+        vector = {feature: 1 + math.log(count) for feature, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {feature: w / norm for feature, w in vector.items()} if norm else {}
+
+    def add(
+        self,
+        question: str,
+        answer: str,
+        log: bool = True,
+        added_at: Optional[float] = None
+    ) -> bool:
+        """
+        Index one answered question.
+
+        Args:
+            question: User message
+            answer: Bot response to return for similar questions
+            log: Append the pair to log_path, if set; False for pairs
+                read from the log
+            added_at: Unix time the answer was produced; defaults to now
+
+        Returns:
+            False if the question has no indexable terms
+        """
+        vector = self.vectorize(question)
+        if not vector:
+            return False
+        if added_at is None:
+            added_at = time.time()
+        with self._lock:
+            self._add_vector(question, answer, added_at, vector)
+        if log and self.log_path:
+            with _locked_log(self.log_path) as f:
+                f.write(json.dumps([question, answer, added_at]) + "\n")
+        return True
+
+    def _add_vector(
+        self,
+        question: str,
+        answer: str,
+        added_at: float,
+        vector: Dict[int, float]
+    ) -> None:
+        """Append a vectorized pair to the delta; the caller holds the lock."""
+        doc = self._base_docs + len(self._delta_docs)
+        self._delta_docs.append((question, answer))
+        self._delta_added_at.append(added_at)
+        for feature, weight in vector.items():
+            self._delta_postings.setdefault(feature, []).append((doc, weight))
+
+    def replay(self) -> int:
+        """
+        Add the pairs in log_path that are not part of the saved index yet.
+
+        Returns:
+            Number of pairs read from the log
+        """
+        if not self.log_path or not os.path.exists(self.log_path):
+            return 0
+        replayed = 0
+        with _locked_log(self.log_path) as f:
+            for question, answer, added_at in _read_log(f):
+                self.add(question, answer, log=False, added_at=added_at)
+                replayed += 1
+        return replayed
+
+    def _text(self, index: int) -> str:
+        """Decode text index of the base blob."""
+        start, end = self._text_offsets[index], self._text_offsets[index + 1]
+        return bytes(self._texts[start:end]).decode("utf-8")
+
+    def _document(self, doc: int) -> Tuple[str, str]:
+        """Return the (question, answer) pair of a doc."""
+        if doc < self._base_docs:
+            return self._text(2 * doc), self._text(2 * doc + 1)
+        return self._delta_docs[doc - self._base_docs]
+
+    def _doc_added_at(self, docs: np.ndarray) -> np.ndarray:
+        """Return the time each of docs was added; the caller holds the lock."""
+        base = docs < self._base_docs
+        added_at = np.empty(len(docs), dtype=np.float64)
+        added_at[base] = self._added_at[docs[base]]
+        if not base.all():
+            delta = np.asarray(self._delta_added_at, dtype=np.float64)
+            added_at[~base] = delta[docs[~base] - self._base_docs]
+        return added_at
+
+    def search(self, question: str, k: int = 1, max_age: Optional[float] = None) -> List[Dict]:
+        """
+        Find the stored questions most similar to question.
+
+        Args:
+            question: Question text
+            k: Number of matches to return
+            max_age: Skip answers added more than this many seconds ago
+
+        Returns:
+            Up to k {"score", "question", "answer"} dicts, best first
+        """
+        vector = self.vectorize(question)
+        if not vector:
+            return []
+
+        with self._lock:
+            # Score only the postings of the query's buckets; a doc appears
+            # at most once per bucket, so summing per doc gives the cosine.
+            doc_parts, weight_parts = [], []
+            for feature, weight in vector.items():
+                start, end = self._feature_ptr[feature], self._feature_ptr[feature + 1]
+                if end > start:
+                    doc_parts.append(self._doc_ids[start:end])
+                    weight_parts.append(weight * self._weights[start:end])
+                postings = self._delta_postings.get(feature)
+                if postings:
+                    docs, weights = zip(*postings)
+                    doc_parts.append(np.asarray(docs, dtype=np.int32))
+                    weight_parts.append(weight * np.asarray(weights, dtype=np.float32))
+            if not doc_parts:
+                return []
+            docs, slots = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(slots, weights=np.concatenate(weight_parts))
+            if max_age is not None:
+                scores[self._doc_added_at(docs) < time.time() - max_age] = 0
+
+            k = min(k, len(docs))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            matches = []
+            for slot in top:
+                if scores[slot] <= 0:
+                    break
+                stored_question, answer = self._document(int(docs[slot]))
+                matches.append({
+                    "score": float(scores[slot]),
+                    "question": stored_question,
+                    "answer": answer
+                })
+            return matches
+
+    def best_match(
+        self,
+        question: str,
+        threshold: float,
+        max_age: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Return the closest stored answer if it is similar enough, counting
+        the lookup for stats().
+
+        Args:
+            question: Question text
+            threshold: Minimum cosine similarity
+            max_age: Skip answers added more than this many seconds ago
+
+        Returns:
+            Best {"score", "question", "answer"} match or None
+        """
+        matches = self.search(question, k=1, max_age=max_age)
+        with self._lock:
+            self.lookups += 1
+            if matches and matches[0]["score"] >= threshold:
+                self.hits += 1
+                return matches[0]
+        return None
+
+    def _merged_arrays(self) -> Dict[str, np.ndarray]:
+        """Combine the base arrays and the delta into new base arrays."""
+        features = np.repeat(
+            np.arange(self.n_features, dtype=np.int64), np.diff(self._feature_ptr)
+        )
+        doc_ids = self._doc_ids.astype(np.int32)
+        weights = self._weights.astype(np.float32)
+        delta = [
+            (feature, doc, weight)
+            for feature, postings in self._delta_postings.items()
+            for doc, weight in postings
+        ]
+        if delta:
+            delta_features, delta_docs, delta_weights = zip(*delta)
+            features = np.concatenate([features, np.asarray(delta_features, dtype=np.int64)])
+            doc_ids = np.concatenate([doc_ids, np.asarray(delta_docs, dtype=np.int32)])
+            weights = np.concatenate([weights, np.asarray(delta_weights, dtype=np.float32)])
+
+        order = np.lexsort((doc_ids, features))
+        feature_ptr = np.zeros(self.n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(features, minlength=self.n_features), out=feature_ptr[1:])
+
+        texts = [bytes(self._texts)]
+        lengths = list(np.diff(self._text_offsets))
+        for question, answer in self._delta_docs:
+            for text in (question, answer):
+                encoded = text.encode("utf-8")
+                texts.append(encoded)
+                lengths.append(len(encoded))
+        text_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=text_offsets[1:])
+        added_at = np.concatenate([
+            self._added_at.astype(np.float64), np.asarray(self._delta_added_at, dtype=np.float64)
+        ])
+
+        return {
+            "feature_ptr": feature_ptr,
+            "doc_ids": doc_ids[order],
+            "weights": weights[order],
+            "text_offsets": text_offsets,
+            "added_at": added_at,
+            "texts": np.frombuffer(b"".join(texts), dtype=np.uint8)
+        }
+
+    def _catch_up(self, path: str, log: IO[str]) -> None:
+        """
+        Rebase onto the index last saved at path and rebuild the delta from
+        the log, which holds the pairs every process added since that save.
+        The caller holds the lock.
+        """
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                docs = json.load(f)["docs"]
+            if docs != self._base_docs:
+                # Another process saved since this index was loaded.
+                saved = AnswerIndex.load(path, tokenizer=self._tokenizer)
+                self._feature_ptr, self._doc_ids = saved._feature_ptr, saved._doc_ids
+                self._weights, self._text_offsets = saved._weights, saved._text_offsets
+                self._texts, self._base_docs = saved._texts, saved._base_docs
+                self._added_at = saved._added_at
+        self._delta_postings = {}
+        self._delta_docs = []
+        self._delta_added_at = []
+        for question, answer, added_at in _read_log(log):
+            vector = self.vectorize(question)
+            if vector:
+                self._add_vector(question, answer, added_at, vector)
+
+    def save(self, path: str) -> None:
+        """
+        Merge the delta into the base index and write it to directory path.
+
+        The new files are written next to path and swapped in, so a
+        reader never sees a half-written index. With a log_path, the
+        pairs logged by every process are merged and the log is emptied.
+
+        Args:
+            path: Index directory
+        """
+        with self._lock, contextlib.ExitStack() as stack:
+            log = stack.enter_context(_locked_log(self.log_path)) if self.log_path else None
+            if log is not None:
+                self._catch_up(path, log)
+            arrays = self._merged_arrays()
+            docs = len(self)
+
+            staging = f"{path}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            for name in _ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), arrays[name])
+            arrays["texts"].tofile(os.path.join(staging, "texts.bin"))
+            with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"n_features": self.n_features, "docs": docs}, f)
+
+            previous = f"{path}.old"
+            shutil.rmtree(previous, ignore_errors=True)
+            if os.path.exists(path):
+                os.rename(path, previous)
+            os.rename(staging, path)
+            shutil.rmtree(previous, ignore_errors=True)
+
+            self._feature_ptr = arrays["feature_ptr"]
+            self._doc_ids = arrays["doc_ids"]
+            self._weights = arrays["weights"]
+            self._text_offsets = arrays["text_offsets"]
+            self._texts = arrays["texts"]
+            self._added_at = arrays["added_at"]
+            self._base_docs = docs
+            self._delta_postings = {}
+            self._delta_docs = []
+            self._delta_added_at = []
+            if log is not None:
+                # Every logged pair is in the saved arrays now.
+                log.truncate(0)
+
+    @classmethod
+    def load(cls, path: str, tokenizer: Optional[Tokenizer] = None, mmap: bool = True) -> "AnswerIndex":
+        """
+        Load an index saved with save().
+
+        Args:
+            path: Index directory
+            tokenizer: Tokenizer the index was built with
+            mmap: Memory-map the arrays instead of reading them into memory
+
+        Returns:
+            Loaded AnswerIndex
+        """
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(n_features=meta["n_features"], tokenizer=tokenizer)
+        mode = "r" if mmap else None
+        index._feature_ptr = np.load(os.path.join(path, "feature_ptr.npy"), mmap_mode=mode)
+        index._doc_ids = np.load(os.path.join(path, "doc_ids.npy"), mmap_mode=mode)
+        index._weights = np.load(os.path.join(path, "weights.npy"), mmap_mode=mode)
+        index._text_offsets = np.load(os.path.join(path, "text_offsets.npy"), mmap_mode=mode)
+        added_at_path = os.path.join(path, "added_at.npy")
+        if os.path.exists(added_at_path):
+            index._added_at = np.load(added_at_path, mmap_mode=mode)
+        else:
+            # Saved before answers were dated: treat them as added then.
+            meta_mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+            index._added_at = np.full(meta["docs"], meta_mtime, dtype=np.float64)
+        texts_path = os.path.join(path, "texts.bin")
+        if mmap and os.path.getsize(texts_path):
+            index._texts = np.memmap(texts_path, dtype=np.uint8, mode="r")
+        else:
+            index._texts = np.fromfile(texts_path, dtype=np.uint8)
+        index._base_docs = meta["docs"]
+        return index
+
+    def stats(self) -> Dict:
+        """Return index size and the fraction of lookups answered locally."""
+        log_bytes = 0
+        if self.log_path and os.path.exists(self.log_path):
+            log_bytes = os.path.getsize(self.log_path)
+        with self._lock:
+            return {
+                "documents": len(self),
+                "pending": len(self._delta_docs),
+                "log_bytes": log_bytes,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0
+            }
+
+
+def load_answer_index(path: str, tokenizer: Optional[Tokenizer] = None) -> AnswerIndex:
+    """
+    Load the index at path, or start an empty one if none was saved yet,
+    and replay the pairs logged at path.log since the last save.
+    """
+    if os.path.exists(os.path.join(path, "meta.json")):
+        index = AnswerIndex.load(path, tokenizer=tokenizer)
+    else:
+        index = AnswerIndex(tokenizer=tokenizer)
+    index.log_path = f"{path}.log"
+    try:
+        replayed = index.replay()
+    except LookupError:
+        # The tokenizer's NLTK data is missing; keep the log for later.
+        logger.exception("Could not replay the answer index log %s", index.log_path)
+    else:
+        if replayed:
+            logger.info("Replayed %d answers from %s", replayed, index.log_path)
+    return index
+
+
+def build_from_chat_history(output_path: str) -> AnswerIndex:
+    """Index every stored question/answer pair and save the index."""
+    from src.database.config import SessionLocal
+    from src.models.chat import Chat
+
+    index = AnswerIndex()
+    db = SessionLocal()
+    try:
+        rows = db.query(Chat.user_message, Chat.bot_response, Chat.timestamp).yield_per(10000)
+        for question, answer, timestamp in rows:
+            if question and answer:
+                # Chat timestamps are naive UTC.
+                added_at = timestamp.replace(tzinfo=timezone.utc).timestamp() if timestamp else None
+                index.add(question, answer, added_at=added_at)
+    finally:
+        db.close()
+    index.save(output_path)
+    return index
+
+
+_index: Optional[AnswerIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_answer_index() -> Optional[AnswerIndex]:
+    """
+    Return the process-wide AnswerIndex, loading it from ANSWER_INDEX_PATH
+    on first use.
+
+    Returns:
+        Shared AnswerIndex, or None if ANSWER_INDEX_PATH is not set
+    """
+    global _index
+    path = os.getenv("ANSWER_INDEX_PATH")
+    if not path:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = load_answer_index(path)
+    return _index
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m src.services.answer_index OUTPUT_DIR")
+    built = build_from_chat_history(sys.argv[1])
+    print(f"Indexed {len(built)} answers")
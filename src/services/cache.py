@@ -0,0 +1,362 @@
+"""
+Cache module providing bounded in-memory caches shared across services.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Approximate the memory footprint of a cached value in bytes.
+
+    Args:
+        obj: Value to measure (strings, numbers, slotted objects and nested
+            containers)
+
+    Returns:
+        Estimated size in bytes
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in obj)
+    elif hasattr(obj, "__slots__"):
+        size += sum(estimate_size(getattr(obj, name)) for name in obj.__slots__)
+    return size
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by entry count and estimated byte size,
+    with optional per-entry TTL expiry.
+
+    Expired entries are kept for stale_ttl more seconds; get() never
+    returns them, but get_entry() does so callers can serve them while
+    revalidating.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        stale_ttl: float = 0.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key: Hashable, count: bool = True) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing or expired.
+
+        Args:
+            key: Cache key
+            count: Whether the lookup updates the hit/miss counters
+
+        Returns:
+            Cached value or None
+        """
+        entry = self.get_entry(key, count=False)
+        fresh = entry is not None and (entry[1] is None or entry[1] > time.time())
+        if count:
+            with self._lock:
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return entry[0] if fresh else None
+
+    def get_entry(self, key: Hashable, count: bool = True) -> Optional[Tuple[Any, Optional[float]]]:
+        """
+        Return the cached value for key with its expiry time, including
+        entries that expired less than stale_ttl seconds ago.
+
+        Args:
+            key: Cache key
+            count: Whether the lookup updates the hit/miss counters
+
+        Returns:
+            (value, expires_at) or None; expires_at is None without a TTL
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is not None and expires_at + self.stale_ttl <= time.time():
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value, expires_at
+            if count:
+                self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least recently used entries to stay in budget.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional TTL override in seconds
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remove key from the cache if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Drop all entries. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry; caller must hold the lock."""
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class SearchCache(LRUCache):
+    """
+    LRU+TTL cache for search results that coalesces concurrent misses for
+    the same key into a single upstream fetch.
+
+    With a stale_ttl, an expired entry is still returned for that long
+    while a background fetch replaces it (stale-while-revalidate).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._refreshes: Set[asyncio.Task] = set()
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.revalidations = 0
+
+    def get_or_revalidate(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Optional[Any]:
+        """
+        Return the cached value for key, starting a background revalidation
+        if it is stale.
+
+        Args:
+            key: Cache key
+            fetch: Coroutine factory producing a fresh value
+
+        Returns:
+            Fresh or stale cached value, or None on a miss
+        """
+        entry = self.get_entry(key)
+        if entry is None or not entry[0]:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            self.stale_hits += 1
+            self.revalidate(key, fetch)
+        return value
+
+    def revalidate(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Fetch a fresh value for key in a background task unless a fetch
+        for key is already in flight.
+
+        Args:
+            key: Cache key
+            fetch: Coroutine factory producing the value
+
+        Returns:
+            Whether a new fetch was started
+        """
+        future = self.claim(key)
+        if future is None:
+            return False
+        self.revalidations += 1
+        task = asyncio.create_task(self._fetch_into(key, fetch, future))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+        # Nobody awaits a revalidation, so failures are retrieved here
+        # rather than reported as never-retrieved task exceptions.
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return True
+
+    async def _fetch_into(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]],
+        future: asyncio.Future
+    ) -> Any:
+        """Run fetch, cache a non-empty value and resolve the in-flight future."""
+        try:
+            value = await fetch()
+        except BaseException as exc:
+            self.settle(key, future, error=exc)
+            raise
+        self.settle(key, future, value)
+        return value
+
+    def claim(self, key: Hashable) -> Optional[asyncio.Future]:
+        """
+        Register the caller as the one fetching key, so that concurrent
+        get_or_fetch() calls wait for its value instead of fetching too.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Future to pass to settle() once the value is known, or None if
+            a fetch for key is already in flight
+        """
+        if key in self._inflight:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def settle(
+        self,
+        key: Hashable,
+        future: asyncio.Future,
+        value: Any = None,
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Finish a fetch registered with claim(): cache a non-empty value and
+        hand it, or the error, to the callers waiting on the fetch.
+
+        Args:
+            key: Cache key
+            future: Future returned by claim()
+            value: Fetched value
+            error: Exception that ended the fetch; anything other than an
+                Exception (e.g. cancellation) cancels the waiters, which
+                then fetch on their own
+        """
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.done():
+            return
+        if error is None:
+            if value:
+                self.set(key, value)
+            future.set_result(value)
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+            # Retrieve the exception so it is not reported as unhandled
+            # when no other caller was waiting on this fetch.
+            future.exception()
+        else:
+            future.cancel()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Return the cached value for key, fetching it at most once on a miss.
+
+        Concurrent callers that miss on the same key wait for the first
+        caller's fetch instead of issuing their own. Empty results are
+        returned but not cached. A stale value is returned at once and
+        revalidated in the background.
+
+        Args:
+            key: Cache key
+            fetch: Coroutine factory producing the value on a miss
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        value = self.get_or_revalidate(key, fetch)
+        if value:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading fetch was cancelled; fetch on our own.
+                return await self.get_or_fetch(key, fetch)
+
+        return await self._fetch_into(key, fetch, self.claim(key))
+
+    def pending(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Return the future of an in-flight fetch for key, if any."""
+        return self._inflight.get(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters including coalesced fetches."""
+        stats = super().stats()
+        stats["coalesced"] = self.coalesced
+        stats["inflight"] = len(self._inflight)
+        stats["stale_hits"] = self.stale_hits
+        stats["revalidations"] = self.revalidations
+        return stats
@@ -0,0 +1,345 @@
+"""
+Chat writer module persisting chat history off the request path.
+
+Handlers enqueue finished conversation turns on a bounded in-process
+queue; a background task drains the queue and inserts each batch in one
+transaction, so SQLite commits once per batch instead of once per request
+and the event loop never waits on the database.
+
+Under the pre-fork launcher (src.serve) the workers do not write at all:
+each worker's ChatWriter forwards its batches over a multiprocessing
+queue to one writer process, so SQLite sees a single writer no matter
+how many workers serve requests.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import signal
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from src.database.config import SessionLocal
+from src.models.chat import Chat
+from src.services.metrics import DB_COMMIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# buffered: return once the record is queued; queued records are written
+#     on shutdown but lost if the process crashes. Failed batches are
+#     retried with backoff, then dropped and counted in stats().
+# committed: return once the batch holding the record has been committed.
+DURABILITY_MODES = ("buffered", "committed")
+
+
+def insert_chats(session_factory: Callable[[], Session], rows: List[Dict]) -> None:
+    """Bulk-insert Chat rows in a single transaction."""
+    db = session_factory()
+    try:
+        with DB_COMMIT_SECONDS.time("writer"):
+            db.execute(insert(Chat), rows)
+            db.commit()
+    finally:
+        db.close()
+
+
+class ChatWriter:
+    """Write-behind queue that bulk-inserts Chat rows in batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        durability: str = "buffered",
+        max_retries: int = 3,
+        retry_delay: float = 0.5
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.durability = durability
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.batches = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background writer is accepting records."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write every queued record, then stop the background writer."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def submit(
+        self,
+        user_message: str,
+        bot_response: str,
+        session_id: Optional[str] = None
+    ) -> None:
+        """
+        Queue one conversation turn for persistence.
+
+        Waits for queue space when the writer falls behind. In committed
+        mode, also waits until the record's batch has been committed.
+
+        Args:
+            user_message: Message from user
+            bot_response: Response from bot
+            session_id: Conversation the turn belongs to
+
+        Raises:
+            RuntimeError: If the writer is not running
+            sqlalchemy.exc.SQLAlchemyError: In committed mode, if the batch
+                could not be written
+        """
+        if not self.running:
+            raise RuntimeError("Chat writer is not running")
+        row = {
+            "session_id": session_id,
+            "user_message": user_message,
+            "bot_response": bot_response,
+            "timestamp": datetime.utcnow()
+        }
+        done = None
+        if self.durability == "committed":
+            done = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, done))
+        if done is not None:
+            await done
+
+    async def _run(self) -> None:
+        """Drain the queue in batches until cancelled."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: List[Tuple[Dict, Optional[asyncio.Future]]]) -> None:
+        """
+        Insert one batch in a worker thread and resolve its waiters.
+
+        In buffered mode nobody waits for the outcome, so a failed batch is
+        retried up to max_retries times, doubling retry_delay each time,
+        before it is dropped. Committed mode reports the first failure to
+        the waiters instead.
+        """
+        rows = [row for row, _ in batch]
+        retries = self.max_retries if self.durability == "buffered" else 0
+        delay = self.retry_delay
+        for attempt in range(retries + 1):
+            try:
+                await asyncio.to_thread(self._write, rows)
+                break
+            except Exception as exc:  # pylint: disable=broad-except
+                if attempt < retries:
+                    self.retries += 1
+                    logger.warning(
+                        "Failed to persist %d chat records, retrying in %.1fs: %s",
+                        len(batch), delay, exc
+                    )
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                    continue
+                self.failed += len(batch)
+                if self.durability == "buffered":
+                    self.dropped += len(batch)
+                logger.exception("Failed to persist %d chat records", len(batch))
+                for _, done in batch:
+                    if done is not None and not done.done():
+                        done.set_exception(exc)
+                return
+        self.written += len(batch)
+        self.batches += 1
+        for _, done in batch:
+            if done is not None and not done.done():
+                done.set_result(None)
+
+    def _write(self, rows: List[Dict]) -> None:
+        """Bulk-insert rows in a single transaction."""
+        insert_chats(self.session_factory, rows)
+
+    def stats(self) -> Dict:
+        """Return queue depth and write counters."""
+        return {
+            "running": self.running,
+            "durability": self.durability,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "batches": self.batches
+        }
+
+
+class ForwardingChatWriter(ChatWriter):
+    """
+    ChatWriter that hands its batches to the writer process instead of
+    inserting them.
+
+    In committed mode, submit() returns once the batch has been handed
+    over, not once the writer process has committed it. A batch the
+    writer process does not take within put_timeout seconds is dropped,
+    and until the next batch is taken, later batches are dropped without
+    waiting, so a dead writer cannot block the worker.
+    """
+
+    def __init__(self, channel: Any, put_timeout: float = 5.0, **kwargs):
+        # Waiting up to put_timeout already gives the writer time to catch up.
+        kwargs["max_retries"] = 0
+        super().__init__(**kwargs)
+        self.channel = channel
+        self.put_timeout = put_timeout
+        self.stalled = False
+
+    def _write(self, rows: List[Dict]) -> None:
+        """
+        Put rows on the writer process's queue, waiting while it is full.
+
+        Raises:
+            queue.Full: If the writer process did not take the rows in time
+        """
+        try:
+            self.channel.put(rows, timeout=0 if self.stalled else self.put_timeout)
+        except queue.Full:
+            if not self.stalled:
+                logger.error(
+                    "Chat writer process took no records for %.1fs; dropping batches until it does",
+                    self.put_timeout
+                )
+            self.stalled = True
+            raise
+        self.stalled = False
+
+    def stats(self) -> Dict:
+        """Return queue depth, write counters and whether the writer process stalled."""
+        return dict(super().stats(), stalled=self.stalled)
+
+
+def run_writer_process(
+    channel: Any,
+    session_factory: Callable[[], Session] = SessionLocal,
+    batch_size: int = 500,
+    poll_interval: float = 1.0
+) -> int:
+    """
+    Insert the batches forwarded by ForwardingChatWriters until a None
+    sentinel arrives or the parent process goes away.
+
+    Batches that are already waiting are merged up to batch_size rows so
+    busy workers share commits. Interrupt signals are ignored so that a
+    Ctrl-C reaching the whole process group does not stop the writer
+    before the workers have flushed their queues.
+
+    Args:
+        channel: multiprocessing queue the workers forward to
+        session_factory: Factory for database sessions
+        batch_size: Maximum rows per transaction
+        poll_interval: Seconds between checks that the parent is alive
+
+    Returns:
+        Number of rows written
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    parent = os.getppid()
+    written = 0
+    stopping = False
+    while not stopping:
+        try:
+            rows = channel.get(timeout=poll_interval)
+        except queue.Empty:
+            if os.getppid() != parent:
+                break
+            continue
+        if rows is None:
+            break
+        while len(rows) < batch_size:
+            try:
+                more = channel.get_nowait()
+            except queue.Empty:
+                break
+            if more is None:
+                stopping = True
+                break
+            rows.extend(more)
+        try:
+            insert_chats(session_factory, rows)
+            written += len(rows)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to persist %d chat records", len(rows))
+    logger.info("Chat writer process stopping after %d records", written)
+    return written
+
+
+_writer: Optional[ChatWriter] = None
+_channel: Optional[Any] = None
+
+
+def use_writer_process(channel: Any) -> None:
+    """
+    Make get_chat_writer() forward to the writer process reading channel.
+
+    Must be called before the first get_chat_writer() call.
+
+    Args:
+        channel: multiprocessing queue read by run_writer_process()
+    """
+    global _channel
+    _channel = channel
+
+
+def get_chat_writer() -> ChatWriter:
+    """
+    Return the process-wide ChatWriter configured from the environment.
+
+    Returns:
+        Shared ChatWriter; a ForwardingChatWriter after use_writer_process()
+    """
+    global _writer
+    if _writer is None:
+        options = {
+            "max_queue": int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "10000")),
+            "batch_size": int(os.getenv("CHAT_WRITE_BATCH_SIZE", "500")),
+            "durability": os.getenv("CHAT_WRITE_DURABILITY", "buffered"),
+            "max_retries": int(os.getenv("CHAT_WRITE_RETRIES", "3")),
+            "retry_delay": float(os.getenv("CHAT_WRITE_RETRY_DELAY", "0.5"))
+        }
+        if _channel is not None:
+            timeout = float(os.getenv("CHAT_WRITER_PROCESS_TIMEOUT", "5"))
+            _writer = ForwardingChatWriter(_channel, put_timeout=timeout, **options)
+        else:
+            _writer = ChatWriter(**options)
+    return _writer
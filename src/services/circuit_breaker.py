@@ -0,0 +1,162 @@
+"""
+Circuit breaker module for failing fast on unhealthy upstream providers.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Count-based circuit breaker.
+
+    The breaker opens when the failure rate over the last `window` calls
+    reaches `failure_rate` (after at least `min_calls` calls). Calls slower
+    than `slow_call_seconds` count as failures. After `open_seconds` it lets
+    up to `half_open_calls` probe calls through; a successful probe closes
+    the circuit and a failed one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: int = 20,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        slow_call_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.slow_call_seconds = slow_call_seconds
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.transitions: deque = deque(maxlen=50)
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the cooldown passes."""
+        with self._lock:
+            self._check_cooldown()
+            return self._state
+
+    def _check_cooldown(self) -> None:
+        """Enter half-open after the open period; caller must hold the lock."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        """Switch state and record the transition; caller must hold the lock."""
+        self.transitions.append({"at": time.time(), "from": self._state, "to": state})
+        self._state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def allow_request(self) -> bool:
+        """
+        Decide whether a call may go to the provider.
+
+        Returns:
+            True if the call is allowed; in half-open state this reserves
+            one of the probe slots
+        """
+        with self._lock:
+            self._check_cooldown()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a completed call; slow calls count as failures."""
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed call and open the circuit if the failure rate is too high."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._outcomes.append(False)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = self._outcomes.count(False)
+                if failures / len(self._outcomes) >= self.failure_rate:
+                    self._transition(OPEN)
+
+    def release(self) -> None:
+        """Return a half-open probe slot for a call that was cancelled."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return breaker state, recent error rate and transitions for monitoring."""
+        with self._lock:
+            self._check_cooldown()
+            calls = len(self._outcomes)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "calls": calls,
+                "error_rate": self._outcomes.count(False) / calls if calls else 0.0,
+                "rejected": self.rejected,
+                "transitions": list(self.transitions)
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Return the process-wide breaker for a provider, creating it from the
+    environment on first use.
+
+    Args:
+        name: Provider name
+
+    Returns:
+        Shared CircuitBreaker
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            slow_call = os.getenv("SEARCH_BREAKER_SLOW_CALL_SECONDS")
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_rate=float(os.getenv("SEARCH_BREAKER_FAILURE_RATE", "0.5")),
+                min_calls=int(os.getenv("SEARCH_BREAKER_MIN_CALLS", "10")),
+                window=int(os.getenv("SEARCH_BREAKER_WINDOW", "20")),
+                open_seconds=float(os.getenv("SEARCH_BREAKER_OPEN_SECONDS", "30")),
+                slow_call_seconds=float(slow_call) if slow_call else None
+            )
+        return breaker
+
@@ -0,0 +1,156 @@
+"""
+Disk cache module providing a persistent SQLite cache tier.
+
+The cache lives in a single SQLite file in WAL mode so that several worker
+processes on one host can read and write it concurrently, and entries
+survive restarts.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at);
+"""
+
+
+class DiskCache:
+    """Persistent key/value cache with TTL expiry and a size cap."""
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 3600,
+        max_entries: int = 100000,
+        max_bytes: Optional[int] = None,
+        busy_timeout: float = 5.0
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Return the stored value for key if it has not expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value or None
+        """
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Optional TTL override in seconds
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, created_at, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now, now + ttl)
+        )
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def compact(self) -> int:
+        """
+        Delete expired rows and trim the table to its size cap, dropping
+        the entries closest to expiry first.
+
+        Returns:
+            Number of rows removed
+        """
+        conn = self._connection()
+        removed = conn.execute(
+            "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+        removed += conn.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+        if self.max_bytes is not None:
+            removed += conn.execute(
+                "DELETE FROM cache_entries WHERE key IN ("
+                "SELECT key FROM (SELECT key, SUM(LENGTH(value)) OVER "
+                "(ORDER BY expires_at DESC) AS running FROM cache_entries) "
+                "WHERE running > ?)",
+                (self.max_bytes,)
+            ).rowcount
+        return removed
+
+    async def run_compaction(self, interval: float = 300) -> None:
+        """
+        Periodically compact the cache until cancelled.
+
+        Args:
+            interval: Seconds between compaction passes
+        """
+        while True:
+            try:
+                removed = await asyncio.to_thread(self.compact)
+                if removed:
+                    logger.info("Disk cache compaction removed %d entries", removed)
+            except sqlite3.Error:
+                logger.exception("Disk cache compaction failed")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict:
+        """Return the number of stored entries and their total size."""
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entries"
+        ).fetchone()
+        return {"path": self.path, "entries": count, "bytes": size}
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,324 @@
+"""
+History service module for reading conversation history.
+
+Turns of a session are paginated with keyset cursors over the
+(session_id, timestamp) index, and the latest turns of active sessions
+are kept in memory so each new turn does not have to query the database.
+Stored turns can be searched by content through the chats_fts index.
+"""
+
+import base64
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, or_, select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.database.config import execute
+from src.database.migrations import FTS_TABLE
+from src.models.chat import Chat
+from src.services.cache import LRUCache
+
+HISTORY_SEARCH_RANK_WINDOW = int(os.getenv("HISTORY_SEARCH_RANK_WINDOW", "5000"))
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class HistorySearchUnavailableError(Exception):
+    """Raised when the database has no full-text index to search."""
+
+
+def _encode(position: str, chat_id: int) -> str:
+    """Encode a sort position and row ID as an opaque cursor."""
+    raw = f"{position}|{chat_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> Tuple[str, int]:
+    """Split a cursor produced by _encode() into position and row ID."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position, chat_id = raw.rsplit("|", 1)
+        return position, int(chat_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_cursor(timestamp: datetime, chat_id: int) -> str:
+    """Encode the position of a turn as an opaque cursor."""
+    return _encode(timestamp.isoformat(), chat_id)
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor().
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    position, chat_id = _decode(cursor)
+    try:
+        return datetime.fromisoformat(position), chat_id
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def turn_to_dict(chat: Chat) -> Dict:
+    """Serialize one stored turn."""
+    return {
+        "id": chat.id,
+        "session_id": chat.session_id,
+        "user_message": chat.user_message,
+        "bot_response": chat.bot_response,
+        "timestamp": chat.timestamp.isoformat() if chat.timestamp else None
+    }
+
+
+async def fetch_history(
+    db: Union[Session, AsyncSession],
+    session_id: str,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page of a session's turns, newest first.
+
+    Pages are delimited by the (timestamp, id) of the last turn returned
+    rather than an OFFSET, so each page is an index range scan no matter
+    how deep into the history it is.
+
+    Args:
+        db: Database session
+        session_id: Conversation to read
+        limit: Maximum number of turns to return
+        cursor: next_cursor of the previous page, or None for the newest turns
+
+    Returns:
+        (turns, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        InvalidCursorError: If cursor is malformed
+    """
+    query = select(Chat).where(Chat.session_id == session_id)
+    if cursor:
+        timestamp, chat_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Chat.timestamp < timestamp,
+            and_(Chat.timestamp == timestamp, Chat.id < chat_id)
+        ))
+    query = query.order_by(Chat.timestamp.desc(), Chat.id.desc()).limit(limit + 1)
+
+    rows = (await execute(db, query)).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].id)
+    return [turn_to_dict(row) for row in rows], next_cursor
+
+
+def match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching rows that contain every word.
+
+    Each word is quoted so that FTS5 operators and punctuation in user
+    input are searched for literally instead of being parsed.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+async def search_history(
+    db: Union[Session, AsyncSession],
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    session_id: Optional[str] = None,
+    rank_window: Optional[int] = None
+) -> Tuple[List[Dict], Optional[str], bool]:
+    """
+    Search stored turns by content, best match first.
+
+    Matches are ranked by BM25 over the user message and bot response,
+    with the row ID breaking ties, and paginated by keyset on (rank, id).
+    Ranking every match of a common word would cost time proportional to
+    the table, so only the rank_window most recent matches are ranked;
+    the cursor pins that window so later pages stay consistent. Older
+    matches are never returned, which the truncated flag reports; a
+    rank_window of 0 ranks every match at that cost instead.
+
+    Args:
+        db: Database session
+        query: Words that must all appear in the turn
+        limit: Maximum number of turns to return
+        cursor: next_cursor of the previous page, or None for the best matches
+        session_id: Optionally restrict the search to one conversation
+        rank_window: Number of most recent matches to rank, 0 for all;
+            defaults to HISTORY_SEARCH_RANK_WINDOW
+
+    Returns:
+        (turns with "rank" and "snippet", next_cursor, truncated);
+        next_cursor is None on the last page, and truncated is True if
+        older matches were left out of the ranking
+
+    Raises:
+        InvalidCursorError: If cursor is malformed
+        HistorySearchUnavailableError: If the database has no chats_fts index
+    """
+    params = {"match": match_expression(query), "limit": limit + 1}
+    filters = [f"{FTS_TABLE} MATCH :match", f"{FTS_TABLE}.rowid >= :floor"]
+    try:
+        if cursor:
+            position, chat_id = _decode(cursor)
+            rank, floor = position.split(":")
+            params.update(rank=float(rank), floor=int(floor), chat_id=chat_id)
+            filters.append(
+                f"(bm25({FTS_TABLE}) > :rank OR (bm25({FTS_TABLE}) = :rank AND c.id > :chat_id))"
+            )
+        else:
+            window = HISTORY_SEARCH_RANK_WINDOW if rank_window is None else rank_window
+            params["floor"] = 0
+            if window > 0:
+                # The oldest ranked match, and whether any match is older.
+                edge = (await execute(db, text(
+                    f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                    "ORDER BY rowid DESC LIMIT 2 OFFSET :offset"
+                ).bindparams(match=params["match"], offset=window - 1))).all()
+                if len(edge) == 2:
+                    params["floor"] = edge[0][0]
+        if session_id is not None:
+            params["session_id"] = session_id
+            filters.append("c.session_id = :session_id")
+
+        statement = text(
+            "SELECT c.id, c.session_id, c.user_message, c.bot_response, c.timestamp, "
+            f"bm25({FTS_TABLE}) AS rank, "
+            f"snippet({FTS_TABLE}, -1, '[', ']', '...', 12) AS snippet "
+            f"FROM {FTS_TABLE} JOIN chats AS c ON c.id = {FTS_TABLE}.rowid "
+            f"WHERE {' AND '.join(filters)} "
+            "ORDER BY rank, c.id LIMIT :limit"
+        )
+        rows = (await execute(db, statement.bindparams(**params))).mappings().all()
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    except OperationalError as e:
+        if FTS_TABLE in str(e.orig):
+            raise HistorySearchUnavailableError(
+                "Full-text history search is not set up; run python -m src.database.migrations"
+            ) from e
+        raise
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode(f"{rows[-1]['rank']!r}:{params['floor']}", rows[-1]["id"])
+    turns = []
+    for row in rows:
+        timestamp = row["timestamp"]
+        turns.append({
+            "id": row["id"],
+            "session_id": row["session_id"],
+            "user_message": row["user_message"],
+            "bot_response": row["bot_response"],
+            "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+            "rank": row["rank"],
+            "snippet": row["snippet"]
+        })
+    return turns, next_cursor, params["floor"] > 0
+
+
+class ConversationCache:
+    """
+    In-memory LRU of the most recent turns of active sessions.
+
+    Each entry holds up to max_turns {"user_message", "bot_response"}
+    dicts in chronological order and expires after ttl seconds of
+    inactivity. A ttl of 0 disables the cache, so every lookup misses and
+    recent turns are always read from the database.
+    """
+
+    def __init__(self, max_sessions: int = 10000, max_turns: int = 10, ttl: float = 1800):
+        self.max_turns = max_turns
+        self.enabled = ttl > 0
+        self._cache = LRUCache(max_entries=max_sessions, ttl=ttl)
+
+    def get(self, session_id: str) -> Optional[List[Dict]]:
+        """Return the cached recent turns of a session, or None on a miss."""
+        if not self.enabled:
+            return None
+        turns = self._cache.get(session_id)
+        return list(turns) if turns is not None else None
+
+    def set(self, session_id: str, turns: List[Dict]) -> None:
+        """Cache the recent turns of a session, oldest first."""
+        if not self.enabled:
+            return
+        self._cache.set(session_id, tuple(turns[-self.max_turns:]))
+
+    def append(self, session_id: str, user_message: str, bot_response: str) -> None:
+        """
+        Add a completed turn to a cached session.
+
+        Sessions that are not cached are left alone so that a later miss
+        loads their complete recent history from the database.
+        """
+        turns = self._cache.get(session_id, count=False)
+        if turns is None:
+            return
+        turn = {"user_message": user_message, "bot_response": bot_response}
+        self.set(session_id, list(turns) + [turn])
+
+    def stats(self) -> Dict:
+        """Return cache counters."""
+        return self._cache.stats()
+
+
+async def recent_turns(
+    db: Union[Session, AsyncSession],
+    session_id: str,
+    cache: ConversationCache
+) -> List[Dict]:
+    """
+    Return the latest turns of a session, oldest first, loading them from
+    the database only on a cache miss.
+
+    Args:
+        db: Database session
+        session_id: Conversation to read
+        cache: Conversation cache to consult and fill
+
+    Returns:
+        Up to cache.max_turns {"user_message", "bot_response"} dicts
+    """
+    turns = cache.get(session_id)
+    if turns is None:
+        page, _ = await fetch_history(db, session_id, limit=cache.max_turns)
+        turns = [
+            {"user_message": turn["user_message"], "bot_response": turn["bot_response"]}
+            for turn in reversed(page)
+        ]
+        cache.set(session_id, turns)
+    return turns
+
+
+_conversation_cache: Optional[ConversationCache] = None
+
+
+def get_conversation_cache() -> ConversationCache:
+    """
+    Return the process-wide ConversationCache configured from the environment.
+
+    Returns:
+        Shared ConversationCache
+    """
+    global _conversation_cache
+    if _conversation_cache is None:
+        _conversation_cache = ConversationCache(
+            max_sessions=int(os.getenv("CONVERSATION_CACHE_SESSIONS", "10000")),
+            max_turns=int(os.getenv("CONVERSATION_CACHE_TURNS", "10")),
+            ttl=float(os.getenv("CONVERSATION_CACHE_TTL", "1800"))
+        )
+    return _conversation_cache
@@ -0,0 +1,59 @@
+"""
+HTTP client module providing a shared, pooled async client for outbound calls.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create an AsyncClient configured from the environment."""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    timeout = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT", "10")))
+    return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client, creating it on first use.
+
+    Pooled connections belong to the event loop that opened them, so a new
+    client is created if the caller runs on a different loop than the one
+    the current client was built on.
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _client, _client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    if _client is None or _client.is_closed or (
+        loop is not None and _client_loop is not None and loop is not _client_loop
+    ):
+        _client = _build_client()
+        _client_loop = loop
+    elif _client_loop is None:
+        _client_loop = loop
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and release its pooled connections."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
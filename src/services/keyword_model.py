@@ -0,0 +1,187 @@
+"""
+Keyword model module providing TF-IDF keyword extraction with an IDF table
+fitted offline on a corpus and loaded read-only at runtime.
+
+Fit a model from stored chat history with:
+    python -m src.services.keyword_model models/keywords.npz
+"""
+
+import re
+import sys
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Same tokenization as TfidfVectorizer's defaults.
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+class KeywordModel:
+    """
+    Read-only TF-IDF keyword scorer.
+
+    Terms are scored as raw term frequency times the fitted IDF; terms that
+    were not seen during fitting get the IDF of a term with zero document
+    frequency. The model holds no per-call state and is safe to share
+    across threads.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray, default_idf: float = 1.0):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.default_idf = default_idf
+
+    @classmethod
+    def uniform(cls) -> "KeywordModel":
+        """Model without corpus statistics; ranks terms by frequency alone."""
+        return cls({}, np.empty(0), 1.0)
+
+    @classmethod
+    def fit(cls, documents: Iterable[str]) -> "KeywordModel":
+        """
+        Fit the IDF table on a corpus.
+
+        Args:
+            documents: Corpus texts, e.g. stored user messages
+
+        Returns:
+            Fitted KeywordModel
+        """
+        documents = list(documents)
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit(documents)
+        # With smooth_idf an unseen term has idf = ln((n + 1) / 1) + 1.
+        default_idf = float(np.log(len(documents) + 1) + 1)
+        return cls(dict(vectorizer.vocabulary_), vectorizer.idf_.astype(np.float32), default_idf)
+
+    @classmethod
+    def load(cls, path: str) -> "KeywordModel":
+        """Load a model saved with save()."""
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            return cls(
+                {term: index for index, term in enumerate(terms)},
+                data["idf"],
+                float(data["default_idf"])
+            )
+
+    def save(self, path: str) -> None:
+        """Save the vocabulary and IDF table as a NumPy archive."""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez(
+            path,
+            terms=np.array(terms, dtype=str),
+            idf=self.idf,
+            default_idf=np.float64(self.default_idf)
+        )
+
+    def term_idf(self, terms: List[str]) -> np.ndarray:
+        """Look up the IDF of each term."""
+        vocabulary, idf, default = self.vocabulary, self.idf, self.default_idf
+        return np.fromiter(
+            (idf[vocabulary[t]] if t in vocabulary else default for t in terms),
+            dtype=np.float64,
+            count=len(terms)
+        )
+
+    def extract(self, text: str, top_n: int = 5) -> List[str]:
+        """
+        Return the top_n highest scoring terms of a text.
+
+        Args:
+            text: Input text
+            top_n: Number of keywords to return
+
+        Returns:
+            Keywords ordered by descending score, ties broken like the
+            previous per-call TfidfVectorizer implementation
+        """
+        counts = Counter(TOKEN_PATTERN.findall(text.lower()))
+        if not counts or top_n <= 0:
+            return []
+        terms = list(counts)
+        scores = np.fromiter(counts.values(), dtype=np.float64, count=len(terms))
+        scores *= self.term_idf(terms)
+        return self.top_terms(terms, scores, top_n)
+
+    def extract_batch(self, texts: List[str], top_n: int = 5) -> List[List[str]]:
+        """
+        Return the top_n keywords of each text, scoring the whole batch as
+        one sparse term-count matrix.
+
+        Args:
+            texts: Input texts
+            top_n: Number of keywords per text
+
+        Returns:
+            One keyword list per text, equal to extract() on each text
+        """
+        columns: Dict[str, int] = {}
+        indices: List[int] = []
+        indptr = [0]
+        for text in texts:
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                indices.append(columns.setdefault(token, len(columns)))
+            indptr.append(len(indices))
+
+        terms = list(columns)
+        counts = csr_matrix(
+            (np.ones(len(indices)), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(texts), len(terms))
+        )
+        counts.sum_duplicates()
+        counts.data *= self.term_idf(terms)[counts.indices]
+
+        keywords = []
+        for row in range(len(texts)):
+            start, end = counts.indptr[row], counts.indptr[row + 1]
+            if start == end or top_n <= 0:
+                keywords.append([])
+                continue
+            row_terms = [terms[i] for i in counts.indices[start:end]]
+            keywords.append(self.top_terms(row_terms, counts.data[start:end], top_n))
+        return keywords
+
+    @staticmethod
+    def top_terms(terms: List[str], scores: np.ndarray, top_n: int) -> List[str]:
+        """Select the top_n terms by score using a partial sort."""
+        if len(terms) > top_n:
+            # Keep every term tied with the cut-off score so ties resolve
+            # the same way as a full sort would.
+            cutoff = np.partition(scores, len(scores) - top_n)[len(scores) - top_n]
+            candidates = np.flatnonzero(scores >= cutoff)
+        else:
+            candidates = range(len(terms))
+        ranked = sorted(((scores[i], terms[i]) for i in candidates), reverse=True)
+        return [term for _, term in ranked[:top_n]]
+
+
+def load_keyword_model(path: Optional[str]) -> KeywordModel:
+    """Load the model at path, or a uniform model if no path is configured."""
+    return KeywordModel.load(path) if path else KeywordModel.uniform()
+
+
+def fit_from_chat_history(output_path: str) -> KeywordModel:
+    """Fit a model on every stored user message and save it."""
+    from src.database.config import SessionLocal
+    from src.models.chat import Chat
+
+    db = SessionLocal()
+    try:
+        messages = [message for (message,) in db.query(Chat.user_message) if message]
+    finally:
+        db.close()
+
+    model = KeywordModel.fit(messages)
+    model.save(output_path)
+    return model
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python -m src.services.keyword_model OUTPUT.npz")
+    fitted = fit_from_chat_history(sys.argv[1])
+    print(f"Fitted {len(fitted.vocabulary)} terms")
@@ -0,0 +1,299 @@
+"""
+Metrics module providing lightweight counters, gauges and histograms
+rendered in the Prometheus text exposition format.
+
+Recording a sample is a dict lookup and an addition under an uncontended
+lock, cheap enough to leave on for every request. Component counters that
+already exist as stats() dicts (caches, executor, writer) are not
+duplicated: they are read through collectors when /metrics is scraped.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PREFIX = "chatbot"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_INVALID_NAME = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Render {name="value",...}, or an empty string without labels."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, using integers where exact."""
+    if value == int(value) and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for a named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterator[str]:
+        """Yield the sample lines of the metric."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Render HELP, TYPE and sample lines."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples()
+        ]
+
+
+class Counter(Metric):
+    """Monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Add amount to the series of the given label values."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Return the current count of a series."""
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label combination."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the series of the given label values."""
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: non-cumulative bucket counts (last is +Inf), sum, count.
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one value in the series of the given label values."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        """Observe the duration of the with block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def snapshot(self, *labels: str) -> Dict[str, float]:
+        """Return the count and sum of a series."""
+        with self._lock:
+            series = self._series.get(labels)
+            return {"count": series[2], "sum": series[1]} if series else {"count": 0, "sum": 0.0}
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            ]
+        for labels, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}"
+
+
+class MetricsRegistry:
+    """Set of metrics and stats collectors rendered together."""
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        """Add a metric, returning the existing one if the name is taken."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create or return the counter prefix_name."""
+        return self._register(Counter(f"{self.prefix}_{name}", documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Create or return the gauge prefix_name."""
+        return self._register(Gauge(f"{self.prefix}_{name}", documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create or return the histogram prefix_name."""
+        return self._register(Histogram(f"{self.prefix}_{name}", documentation, labelnames, buckets))
+
+    def register_collector(self, component: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Expose a component's stats() dict on every scrape.
+
+        Each numeric value becomes the gauge prefix_component_key; other
+        values are skipped.
+
+        Args:
+            component: Component name, e.g. "search_cache"
+            collect: Callable returning the component's stats
+        """
+        with self._lock:
+            self._collectors[component] = collect
+
+    def _collected(self) -> Iterator[str]:
+        """Render the gauges of every collector."""
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for component, collect in collectors:
+            for key, value in collect().items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                name = _INVALID_NAME.sub("_", f"{self.prefix}_{component}_{key}")
+                yield f"# TYPE {name} gauge"
+                yield f"{name} {_format_value(value)}"
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.extend(self._collected())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "HTTP request duration by route and status.",
+    ("method", "route", "status")
+)
+RESPONSE_STAGE_SECONDS = REGISTRY.histogram(
+    "response_stage_seconds", "Duration of chat response stages.", ("stage",)
+)
+NLP_CALL_SECONDS = REGISTRY.histogram(
+    "nlp_call_seconds", "NLPProcessor call duration including executor queueing.", ("method",)
+)
+NLP_STAGE_SECONDS = REGISTRY.histogram(
+    "nlp_stage_seconds", "Duration of context analysis steps inside get_context.", ("stage",)
+)
+SEARCH_CACHE_MISSES = REGISTRY.counter(
+    "search_cache_misses_total", "Search memory-cache misses by the tier that served them.", ("tier",)
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total", "Upstream search calls by provider and outcome.", ("provider", "outcome")
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_seconds", "Successful upstream search call duration.", ("provider",)
+)
+SEARCH_FALLBACKS = REGISTRY.counter(
+    "search_fallbacks_total", "Providers started after the primary one, by strategy.", ("strategy",)
+)
+SEARCH_REFRESHES = REGISTRY.counter(
+    "search_refreshes_total", "Background search cache refreshes by outcome.", ("outcome",)
+)
+DB_COMMIT_SECONDS = REGISTRY.histogram(
+    "db_commit_seconds", "Duration of chat history writes.", ("path",)
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay of event loop wake-ups beyond their scheduled time.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+EVENT_LOOP_LAG_LATEST = REGISTRY.gauge(
+    "event_loop_lag_latest_seconds", "Most recent event loop lag measurement."
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide MetricsRegistry."""
+    return REGISTRY
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """
+    Measure event loop lag until cancelled.
+
+    The task sleeps for interval and records how much later than scheduled
+    it woke up; a blocked loop shows up as lag.
+
+    Args:
+        interval: Seconds between measurements
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        EVENT_LOOP_LAG_LATEST.set(lag)
@@ -0,0 +1,178 @@
+"""
+NLP executor module for running CPU-bound NLP work off the event loop.
+
+NLPProcessor calls are dispatched to a thread or process pool whose workers
+hold warm NLTK models, so async handlers await the result instead of
+blocking the loop. A bound on pending calls provides backpressure.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import nltk
+
+from src.services.metrics import NLP_CALL_SECONDS
+from src.services.nlp_service import get_nlp_processor
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+
+class NLPOverloadedError(Exception):
+    """Raised when too many NLP calls are already pending."""
+
+
+def _init_worker(data_path: Optional[List[str]] = None) -> None:
+    """
+    Load NLTK models once when a pool worker starts.
+
+    Args:
+        data_path: The parent's nltk.data.path; spawned processes do not
+            inherit directories added at runtime, e.g. NLTK_DATA_DIR
+    """
+    for directory in reversed(data_path or ()):
+        if directory not in nltk.data.path:
+            nltk.data.path.insert(0, directory)
+    try:
+        get_nlp_processor().warm_up()
+    except LookupError:
+        logger.exception("NLP worker could not load NLTK resources")
+
+
+def _call(method: str, args: tuple) -> Any:
+    """Invoke an NLPProcessor method on the worker's shared processor."""
+    return getattr(get_nlp_processor(), method)(*args)
+
+
+class NLPExecutor:
+    """
+    Run NLPProcessor methods in a thread or process pool.
+
+    Modes:
+        inline: run on the calling thread (no offloading)
+        thread: run in a thread pool; frees the event loop
+        process: run in a process pool; also uses several cores
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: Optional[int] = None,
+        max_pending: int = 64
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown NLP executor mode: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """Create the worker pool; workers load NLTK models as they start."""
+        if self._executor is not None or self.mode == "inline":
+            return
+        if self.mode == "process":
+            context = multiprocessing.get_context(os.getenv("NLP_PROCESS_START_METHOD", "spawn"))
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(list(nltk.data.path),)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="nlp",
+                initializer=_init_worker
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling calls that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, method: str, *args: Any) -> Any:
+        """
+        Run an NLPProcessor method and await its result.
+
+        Args:
+            method: Name of the NLPProcessor method
+            *args: Positional arguments for the method
+
+        Returns:
+            The method's return value
+
+        Raises:
+            NLPOverloadedError: If max_pending calls are already queued or running
+        """
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise NLPOverloadedError(f"{self.pending} NLP calls pending")
+
+        self.pending += 1
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            if self.mode == "inline":
+                result = _call(method, args)
+            else:
+                self.start()
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, _call, method, args)
+            succeeded = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - started
+            self.pending -= 1
+            if succeeded:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.busy_seconds += elapsed
+            NLP_CALL_SECONDS.observe(elapsed, method)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool configuration and queue counters."""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "busy_seconds": self.busy_seconds
+        }
+
+
+_executor: Optional[NLPExecutor] = None
+
+
+def get_nlp_executor() -> NLPExecutor:
+    """
+    Return the process-wide NLPExecutor configured from the environment.
+
+    Returns:
+        Shared NLPExecutor
+    """
+    global _executor
+    if _executor is None:
+        workers = os.getenv("NLP_WORKERS")
+        _executor = NLPExecutor(
+            mode=os.getenv("NLP_EXECUTOR", "thread"),
+            workers=int(workers) if workers else None,
+            max_pending=int(os.getenv("NLP_MAX_PENDING", "64"))
+        )
+    return _executor
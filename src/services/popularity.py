@@ -0,0 +1,133 @@
+"""
+Popularity module for tracking the most frequently requested keys in
+bounded memory.
+
+A count-min sketch estimates how often every key was seen, and a small
+table keeps the k keys with the highest estimates. Counts are halved by
+decay() so the ranking follows recent traffic rather than all-time
+totals.
+"""
+
+import threading
+import zlib
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class CountMinSketch:
+    """
+    Approximate counts over an unbounded key space.
+
+    Estimates never undercount; with width w and depth d they overcount
+    by more than 2N/w with probability at most 2^-d, for N total counts.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._table = [[0] * width for _ in range(depth)]
+
+    def _columns(self, key: Hashable) -> List[int]:
+        """Column of key in each row, by double hashing two checksums."""
+        data = str(key).encode()
+        first = zlib.crc32(data)
+        second = zlib.adler32(data) | 1
+        return [(first + row * second) % self.width for row in range(self.depth)]
+
+    def add(self, key: Hashable, count: int = 1) -> int:
+        """
+        Count key and return its new estimate.
+
+        Args:
+            key: Key to count
+            count: Number of occurrences
+
+        Returns:
+            Estimated count of key
+        """
+        estimate = None
+        for row, column in zip(self._table, self._columns(key)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def estimate(self, key: Hashable) -> int:
+        """Return the estimated count of key."""
+        return min(row[column] for row, column in zip(self._table, self._columns(key)))
+
+    def decay(self) -> None:
+        """Halve every count."""
+        self._table = [[count >> 1 for count in row] for row in self._table]
+
+
+class HeavyHitters:
+    """
+    The k most frequent keys by count-min estimate, each with the payload
+    recorded with its latest occurrence.
+    """
+
+    def __init__(self, k: int = 256, width: int = 4096, depth: int = 4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self._top: Dict[Hashable, Tuple[int, Any]] = {}
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._top)
+
+    def record(self, key: Hashable, payload: Any = None) -> int:
+        """
+        Count one occurrence of key.
+
+        Args:
+            key: Key that was requested
+            payload: Data to keep with key while it is among the top k
+
+        Returns:
+            Estimated count of key
+        """
+        with self._lock:
+            estimate = self.sketch.add(key)
+            if key in self._top or len(self._top) < self.k:
+                self._top[key] = (estimate, payload)
+            elif estimate > self._floor:
+                # Tracked counts only grow between decays, so _floor is a
+                # lower bound of the coldest count and the O(k) scan only
+                # runs for keys that may overtake it.
+                coldest = min(self._top, key=lambda tracked: self._top[tracked][0])
+                if estimate > self._top[coldest][0]:
+                    del self._top[coldest]
+                    self._top[key] = (estimate, payload)
+                self._floor = min(count for count, _ in self._top.values())
+            return estimate
+
+    def top(self, n: Optional[int] = None, min_count: int = 1) -> List[Tuple[Hashable, int, Any]]:
+        """
+        Return tracked keys, most frequent first.
+
+        Args:
+            n: Maximum number of keys to return
+            min_count: Only return keys estimated at least this often
+
+        Returns:
+            (key, estimated count, payload) tuples
+        """
+        with self._lock:
+            ranked = sorted(
+                ((key, count, payload) for key, (count, payload) in self._top.items() if count >= min_count),
+                key=lambda item: item[1],
+                reverse=True
+            )
+        return ranked[:n] if n is not None else ranked
+
+    def decay(self) -> None:
+        """Halve all counts, forgetting tracked keys whose count drops to zero."""
+        with self._lock:
+            self.sketch.decay()
+            self._top = {
+                key: (count >> 1, payload)
+                for key, (count, payload) in self._top.items()
+                if count >> 1
+            }
+            self._floor = min((count for count, _ in self._top.values()), default=0)
@@ -0,0 +1,168 @@
+"""
+Profiler module providing a sampling profiler that can be switched on and
+off while the application runs.
+
+A background thread periodically captures the Python stack of every other
+thread, so the event loop and NLP worker threads are profiled without
+tracing overhead on each call. Samples are aggregated as collapsed stacks
+("frame;frame;frame count"), the input format of flame graph tools. Stacks
+sampled while a slow request was in flight are kept per request; they
+include any concurrent requests as well.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def _frame_name(frame) -> str:
+    """Describe a frame as function (file:line)."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Periodically sample the stacks of all threads.
+
+    Attributes:
+        interval: Seconds between samples
+        slow_request_seconds: Requests at least this slow keep their samples
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        max_samples: int = 100000,
+        slow_request_seconds: float = 1.0,
+        max_slow_requests: int = 20
+    ):
+        self.interval = interval
+        self.slow_request_seconds = slow_request_seconds
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=max_samples)
+        self._slow_requests: Deque[Dict] = deque(maxlen=max_slow_requests)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the sampler thread is active."""
+        return self._thread is not None
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Start sampling, discarding samples of a previous run.
+
+        Args:
+            interval: Seconds between samples; keeps the current interval if None
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+            if interval is not None:
+                self.interval = interval
+            self._samples.clear()
+            self._slow_requests.clear()
+            self._stop.clear()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; collected samples remain available."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _run(self) -> None:
+        """Sampler thread body."""
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+                if thread_id == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    frames.append(_frame_name(frame))
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self._samples.append((now, ";".join(reversed(frames))))
+
+    def collapsed(self, start: Optional[float] = None, end: Optional[float] = None) -> str:
+        """
+        Aggregate samples as collapsed stacks, most frequent first.
+
+        Args:
+            start: Only include samples taken at or after this perf_counter time
+            end: Only include samples taken at or before this perf_counter time
+
+        Returns:
+            One "stack count" line per distinct stack
+        """
+        counts = Counter(
+            stack for taken, stack in list(self._samples)
+            if (start is None or taken >= start) and (end is None or taken <= end)
+        )
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def record_request(self, method: str, path: str, started: float, finished: float) -> None:
+        """
+        Keep the samples of a request if it was slow.
+
+        Args:
+            method: HTTP method
+            path: Request path
+            started: perf_counter time the request started
+            finished: perf_counter time the request finished
+        """
+        seconds = finished - started
+        if not self.running or seconds < self.slow_request_seconds:
+            return
+        self._slow_requests.append({
+            "method": method,
+            "path": path,
+            "seconds": seconds,
+            "stacks": self.collapsed(started, finished)
+        })
+
+    def slow_requests(self) -> List[Dict]:
+        """Return the kept slow requests, oldest first."""
+        return list(self._slow_requests)
+
+    def stats(self) -> Dict:
+        """Return profiler state."""
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": len(self._samples),
+            "slow_requests": len(self._slow_requests),
+            "slow_request_seconds": self.slow_request_seconds
+        }
+
+
+_profiler: Optional[SamplingProfiler] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """
+    Return the process-wide SamplingProfiler configured from the environment.
+
+    Returns:
+        Shared SamplingProfiler, initially stopped
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(
+            interval=float(os.getenv("PROFILER_INTERVAL", "0.005")),
+            slow_request_seconds=float(os.getenv("PROFILER_SLOW_REQUEST_SECONDS", "1.0"))
+        )
+    return _profiler
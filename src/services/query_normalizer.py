@@ -0,0 +1,166 @@
+"""
+Query normalization module for building search cache keys.
+Folds equivalent phrasings of a query onto one key and finds cached
+near-duplicates of paraphrased queries.
+"""
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from src.services.nlp_service import NLPProcessor, get_nlp_processor
+
+logger = logging.getLogger(__name__)
+
+NORMALIZATION_MODES = ("fold", "lemma", "sorted")
+
+
+class QueryNormalizer:
+    """
+    Normalize search queries into cache keys.
+
+    Modes:
+        fold: lowercase and collapse whitespace
+        lemma: fold, then drop stopwords and lemmatize via NLPProcessor
+        sorted: lemma, then deduplicate and sort the keywords
+
+    The lemma and sorted modes fall back to fold when the NLTK resources
+    they need are missing.
+    """
+
+    def __init__(self, mode: str = "lemma", nlp_processor: Optional[NLPProcessor] = None):
+        if mode not in NORMALIZATION_MODES:
+            raise ValueError(f"Unknown normalization mode: {mode}")
+        self.mode = mode
+        self._nlp_processor = nlp_processor
+        self.fallbacks = 0
+
+    @property
+    def nlp_processor(self) -> NLPProcessor:
+        """NLP processor used for stopword removal and lemmatization."""
+        return self._nlp_processor or get_nlp_processor()
+
+    def normalize(self, query: str) -> str:
+        """
+        Normalize a query string.
+
+        Args:
+            query: Raw search query
+
+        Returns:
+            Normalized query; falls back to the folded query when no
+            keywords remain after stopword removal or NLTK data is missing
+        """
+        folded = " ".join(query.lower().split())
+        if self.mode == "fold":
+            return folded
+
+        try:
+            words = self.nlp_processor.tokenize_text(folded)["words"]
+        except LookupError:
+            if not self.fallbacks:
+                logger.warning("NLTK resources missing; %s cache keys fall back to fold", self.mode)
+            self.fallbacks += 1
+            return folded
+        if not words:
+            return folded
+        if self.mode == "sorted":
+            words = sorted(set(words))
+        return " ".join(words)
+
+
+class SimilarityIndex:
+    """
+    Bounded inverted index over normalized cache keys for near-duplicate
+    lookup by IDF-weighted cosine similarity of their keyword sets.
+    """
+
+    def __init__(self, threshold: float = 0.8, max_keys: int = 10000):
+        self.threshold = threshold
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, Tuple[int, Set[str]]]" = OrderedDict()
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str, normalized_query: str, num_results: int) -> None:
+        """
+        Register a cached key.
+
+        Args:
+            key: Cache key the results are stored under
+            normalized_query: Normalized query text for the key
+            num_results: Number of results stored under the key
+        """
+        terms = set(normalized_query.split())
+        if not terms:
+            return
+        with self._lock:
+            if key in self._keys:
+                self._remove(key)
+            self._keys[key] = (num_results, terms)
+            for term in terms:
+                self._postings.setdefault(term, set()).add(key)
+            while len(self._keys) > self.max_keys:
+                self._remove(next(iter(self._keys)))
+
+    def discard(self, key: str) -> None:
+        """Forget a key, e.g. after it was evicted from the cache."""
+        with self._lock:
+            if key in self._keys:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        """Remove a key from the index; caller must hold the lock."""
+        _, terms = self._keys.pop(key)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._postings[term]
+
+    def _idf(self, term: str) -> float:
+        """Smoothed inverse document frequency of a term across indexed keys."""
+        df = len(self._postings.get(term, ()))
+        return math.log((len(self._keys) + 1) / (df + 1)) + 1
+
+    def lookup(self, normalized_query: str, num_results: int) -> Optional[str]:
+        """
+        Find the most similar indexed key above the threshold.
+
+        Args:
+            normalized_query: Normalized query text to match
+            num_results: Only keys holding this many results are considered
+
+        Returns:
+            Best matching cache key or None
+        """
+        terms = set(normalized_query.split())
+        if not terms:
+            return None
+
+        with self._lock:
+            weights = {term: self._idf(term) for term in terms}
+            query_norm = math.sqrt(sum(w * w for w in weights.values()))
+            candidates = set()
+            for term in terms:
+                candidates.update(self._postings.get(term, ()))
+
+            best_key, best_score = None, self.threshold
+            for candidate in candidates:
+                candidate_num, candidate_terms = self._keys[candidate]
+                if candidate_num != num_results:
+                    continue
+                dot = sum(weights[t] ** 2 for t in terms & candidate_terms)
+                candidate_norm = math.sqrt(
+                    sum(self._idf(t) ** 2 for t in candidate_terms)
+                )
+                score = dot / (query_norm * candidate_norm)
+                if score >= best_score:
+                    best_key, best_score = candidate, score
+            return best_key
@@ -2,55 +2,307 @@
 Response service module for generating chatbot responses.
 """
 
-from typing import Dict
-from src.services.nlp_service import NLPProcessor
+import asyncio
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Tuple
+from src.services.answer_index import AnswerIndex, get_answer_index
+from src.services.metrics import NLP_STAGE_SECONDS, RESPONSE_STAGE_SECONDS
+from src.services.nlp_executor import NLPExecutor, get_nlp_executor
+from src.services.nlp_service import NLPProcessor, get_nlp_processor
 from src.services.search_service import SearchService
 
+NO_RESULTS_RESPONSE = "I apologize, but I couldn't find relevant information."
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+# Marks a message that continues the previous one: a leading conjunction,
+# a pronoun pointing back at the earlier topic, or an ellipsis.
+_FOLLOW_UP = re.compile(
+    r"^\W*(?:and|or|but|also|what about|how about)\b"
+    r"|\b(?:it|its|that|this|these|those|they|them|their)\b"
+    r"|\.\.\.|\u2026",
+    re.IGNORECASE
+)
+
+
+def _stage_timeout(name: str) -> Optional[float]:
+    """Read an optional per-stage timeout in seconds from the environment."""
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+def _record_context_timings(context: Optional[Dict]) -> None:
+    """Export the step timings measured by get_context(), which may have run in a worker process."""
+    if context:
+        for step, seconds in context.get("timings", {}).items():
+            NLP_STAGE_SECONDS.observe(seconds, step)
+
+def _chunk_events(response: str) -> Iterator[Dict]:
+    """Split a response into one chunk event per sentence."""
+    for sentence in _SENTENCE_BREAK.split(response):
+        if sentence:
+            yield {"event": "chunk", "data": sentence}
+
 class ResponseGenerator:
     """Service for generating coherent chatbot responses."""
 
-    def __init__(self):
-        """Initialize NLP and Search services."""
-        self.nlp_processor = NLPProcessor()
-        self.search_service = SearchService()
+    def __init__(
+        self,
+        nlp_processor: Optional[NLPProcessor] = None,
+        search_service: Optional[SearchService] = None,
+        nlp_executor: Optional[NLPExecutor] = None,
+        answer_index: Optional[AnswerIndex] = None
+    ):
+        """Initialize NLP and Search services, sharing the process-wide NLP processor."""
+        self.nlp_processor = nlp_processor or get_nlp_processor()
+        self.search_service = search_service or SearchService()
+        self.nlp_executor = nlp_executor or get_nlp_executor()
+        self.response_budget = float(os.getenv("RESPONSE_BUDGET_SECONDS", "15"))
+        self.context_timeout = _stage_timeout("RESPONSE_CONTEXT_TIMEOUT")
+        self.search_timeout = _stage_timeout("RESPONSE_SEARCH_TIMEOUT")
+        self.humanize_timeout = _stage_timeout("RESPONSE_HUMANIZE_TIMEOUT")
+        self.follow_up_max_words = int(os.getenv("RESPONSE_FOLLOW_UP_MAX_WORDS", "0"))
+        self.answer_index = answer_index if answer_index is not None else get_answer_index()
+        self.answer_threshold = float(os.getenv("ANSWER_INDEX_THRESHOLD", "0.9"))
+        # Stored answers older than this are not served; search results drift.
+        self.answer_max_age = float(os.getenv("ANSWER_INDEX_TTL", "86400"))
 
-    async def generate_response(self, user_query: str) -> Dict:
+    def search_query(self, user_query: str, history: Optional[List[Dict]] = None) -> str:
+        """
+        Build the search query for a message in the context of its session.
+
+        Short follow-up messages ("and in Java?") say little on their own,
+        so they can be searched together with the previous user message.
+        This is off unless RESPONSE_FOLLOW_UP_MAX_WORDS is set, and then
+        applies only to messages of at most that many words that read as
+        a follow-up: starting with "and", "or", "what about" and the like,
+        referring back with a pronoun such as "it" or "those", or
+        containing an ellipsis. Other short messages are searched as is.
+
+        Args:
+            user_query: User's input message
+            history: Prior turns of the session, oldest first
+
+        Returns:
+            Query to send to the search service
+        """
+        if (
+            history
+            and len(user_query.split()) <= self.follow_up_max_words
+            and _FOLLOW_UP.search(user_query)
+        ):
+            return f"{history[-1]['user_message']} {user_query}"
+        return user_query
+
+    @staticmethod
+    async def _timed(name: str, stage: Awaitable[Any], timings: Dict[str, float]) -> Any:
+        """Await a stage, recording its duration even if it is cancelled."""
+        started = time.perf_counter()
+        try:
+            return await stage
+        finally:
+            timings[name] = time.perf_counter() - started
+            RESPONSE_STAGE_SECONDS.observe(timings[name], name)
+
+    @staticmethod
+    async def _run_stage(
+        stage: Awaitable[Any],
+        timeout: Optional[float],
+        started: float,
+        deadline: float
+    ) -> Tuple[Any, bool]:
+        """
+        Await one pipeline stage within its own timeout and the overall deadline.
+
+        Args:
+            stage: Awaitable or task running the stage
+            timeout: Stage timeout in seconds, or None for no stage limit
+            started: perf_counter() value when the stage started
+            deadline: perf_counter() value when the overall budget runs out
+
+        Returns:
+            (result, completed); result is None if the stage timed out
+        """
+        if timeout is not None:
+            deadline = min(deadline, started + timeout)
+        try:
+            return await asyncio.wait_for(stage, max(0.0, deadline - time.perf_counter())), True
+        except asyncio.TimeoutError:
+            return None, False
+
+    async def generate_response(
+        self,
+        user_query: str,
+        history: Optional[List[Dict]] = None
+    ) -> Dict:
         """
         Generate a response based on user query.
 
+        A question close enough to one answered before is served from the
+        answer index without NLP or search. Otherwise NLP analysis and
+        search are independent and run concurrently; the humanize stage
+        starts once the search results are in. Each stage
+        has its own timeout and all share the overall response budget. A
+        stage that runs out of time is dropped instead of failing the
+        request: the context becomes None, the sources become empty, or
+        the raw snippets are returned without humanizing.
+
         Args:
             user_query: User's input message
+            history: Prior turns of the session, oldest first
 
         Returns:
-            Dict containing response, context, and sources
+            Dict containing response, context, sources and metadata with
+            per-stage timings and the names of stages that timed out
         """
-        context = self.nlp_processor.get_context(user_query)
-        search_results = await self.search_service.aggregate_search_results(
-            user_query,
-            num_results=3
-        )
+        started = time.perf_counter()
+        deadline = started + self.response_budget
+        timings: Dict[str, float] = {}
+        partial: List[str] = []
+        query = self.search_query(user_query, history)
+
+        if self.answer_index is not None:
+            match = await self._timed(
+                "local_answer",
+                asyncio.to_thread(
+                    self.answer_index.best_match, query, self.answer_threshold, self.answer_max_age
+                ),
+                timings
+            )
+            if match is not None:
+                timings["total"] = time.perf_counter() - started
+                return {
+                    "response": match["answer"],
+                    "context": None,
+                    "sources": [],
+                    "metadata": {
+                        "timings": timings,
+                        "partial": partial,
+                        "local_answer": {"score": match["score"], "question": match["question"]}
+                    }
+                }
+
+        # Start the I/O-bound search first so its requests are in flight
+        # while the NLP stage occupies a worker (or the loop, when inline).
+        search_task = asyncio.create_task(self._timed(
+            "search",
+            self.search_service.aggregate_search_results(query, num_results=3),
+            timings
+        ))
+        context_task = asyncio.create_task(self._timed(
+            "context", self.nlp_executor.run("get_context", user_query), timings
+        ))
+        try:
+            search_results, searched = await self._run_stage(
+                search_task, self.search_timeout, started, deadline
+            )
+            context, analyzed = await self._run_stage(
+                context_task, self.context_timeout, started, deadline
+            )
+        finally:
+            for task in (search_task, context_task):
+                task.cancel()
+        _record_context_timings(context)
+        if not analyzed:
+            partial.append("context")
+        if not searched:
+            partial.append("search")
+
+        def metadata() -> Dict:
+            timings["total"] = time.perf_counter() - started
+            return {"timings": timings, "partial": partial}
 
         if not search_results:
             return {
-                "response": "I apologize, but I couldn't find relevant information.",
+                "response": NO_RESULTS_RESPONSE,
                 "context": context,
-                "sources": []
+                "sources": [],
+                "metadata": metadata()
             }
 
-        combined_info = ""
-        sources = []
+        combined_info = " ".join(result.snippet for result in search_results)
+        sources = [{"title": result.title, "link": result.link} for result in search_results]
 
-        for result in search_results:
-            combined_info += f"{result['snippet']} "
-            sources.append({
-                "title": result['title'],
-                "link": result['link']
-            })
-
-        response = self.nlp_processor.humanize_response(combined_info)
+        response, humanized = await self._run_stage(
+            self._timed(
+                "humanize", self.nlp_executor.run("humanize_response", combined_info), timings
+            ),
+            self.humanize_timeout,
+            time.perf_counter(),
+            deadline
+        )
+        if not humanized:
+            partial.append("humanize")
+            response = combined_info.strip()
+        elif self.answer_index is not None and not partial:
+            await asyncio.to_thread(self.answer_index.add, query, response)
 
         return {
             "response": response,
             "context": context,
-            "sources": sources
-        }
\ No newline at end of file
+            "sources": sources,
+            "metadata": metadata()
+        }
+
+    async def stream_response(
+        self,
+        user_query: str,
+        history: Optional[List[Dict]] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Generate a response to user query as a stream of events.
+
+        Events are dicts with an "event" name and "data" payload, emitted
+        in this order:
+            context: NLP context of the query
+            source: one {"title", "link"} per search result as it arrives
+            chunk: one humanized response sentence at a time
+            done: the complete {"response", "sources"}, as returned by
+                generate_response()
+
+        A question answered from the answer index skips the NLP and search
+        stages: its context event carries None and no source events follow.
+
+        Args:
+            user_query: User's input message
+            history: Prior turns of the session, oldest first
+
+        Yields:
+            Stream events
+        """
+        search_query = self.search_query(user_query, history)
+        if self.answer_index is not None:
+            match = await asyncio.to_thread(
+                self.answer_index.best_match, search_query, self.answer_threshold, self.answer_max_age
+            )
+            if match is not None:
+                yield {"event": "context", "data": None}
+                for event in _chunk_events(match["answer"]):
+                    yield event
+                yield {"event": "done", "data": {"response": match["answer"], "sources": []}}
+                return
+
+        context = await self.nlp_executor.run("get_context", user_query)
+        _record_context_timings(context)
+        yield {"event": "context", "data": context}
+
+        snippets: List[str] = []
+        sources: List[Dict] = []
+        async for result in self.search_service.stream_search_results(search_query, num_results=3):
+            snippets.append(result.snippet)
+            source = {"title": result.title, "link": result.link}
+            sources.append(source)
+            yield {"event": "source", "data": source}
+
+        if sources:
+            response = await self.nlp_executor.run("humanize_response", " ".join(snippets))
+            if self.answer_index is not None:
+                await asyncio.to_thread(self.answer_index.add, search_query, response)
+        else:
+            response = NO_RESULTS_RESPONSE
+
+        for event in _chunk_events(response):
+            yield event
+
+        yield {"event": "done", "data": {"response": response, "sources": sources}}
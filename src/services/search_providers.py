@@ -0,0 +1,257 @@
+"""
+Search provider module defining the upstream search engines used by SearchService.
+"""
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from src.services.circuit_breaker import CircuitBreaker, get_breaker
+from src.services.token_bucket import refill, token_wait
+
+JsonGetter = Callable[[str, Dict[str, Any]], Awaitable[Dict]]
+
+
+class SearchProviderError(Exception):
+    """Raised when a provider fails to return usable results."""
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """
+    One search hit.
+
+    Results are immutable, so cached result lists are shared between
+    requests as-is, and slotted to keep thousands of cached lists small.
+    The provider name in source is interned so every result of a provider
+    refers to one string, including results decoded from the disk cache.
+    """
+
+    title: str
+    link: str
+    snippet: str
+    source: str
+
+    def __post_init__(self):
+        object.__setattr__(self, "source", sys.intern(self.source))
+
+    def to_dict(self) -> Dict[str, str]:
+        """Encode the result as a JSON-compatible dict."""
+        return {"title": self.title, "link": self.link, "snippet": self.snippet, "source": self.source}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "SearchResult":
+        """Decode a result encoded with to_dict()."""
+        return cls(data["title"], data["link"], data["snippet"], data["source"])
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies for percentile estimates."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Record one observed latency."""
+        self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """
+        Return the pct-th percentile of the window, or None if it is empty.
+
+        Args:
+            pct: Percentile between 0 and 100
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+class ProviderBudget:
+    """
+    Token-bucket budget of upstream calls per provider, for background
+    work that must not crowd out user requests.
+
+    Each provider gets burst calls up front and rate more per second.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, List[float]] = {}
+        self.spent: Dict[str, int] = {}
+
+    def _refill(self, provider: str) -> List[float]:
+        """Return the bucket of provider, topped up for the time elapsed."""
+        bucket = self._buckets.get(provider)
+        if bucket is None:
+            bucket = self._buckets[provider] = [self.burst, time.monotonic()]
+        return refill(bucket, self.rate, self.burst)
+
+    def available(self, provider: str) -> bool:
+        """Whether provider has budget for one more call."""
+        return self._refill(provider)[0] >= 1
+
+    def spend(self, provider: str) -> None:
+        """Charge one call to provider."""
+        self._refill(provider)[0] -= 1
+        self.spent[provider] = self.spent.get(provider, 0) + 1
+
+    def wait_time(self, providers: List[str]) -> float:
+        """
+        Seconds until any of providers has budget for a call; infinite if
+        none has budget left and the rate is 0.
+        """
+        return min((token_wait(self._refill(name), self.rate) for name in providers), default=0.0)
+
+
+class SearchProvider:
+    """Base class for an upstream search engine."""
+
+    name = "provider"
+
+    def __init__(self, get_json: JsonGetter, url: str, breaker: Optional[CircuitBreaker] = None):
+        self.get_json = get_json
+        self.url = url
+        self.latency = LatencyTracker()
+        self.breaker = breaker or get_breaker(self.name)
+
+    @property
+    def available(self) -> bool:
+        """Whether the provider is configured and can be queried."""
+        return True
+
+    async def search(self, query: str, num_results: int) -> List[SearchResult]:
+        """
+        Query the provider.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+
+        Returns:
+            List of search results, best first
+
+        Raises:
+            SearchProviderError: If the request fails or the response is unusable
+        """
+        raise NotImplementedError
+
+
+class GoogleSearchProvider(SearchProvider):
+    """Google Custom Search API provider."""
+
+    name = "google"
+
+    def __init__(self, get_json: JsonGetter, url: str, api_key: Optional[str], cx: Optional[str]):
+        super().__init__(get_json, url)
+        self.api_key = api_key
+        self.cx = cx
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key and self.cx)
+
+    async def search(self, query: str, num_results: int) -> List[SearchResult]:
+        params = {
+            'key': self.api_key,
+            'cx': self.cx,
+            'q': query,
+            'num': num_results
+        }
+        try:
+            results = await self.get_json(self.url, params)
+        except (httpx.HTTPError, ValueError) as e:
+            raise SearchProviderError(str(e)) from e
+
+        if 'items' not in results:
+            raise SearchProviderError("Google response contained no items")
+
+        return [SearchResult(
+            title=item.get('title', ''),
+            link=item.get('link', ''),
+            snippet=item.get('snippet', ''),
+            source=self.name
+        ) for item in results['items']]
+
+
+class DuckDuckGoSearchProvider(SearchProvider):
+    """DuckDuckGo Instant Answer API provider."""
+
+    name = "duckduckgo"
+
+    async def search(self, query: str, num_results: int) -> List[SearchResult]:
+        params = {'q': query, 'format': 'json'}
+        try:
+            data = await self.get_json(self.url, params)
+        except (httpx.HTTPError, ValueError) as e:
+            raise SearchProviderError(str(e)) from e
+
+        return [SearchResult(
+            title=result.get('Text', ''),
+            link=result.get('FirstURL', ''),
+            snippet=result.get('Text', ''),
+            source=self.name
+        ) for result in data.get('RelatedTopics', [])[:num_results]]
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize a result URL for deduplication across providers.
+
+    Args:
+        url: Result link
+
+    Returns:
+        URL without scheme or fragment, with a lowercased host, no leading
+        "www." and no trailing slash
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    return urlunsplit(("", host, path, parts.query, ""))
+
+
+def merge_ranked(result_lists: List[List[SearchResult]], limit: int) -> List[SearchResult]:
+    """
+    Merge per-provider result lists by rank, dropping duplicate URLs.
+
+    Results are interleaved rank by rank in provider priority order, so the
+    top result of every provider precedes the second result of any.
+
+    Args:
+        result_lists: Result lists in provider priority order
+        limit: Maximum number of results to return
+
+    Returns:
+        Merged list of results
+    """
+    merged: List[SearchResult] = []
+    seen = set()
+    depth = max((len(results) for results in result_lists), default=0)
+    for rank in range(depth):
+        for results in result_lists:
+            if rank >= len(results):
+                continue
+            result = results[rank]
+            key = normalize_url(result.link) if result.link else None
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            merged.append(result)
+            if len(merged) >= limit:
+                return merged
+    return merged
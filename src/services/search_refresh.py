@@ -0,0 +1,242 @@
+"""
+Search refresh module keeping popular queries in the search cache.
+
+SearchService records how often each cache key is requested in a
+HeavyHitters table. SearchRefresher periodically re-fetches the hottest
+keys shortly before they expire, so popular queries keep being served
+from memory instead of waiting on an upstream miss, and on startup it
+warms the cache from a file of known queries and recent chat history.
+
+Background fetches draw on a ProviderBudget so refreshing never uses
+more than a fixed rate of upstream calls per provider.
+"""
+
+import asyncio
+import functools
+import logging
+import math
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from src.services.metrics import SEARCH_REFRESHES
+from src.services.search_providers import ProviderBudget
+from src.services.search_service import SearchService
+
+logger = logging.getLogger(__name__)
+
+
+class SearchRefresher:
+    """
+    Refresh-ahead and warm-up of the search cache within an upstream budget.
+
+    Every interval seconds, keys requested at least min_hits times whose
+    cached results expire within refresh_ahead seconds (or already have)
+    are re-fetched, hottest first, until the budget runs out; requests
+    keep getting the cached results in the meantime. Popularity counts
+    are halved after each pass so the ranking follows recent traffic.
+    """
+
+    def __init__(
+        self,
+        service: SearchService,
+        budget: ProviderBudget,
+        interval: float = 60,
+        refresh_ahead: Optional[float] = None,
+        min_hits: int = 3,
+        top_k: int = 100
+    ):
+        self.service = service
+        self.budget = budget
+        self.interval = interval
+        self.refresh_ahead = interval * 2 if refresh_ahead is None else refresh_ahead
+        self.min_hits = min_hits
+        self.top_k = top_k
+        self.passes = 0
+        self.refreshes = 0
+        self.budget_skips = 0
+        self.warmed = 0
+
+    def _provider_names(self) -> List[str]:
+        """Names of the providers the service can query."""
+        return [provider.name for provider in self.service.providers if provider.available]
+
+    async def refresh_once(self) -> int:
+        """
+        Refresh popular keys that are about to expire, hottest first.
+
+        Refreshes run concurrently; each one is charged to the budget as
+        it starts, and the pass stops starting refreshes once no provider
+        has budget left.
+
+        Returns:
+            Number of keys refreshed
+        """
+        cache = self.service.cache
+        names = self._provider_names()
+        refreshing = []
+        for key, _, (query, num_results) in self.service.popularity.top(self.top_k, self.min_hits):
+            entry = cache.get_entry(key, count=False)
+            if entry is None or entry[1] is None or entry[1] > time.time() + self.refresh_ahead:
+                continue
+            if self.budget.wait_time(names) > 0:
+                self.budget_skips += 1
+                SEARCH_REFRESHES.inc("skipped_budget")
+                break
+            fetch = functools.partial(self.service.refresh, key, query, num_results, self.budget)
+            if cache.revalidate(key, fetch):
+                refreshing.append((query, cache.pending(key)))
+                # Let the refresh reach its upstream call, which spends
+                # budget, before the next key is checked against it.
+                await asyncio.sleep(0)
+
+        outcomes = await asyncio.gather(
+            *(asyncio.shield(future) for _, future in refreshing), return_exceptions=True
+        )
+        refreshed = 0
+        for (query, _), outcome in zip(refreshing, outcomes):
+            if isinstance(outcome, Exception):
+                SEARCH_REFRESHES.inc("failed")
+                logger.error("Failed to refresh search cache for %r: %s", query, outcome)
+            elif outcome:
+                refreshed += 1
+                SEARCH_REFRESHES.inc("refreshed")
+            else:
+                SEARCH_REFRESHES.inc("empty")
+        self.service.popularity.decay()
+        self.passes += 1
+        self.refreshes += refreshed
+        return refreshed
+
+    async def run(self) -> None:
+        """Refresh popular keys every interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh_once()
+            except Exception:
+                logger.exception("Search cache refresh pass failed")
+
+    async def warm_up(self, queries: List[str], num_results: int = 3) -> int:
+        """
+        Load queries into the cache one at a time, waiting for upstream
+        budget between fetches. Stops early if the budget has run out and
+        never refills (rate 0).
+
+        Args:
+            queries: Queries to warm, most important first
+            num_results: Number of results per query; chat responses use 3
+
+        Returns:
+            Number of queries loaded
+        """
+        names = self._provider_names()
+        warmed = 0
+        for position, query in enumerate(queries):
+            wait = self.budget.wait_time(names)
+            if math.isinf(wait):
+                logger.warning("Search warm-up budget exhausted; skipping %d queries", len(queries) - position)
+                break
+            await asyncio.sleep(wait)
+            try:
+                if await self.service.warm(query, num_results, self.budget):
+                    warmed += 1
+                    SEARCH_REFRESHES.inc("warmed")
+            except Exception:
+                SEARCH_REFRESHES.inc("warm_failed")
+                logger.exception("Failed to warm search cache for %r", query)
+        self.warmed += warmed
+        logger.info("Warmed search cache with %d of %d queries", warmed, len(queries))
+        return warmed
+
+    def stats(self) -> Dict:
+        """Return refresh counters and upstream calls spent per provider."""
+        return {
+            "interval": self.interval,
+            "refresh_ahead": self.refresh_ahead,
+            "tracked_keys": len(self.service.popularity),
+            "passes": self.passes,
+            "refreshes": self.refreshes,
+            "budget_skips": self.budget_skips,
+            "warmed": self.warmed,
+            "upstream_calls": dict(self.budget.spent)
+        }
+
+
+def load_warm_up_queries(path: str) -> List[str]:
+    """
+    Read warm-up queries from a text file, one per line.
+
+    Blank lines and lines starting with # are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def queries_from_history(limit: int = 100, scan: int = 10000) -> List[str]:
+    """
+    Return the most frequent user messages among the latest stored turns.
+
+    Args:
+        limit: Maximum number of queries to return
+        scan: Number of most recent turns to consider
+
+    Returns:
+        Distinct messages, most frequent first
+    """
+    from src.database.config import SessionLocal
+    from src.models.chat import Chat
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Chat.user_message).order_by(Chat.timestamp.desc()).limit(scan)
+        counts = Counter(" ".join(message.split()) for (message,) in rows if message)
+    finally:
+        db.close()
+    return [message for message, _ in counts.most_common(limit)]
+
+
+def refresher_from_env(service: SearchService) -> Optional[SearchRefresher]:
+    """
+    Build a SearchRefresher for service from the environment.
+
+    SEARCH_REFRESH_INTERVAL (default 60) sets the seconds between passes
+    and 0 disables refreshing; SEARCH_REFRESH_BUDGET ("rate,burst",
+    default "0.5,10") caps background calls per provider.
+
+    Returns:
+        Configured SearchRefresher, or None if disabled
+    """
+    interval = float(os.getenv("SEARCH_REFRESH_INTERVAL", "60"))
+    if interval <= 0:
+        return None
+    rate, burst = (float(part) for part in os.getenv("SEARCH_REFRESH_BUDGET", "0.5,10").split(","))
+    ahead = os.getenv("SEARCH_REFRESH_AHEAD")
+    return SearchRefresher(
+        service,
+        ProviderBudget(rate, burst),
+        interval=interval,
+        refresh_ahead=float(ahead) if ahead else None,
+        min_hits=int(os.getenv("SEARCH_REFRESH_MIN_HITS", "3")),
+        top_k=int(os.getenv("SEARCH_REFRESH_TOP_K", "100"))
+    )
+
+
+async def warm_up_queries_from_env() -> List[str]:
+    """
+    Collect startup warm-up queries from SEARCH_WARM_UP_FILE and the
+    SEARCH_WARM_UP_HISTORY most frequent recent chat messages (default 0).
+
+    Returns:
+        Distinct queries, file entries first
+    """
+    queries: List[str] = []
+    path = os.getenv("SEARCH_WARM_UP_FILE")
+    if path:
+        queries.extend(await asyncio.to_thread(load_warm_up_queries, path))
+    history = int(os.getenv("SEARCH_WARM_UP_HISTORY", "0"))
+    if history > 0:
+        queries.extend(await asyncio.to_thread(queries_from_history, history))
+    return list(dict.fromkeys(queries))
@@ -2,70 +2,165 @@
 Search service module providing search functionality across multiple sources.
 """
 
-import json
+import asyncio
 import os
 import time
-from typing import List, Dict, Optional
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
-import requests
+import httpx
 from dotenv import load_dotenv
 
+from src.services.cache import SearchCache
+from src.services.disk_cache import DiskCache
+from src.services.http_client import get_http_client
+from src.services.metrics import (
+    SEARCH_CACHE_MISSES,
+    SEARCH_FALLBACKS,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_SECONDS
+)
+from src.services.popularity import HeavyHitters
+from src.services.query_normalizer import QueryNormalizer, SimilarityIndex
+from src.services.search_providers import (
+    DuckDuckGoSearchProvider,
+    GoogleSearchProvider,
+    ProviderBudget,
+    SearchProvider,
+    SearchProviderError,
+    SearchResult,
+    merge_ranked,
+    normalize_url
+)
+
 load_dotenv()
 
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+DUCKDUCKGO_SEARCH_URL = "https://api.duckduckgo.com/"
+
+SEARCH_STRATEGIES = ("sequential", "hedged", "parallel")
+
+# Process-wide search cache shared by every SearchService instance.
+SEARCH_CACHE = SearchCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "3600")),
+    stale_ttl=float(os.getenv("SEARCH_CACHE_STALE_TTL", "300"))
+)
+
+# Most requested cache keys, refreshed ahead of expiry by SearchRefresher.
+SEARCH_POPULARITY = HeavyHitters(k=int(os.getenv("SEARCH_POPULARITY_TOP_K", "256")))
+
+# Optional near-duplicate lookup over cached keys, enabled by a threshold > 0.
+SIMILARITY_INDEX = SimilarityIndex(
+    threshold=float(os.getenv("SEARCH_CACHE_SIMILARITY", "0")),
+    max_keys=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+) if float(os.getenv("SEARCH_CACHE_SIMILARITY", "0")) > 0 else None
+
+# Optional persistent tier behind SEARCH_CACHE, shared by workers on one host.
+DISK_CACHE = DiskCache(
+    os.getenv("SEARCH_DISK_CACHE_PATH"),
+    ttl=float(os.getenv("SEARCH_CACHE_TTL", "3600")),
+    max_entries=int(os.getenv("SEARCH_DISK_CACHE_MAX_ENTRIES", "100000")),
+    max_bytes=int(os.getenv("SEARCH_DISK_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+) if os.getenv("SEARCH_DISK_CACHE_PATH") else None
+
 class SearchService:
     """Service for handling search operations across different search engines."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[SearchCache] = None,
+        disk_cache: Optional[DiskCache] = None,
+        normalizer: Optional[QueryNormalizer] = None,
+        similarity_index: Optional[SimilarityIndex] = None,
+        providers: Optional[Sequence[SearchProvider]] = None,
+        popularity: Optional[HeavyHitters] = None
+    ):
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         self.google_cx = os.getenv("GOOGLE_CX")
-        self.cache = {}
-        self.cache_timeout = 3600  # 1 hour
+        self.google_url = os.getenv("GOOGLE_SEARCH_URL", GOOGLE_SEARCH_URL)
+        self.duckduckgo_url = os.getenv("DUCKDUCKGO_SEARCH_URL", DUCKDUCKGO_SEARCH_URL)
+        self.cache = cache if cache is not None else SEARCH_CACHE
+        self.disk_cache = disk_cache if disk_cache is not None else DISK_CACHE
+        self.normalizer = normalizer or QueryNormalizer(
+            os.getenv("SEARCH_CACHE_KEY_MODE", "fold")
+        )
+        self.similarity_index = similarity_index if similarity_index is not None else SIMILARITY_INDEX
+        self.similar_hits = 0
+        self.popularity = popularity if popularity is not None else SEARCH_POPULARITY
         self.request_timeout = 10  # seconds
+        self.max_connections_per_host = int(os.getenv("SEARCH_MAX_CONNECTIONS_PER_HOST", "10"))
+        self._http_client = http_client
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self.google = GoogleSearchProvider(
+            self._get_json, self.google_url, self.google_api_key, self.google_cx
+        )
+        self.duckduckgo = DuckDuckGoSearchProvider(self._get_json, self.duckduckgo_url)
+        self.providers = list(providers) if providers is not None else [self.google, self.duckduckgo]
+        self.strategy = os.getenv("SEARCH_STRATEGY", "hedged")
+        if self.strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {self.strategy}")
+        self.hedge_percentile = float(os.getenv("SEARCH_HEDGE_PERCENTILE", "95"))
+        self.hedge_delay = float(os.getenv("SEARCH_HEDGE_DELAY", "1.0"))
+        self.hedge_min_samples = 20
+        self.timeout_percentile = float(os.getenv("SEARCH_TIMEOUT_PERCENTILE", "99"))
+        self.timeout_multiplier = float(os.getenv("SEARCH_TIMEOUT_MULTIPLIER", "2.0"))
+        self.min_timeout = float(os.getenv("SEARCH_TIMEOUT_MIN", "1.0"))
+
+    @property
+    def cache_timeout(self) -> float:
+        """Seconds a cached result stays fresh."""
+        return self.cache.ttl
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Injected client if one was given, otherwise the shared pooled client."""
+        return self._http_client or get_http_client()
 
-    async def search_google(self, query: str, num_results: int = 5) -> List[Dict]:
+    async def _get_json(self, url: str, params: Dict) -> Dict:
         """
-        Search using Google Custom Search API.
-        
+        Issue a GET request, limiting concurrent requests per upstream host.
+
         Args:
-            query: Search query string
-            num_results: Number of results to return
-            
+            url: Request URL
+            params: Query string parameters
+
         Returns:
-            List of search results
+            Decoded JSON body
         """
-        if not self.google_api_key or not self.google_cx:
-            return self.search_fallback(query, num_results)
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
 
-        url = "https://www.googleapis.com/customsearch/v1"
-        params = {
-            'key': self.google_api_key,
-            'cx': self.google_cx,
-            'q': query,
-            'num': num_results
-        }
-
-        try:
-            response = requests.get(
+        async with limit:
+            response = await self.http_client.get(
                 url,
                 params=params,
                 timeout=self.request_timeout
             )
-            results = response.json()
-            
-            if 'items' not in results:
-                return self.search_fallback(query, num_results)
-
-            return [{
-                'title': item.get('title', ''),
-                'link': item.get('link', ''),
-                'snippet': item.get('snippet', ''),
-                'source': 'google'
-            } for item in results['items']]
+        return response.json()
 
-        except requests.RequestException:
-            return self.search_fallback(query, num_results)
+    async def search_google(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """
+        Search using Google Custom Search API, falling back to DuckDuckGo
+        when Google is not configured or fails.
+        
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+            
+        Returns:
+            List of search results
+        """
+        return await self._fan_out(
+            query, num_results, [self.google, self.duckduckgo], "sequential"
+        )
 
-    def search_fallback(self, query: str, num_results: int = 5) -> List[Dict]:
+    async def search_fallback(self, query: str, num_results: int = 5) -> List[SearchResult]:
         """
         Fallback search using DuckDuckGo when Google search fails.
         
@@ -76,47 +171,391 @@ class SearchService:
         Returns:
             List of search results
         """
-        url = f"https://api.duckduckgo.com/?q={query}&format=json"
-        
+        return await self._fan_out(query, num_results, [self.duckduckgo], "sequential")
+
+    async def search(
+        self,
+        query: str,
+        num_results: int = 5,
+        budget: Optional[ProviderBudget] = None
+    ) -> List[SearchResult]:
+        """
+        Search the configured providers using the configured strategy.
+
+        Strategies:
+            sequential: query the next provider only after the previous one
+                failed or returned too few results
+            hedged: start the next provider as well once the running one
+                exceeds its observed latency percentile, or fails
+            parallel: query every provider at once
+
+        The search returns as soon as enough deduplicated results are
+        available and cancels providers that are still running.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+            budget: Optional per-provider call budget; providers without
+                budget left are skipped
+
+        Returns:
+            List of search results merged by rank
+        """
+        return await self._fan_out(query, num_results, self.providers, self.strategy, budget)
+
+    def _hedge_after(self, provider: SearchProvider) -> float:
+        """Seconds to wait on a provider before hedging to the next one."""
+        if len(provider.latency) >= self.hedge_min_samples:
+            return provider.latency.percentile(self.hedge_percentile)
+        return self.hedge_delay
+
+    def provider_timeout(self, provider: SearchProvider) -> float:
+        """
+        Timeout for the next call to a provider, adapted to its observed
+        latency and clamped between SEARCH_TIMEOUT_MIN and request_timeout.
+        """
+        if len(provider.latency) < self.hedge_min_samples:
+            return self.request_timeout
+        observed = provider.latency.percentile(self.timeout_percentile) * self.timeout_multiplier
+        return max(self.min_timeout, min(self.request_timeout, observed))
+
+    async def _query_provider(
+        self,
+        provider: SearchProvider,
+        query: str,
+        num_results: int
+    ) -> List[SearchResult]:
+        """Query one provider, recording its latency and outcome on its breaker."""
+        start = time.perf_counter()
         try:
-            response = requests.get(url, timeout=self.request_timeout)
-            data = response.json()
-            
-            results = []
-            for result in data.get('RelatedTopics', [])[:num_results]:
-                results.append({
-                    'title': result.get('Text', ''),
-                    'link': result.get('FirstURL', ''),
-                    'snippet': result.get('Text', ''),
-                    'source': 'duckduckgo'
-                })
-            
+            results = await asyncio.wait_for(
+                provider.search(query, num_results),
+                self.provider_timeout(provider)
+            )
+        except asyncio.TimeoutError as e:
+            provider.breaker.record_failure()
+            UPSTREAM_REQUESTS.inc(provider.name, "timeout")
+            raise SearchProviderError(f"{provider.name} timed out") from e
+        except SearchProviderError:
+            provider.breaker.record_failure()
+            UPSTREAM_REQUESTS.inc(provider.name, "error")
+            raise
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            UPSTREAM_REQUESTS.inc(provider.name, "cancelled")
+            raise
+        except Exception as e:
+            # E.g. a response shaped unlike what the provider parses; count
+            # it like any other failure so the breaker and fallback apply.
+            provider.breaker.record_failure()
+            UPSTREAM_REQUESTS.inc(provider.name, "error")
+            raise SearchProviderError(str(e)) from e
+        latency = time.perf_counter() - start
+        UPSTREAM_REQUESTS.inc(provider.name, "success")
+        UPSTREAM_SECONDS.observe(latency, provider.name)
+        provider.latency.record(latency)
+        provider.breaker.record_success(latency)
+        return results
+
+    def provider_status(self) -> List[Dict]:
+        """Return breaker state, latency and current timeout for each provider."""
+        return [{
+            "provider": provider.name,
+            "available": provider.available,
+            "timeout": self.provider_timeout(provider),
+            "latency_p50": provider.latency.percentile(50),
+            "latency_p99": provider.latency.percentile(99),
+            "breaker": provider.breaker.snapshot()
+        } for provider in self.providers]
+
+    async def _fan_out(
+        self,
+        query: str,
+        num_results: int,
+        providers: Sequence[SearchProvider],
+        strategy: str,
+        budget: Optional[ProviderBudget] = None
+    ) -> List[SearchResult]:
+        """
+        Run providers according to strategy and merge their results.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+            providers: Providers in priority order
+            strategy: One of SEARCH_STRATEGIES
+            budget: Optional per-provider call budget
+
+        Returns:
+            Merged search results, possibly fewer than num_results
+        """
+        collected: Dict[int, List[SearchResult]] = {}
+        batches = self._iter_providers(query, num_results, providers, strategy, budget)
+        async with aclosing(batches):
+            async for index, results in batches:
+                collected[index] = results
+        return merge_ranked([collected[i] for i in sorted(collected)], num_results)
+
+    async def _iter_providers(
+        self,
+        query: str,
+        num_results: int,
+        providers: Sequence[SearchProvider],
+        strategy: str,
+        budget: Optional[ProviderBudget] = None
+    ) -> AsyncIterator[Tuple[int, List[SearchResult]]]:
+        """
+        Run providers according to strategy, yielding each provider's
+        results as soon as it completes.
+
+        Iteration stops once the results so far merge into num_results
+        results; providers still running are cancelled when the iterator
+        finishes or is closed.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+            providers: Providers in priority order
+            strategy: One of SEARCH_STRATEGIES
+            budget: Optional per-provider call budget; providers without
+                budget left are skipped like ones with an open circuit
+
+        Yields:
+            (provider priority index, results) pairs in completion order;
+            failed providers yield an empty list
+        """
+        queue = [provider for provider in providers if provider.available]
+        running: Dict[asyncio.Task, Tuple[int, SearchProvider]] = {}
+        collected: Dict[int, List[SearchResult]] = {}
+        position = 0
+
+        def launch() -> None:
+            """Start the next provider whose circuit breaker admits a call."""
+            nonlocal position
+            while position < len(queue):
+                provider = queue[position]
+                position += 1
+                if budget is not None and not budget.available(provider.name):
+                    continue
+                if provider.breaker.allow_request():
+                    if budget is not None:
+                        budget.spend(provider.name)
+                    if position > 1:
+                        SEARCH_FALLBACKS.inc(strategy)
+                    task = asyncio.create_task(
+                        self._query_provider(provider, query, num_results)
+                    )
+                    running[task] = (position - 1, provider)
+                    return
+
+        try:
+            if strategy == "parallel":
+                while position < len(queue):
+                    launch()
+            elif queue:
+                launch()
+
+            while running:
+                timeout = None
+                if strategy == "hedged" and position < len(queue):
+                    newest = next(reversed(running.values()))[1]
+                    timeout = self._hedge_after(newest)
+
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    index, _ = running.pop(task)
+                    try:
+                        collected[index] = task.result()
+                    except SearchProviderError:
+                        collected[index] = []
+                    yield index, collected[index]
+
+                merged = merge_ranked([collected[i] for i in sorted(collected)], num_results)
+                if len(merged) >= num_results:
+                    return
+                if position < len(queue) and (not running or strategy == "hedged"):
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def cache_key(self, query: str, num_results: int) -> str:
+        """
+        Build the cache key for a query.
+
+        Args:
+            query: Search query string
+            num_results: Number of results requested
+
+        Returns:
+            Key combining the normalized query with num_results
+        """
+        return f"{num_results}:{self.normalizer.normalize(query)}"
+
+    def _index_key(self, key: str, num_results: int) -> None:
+        """Make a cached key available to near-duplicate lookups."""
+        if self.similarity_index is not None:
+            self.similarity_index.add(key, key.split(":", 1)[1], num_results)
+
+    def _find_similar(self, key: str, num_results: int) -> Optional[List[SearchResult]]:
+        """Return cached results stored under a near-duplicate of key, if any."""
+        if self.similarity_index is None:
+            return None
+        similar_key = self.similarity_index.lookup(key.split(":", 1)[1], num_results)
+        if similar_key is None:
+            return None
+        results = self.cache.get(similar_key, count=False)
+        if results is None:
+            self.similarity_index.discard(similar_key)
+            return None
+        self.similar_hits += 1
+        return results
+
+    def _read_disk(self, key: str) -> Optional[List[SearchResult]]:
+        """Load results from the disk cache, which stores them as JSON dicts."""
+        stored = self.disk_cache.get(key)
+        return [SearchResult.from_dict(result) for result in stored] if stored else None
+
+    def _write_disk(self, key: str, results: List[SearchResult]) -> None:
+        """Store results in the disk cache as JSON dicts."""
+        self.disk_cache.set(key, [result.to_dict() for result in results])
+
+    def cache_results(self, query: str, results: List[SearchResult], num_results: int = 5) -> None:
+        """Cache search results in memory and, if enabled, on disk."""
+        key = self.cache_key(query, num_results)
+        self.cache.set(key, results)
+        self._index_key(key, num_results)
+        if self.disk_cache is not None:
+            self._write_disk(key, results)
+
+    def get_cached_results(self, query: str, num_results: int = 5) -> Optional[List[SearchResult]]:
+        """Retrieve cached results if they haven't expired, checking memory then disk."""
+        key = self.cache_key(query, num_results)
+        results = self.cache.get(key)
+        if results is None and self.disk_cache is not None:
+            results = self._read_disk(key)
+            if results:
+                self.cache.set(key, results)
+        return results
+
+    async def _load_stored(self, key: str, num_results: int) -> Optional[List[SearchResult]]:
+        """Load results for a memory-cache miss from a cached near-duplicate
+        query or the disk cache."""
+        results = self._find_similar(key, num_results)
+        if results:
+            SEARCH_CACHE_MISSES.inc("similar")
             return results
-        except requests.RequestException:
-            return []
-
-    def cache_results(self, query: str, results: List[Dict]) -> None:
-        """Cache search results with timestamp."""
-        self.cache[query] = {
-            'results': results,
-            'timestamp': time.time()
-        }
-
-    def get_cached_results(self, query: str) -> Optional[List[Dict]]:
-        """Retrieve cached results if they haven't expired."""
-        if query in self.cache:
-            cache_data = self.cache[query]
-            if time.time() - cache_data['timestamp'] < self.cache_timeout:
-                return cache_data['results']
+
+        if self.disk_cache is not None:
+            results = await asyncio.to_thread(self._read_disk, key)
+            if results:
+                SEARCH_CACHE_MISSES.inc("disk")
+                self._index_key(key, num_results)
+                return results
         return None
 
+    async def _store_fetched(self, key: str, results: List[SearchResult], num_results: int) -> None:
+        """Index freshly fetched results and write them to the disk cache."""
+        if results:
+            self._index_key(key, num_results)
+            if self.disk_cache is not None:
+                await asyncio.to_thread(self._write_disk, key, results)
+
+    async def _fetch_results(
+        self,
+        key: str,
+        query: str,
+        num_results: int,
+        budget: Optional[ProviderBudget] = None
+    ) -> List[SearchResult]:
+        """
+        Load results for a memory-cache miss from a cached near-duplicate
+        query, the disk cache or the upstream search, in that order.
+        """
+        results = await self._load_stored(key, num_results)
+        if results:
+            return results
+
+        SEARCH_CACHE_MISSES.inc("upstream")
+        if budget is None:
+            # Request path: keep calling search() with its original
+            # arguments so overrides of it keep working.
+            results = await self.search(query, num_results)
+        else:
+            results = await self.search(query, num_results, budget)
+        await self._store_fetched(key, results, num_results)
+        return results
+
+    async def refresh(
+        self,
+        key: str,
+        query: str,
+        num_results: int,
+        budget: Optional[ProviderBudget] = None
+    ) -> List[SearchResult]:
+        """
+        Fetch fresh upstream results for a cached key, bypassing every
+        cache tier, and store them in the disk cache.
+
+        The caller stores the returned results in the memory cache, e.g.
+        through SearchCache.revalidate().
+
+        Args:
+            key: Cache key of the query
+            query: Search query string the key was built from
+            num_results: Number of results to return
+            budget: Optional per-provider call budget
+
+        Returns:
+            Fresh search results; empty if no provider had budget or succeeded
+        """
+        results = await self.search(query, num_results, budget)
+        await self._store_fetched(key, results, num_results)
+        return results
+
+    async def warm(
+        self,
+        query: str,
+        num_results: int = 5,
+        budget: Optional[ProviderBudget] = None
+    ) -> bool:
+        """
+        Load a query into the memory cache ahead of the first request for it.
+
+        Unlike aggregate_search_results(), warming does not count towards
+        the query's popularity.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to cache
+            budget: Optional per-provider call budget for upstream fetches
+
+        Returns:
+            False if the query was already cached or nothing was found
+        """
+        key = self.cache_key(query, num_results)
+        if self.cache.get(key, count=False) is not None:
+            return False
+        results = await self.cache.get_or_fetch(
+            key,
+            lambda: self._fetch_results(key, query, num_results, budget)
+        )
+        return bool(results)
+
     async def aggregate_search_results(
         self,
         query: str,
         num_results: int = 5
-    ) -> List[Dict]:
+    ) -> List[SearchResult]:
         """
         Aggregate results from multiple search sources.
+
+        Concurrent calls for the same uncached query share one upstream fetch.
+        Expired results are served while they are refreshed in the background.
         
         Args:
             query: Search query string
@@ -125,10 +564,87 @@ class SearchService:
         Returns:
             List of aggregated search results
         """
-        cached_results = self.get_cached_results(query)
-        if cached_results:
-            return cached_results
+        key = self.cache_key(query, num_results)
+        self.popularity.record(key, (query, num_results))
+        return await self.cache.get_or_fetch(
+            key,
+            lambda: self._fetch_results(key, query, num_results)
+        )
+
+    async def stream_search_results(
+        self,
+        query: str,
+        num_results: int = 5
+    ) -> AsyncIterator[SearchResult]:
+        """
+        Yield aggregated search results as they become available.
+
+        Cached results are yielded at once. On a miss, each provider's
+        results are yielded as soon as that provider completes, skipping
+        URLs already yielded, and the complete merged list is cached
+        afterwards just like aggregate_search_results() would. Concurrent
+        requests for the same query wait for the stream's results instead
+        of fetching them again.
+
+        Args:
+            query: Search query string
+            num_results: Number of results to return
+
+        Yields:
+            Search results, at most num_results in total
+        """
+        key = self.cache_key(query, num_results)
+        self.popularity.record(key, (query, num_results))
+        fetch = lambda: self._fetch_results(key, query, num_results)
+        results = self.cache.get_or_revalidate(key, fetch)
+        future = None if results else self.cache.claim(key)
+        if not results and future is None:
+            # Another request is already fetching this query; share it.
+            results = await self.cache.get_or_fetch(key, fetch)
+        if results:
+            for result in results:
+                yield result
+            return
+
+        # This stream is the in-flight fetch for key until settled, so
+        # concurrent requests for the query wait for its results.
+        try:
+            results = await self._load_stored(key, num_results)
+        except BaseException as exc:
+            self.cache.settle(key, future, error=exc)
+            raise
+        if results:
+            self.cache.settle(key, future, results)
+            for result in results:
+                yield result
+            return
+
+        SEARCH_CACHE_MISSES.inc("upstream")
+        collected: Dict[int, List[SearchResult]] = {}
+        seen = set()
+        sent = 0
+        try:
+            batches = self._iter_providers(query, num_results, self.providers, self.strategy)
+            async with aclosing(batches):
+                async for index, batch in batches:
+                    collected[index] = batch
+                    for result in batch:
+                        if sent >= num_results:
+                            break
+                        if result.link:
+                            url = normalize_url(result.link)
+                            if url in seen:
+                                continue
+                            seen.add(url)
+                        sent += 1
+                        yield result
+        except BaseException as exc:
+            # Includes the consumer closing the stream early; waiters then
+            # fetch on their own instead of getting a partial list.
+            self.cache.settle(key, future, error=exc)
+            raise
 
-        results = await self.search_google(query, num_results)
-        self.cache_results(query, results)
-        return results
\ No newline at end of file
+        results = merge_ranked([collected[i] for i in sorted(collected)], num_results)
+        self.cache.settle(key, future, results)
+        if results:
+            await self._store_fetched(key, results, num_results)
@@ -0,0 +1,55 @@
+"""
+Token bucket module shared by the API rate limiter and the upstream
+search provider budgets.
+
+A bucket is a mutable [tokens, last_refill] list; it refills lazily from
+the monotonic clock whenever it is read, so idle buckets cost nothing.
+"""
+
+import math
+import time
+from typing import List
+
+
+def refill(bucket: List[float], rate: float, burst: float) -> List[float]:
+    """
+    Top up a [tokens, last_refill] token bucket for the time elapsed since
+    its last refill.
+
+    Args:
+        bucket: Tokens held and monotonic time of the last refill
+        rate: Tokens added per second
+        burst: Bucket capacity
+
+    Returns:
+        The same bucket
+    """
+    now = time.monotonic()
+    bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+    bucket[1] = now
+    return bucket
+
+
+def token_wait(bucket: List[float], rate: float) -> float:
+    """Seconds until bucket holds a whole token; infinite if it never refills."""
+    if bucket[0] >= 1:
+        return 0.0
+    return (1 - bucket[0]) / rate if rate > 0 else math.inf
+
+
+def take_token(bucket: List[float], rate: float, burst: float) -> float:
+    """
+    Refill bucket and take one token from it if it holds one.
+
+    Args:
+        bucket: Tokens held and monotonic time of the last refill
+        rate: Tokens added per second
+        burst: Bucket capacity
+
+    Returns:
+        0 if a token was taken, otherwise seconds until one is available
+    """
+    wait = token_wait(refill(bucket, rate, burst), rate)
+    if not wait:
+        bucket[0] -= 1
+    return wait
@@ -1,5 +1,10 @@
+import json
+
 from fastapi.testclient import TestClient
 from src.main import app
+from src.database.migrations import migrate
+from src.models.chat import Chat
+from tests.conftest import TestingSessionLocal, engine
 
 client = TestClient(app)
 
@@ -24,4 +29,105 @@ def test_nlp_analyze_endpoint():
     )
     assert response.status_code == 200
     assert "status" in response.json()
-    assert "analysis" in response.json()
\ No newline at end of file
+    assert "analysis" in response.json()
+
+def test_health_reports_startup_timings():
+    with TestClient(app) as started_client:
+        response = started_client.get("/health")
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert "total_seconds" in response.json()["startup"]
+
+def test_batch_search_query_streams_ndjson():
+    texts = ["Python programming language", "machine learning models", "weather"]
+    response = client.post("/nlp/batch/search-query", json={"texts": texts})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    for line, text in zip(lines, texts):
+        single = client.post("/nlp/search-query", json={"text": text}).json()
+        assert line["search_query"] == single["search_query"]
+
+async def _fake_stream(message, history=None):
+    yield {"event": "context", "data": {"keywords": ["python"]}}
+    yield {"event": "source", "data": {"title": "A", "link": "http://a.test"}}
+    yield {"event": "chunk", "data": "Python is a language."}
+    yield {"event": "done", "data": {
+        "response": "Python is a language.",
+        "sources": [{"title": "A", "link": "http://a.test"}]
+    }}
+
+def test_chat_stream_sends_server_sent_events(client, monkeypatch):
+    from src.routes import chat_routes
+    monkeypatch.setattr(chat_routes.response_generator, "stream_response", _fake_stream)
+    
+    response = client.post("/chat/stream", json={"message": "What is Python?"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        block.split("\n")[0].removeprefix("event: ")
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert events == ["context", "source", "chunk", "done"]
+
+def test_chat_websocket_streams_events(client, monkeypatch):
+    from src.routes import chat_routes
+    monkeypatch.setattr(chat_routes.response_generator, "stream_response", _fake_stream)
+    
+    with client.websocket_connect("/chat/ws") as websocket:
+        websocket.send_json({"message": "What is Python?"})
+        events = [websocket.receive_json() for _ in range(4)]
+    
+    assert [e["event"] for e in events] == ["context", "source", "chunk", "done"]
+    assert events[-1]["data"]["response"] == "Python is a language."
+
+def test_chat_history_pages_with_cursor(client):
+    db = TestingSessionLocal()
+    db.add_all([
+        Chat(session_id="s1", user_message=f"question {i}", bot_response=f"answer {i}")
+        for i in range(5)
+    ])
+    db.commit()
+    db.close()
+    
+    first = client.get("/chat/sessions/s1/history", params={"limit": 3}).json()
+    second = client.get(
+        "/chat/sessions/s1/history", params={"limit": 3, "cursor": first["next_cursor"]}
+    ).json()
+    
+    assert [t["user_message"] for t in first["turns"]] == ["question 4", "question 3", "question 2"]
+    assert [t["user_message"] for t in second["turns"]] == ["question 1", "question 0"]
+    assert second["next_cursor"] is None
+    assert client.get("/chat/sessions/s1/history", params={"cursor": "bogus"}).status_code == 400
+
+def test_chat_history_search_endpoint(client):
+    migrate(engine)
+    db = TestingSessionLocal()
+    db.add_all([
+        Chat(session_id="s1", user_message="reset my password", bot_response="Use the reset link."),
+        Chat(session_id="s2", user_message="billing", bot_response="Invoices are monthly."),
+    ])
+    db.commit()
+    db.close()
+    
+    response = client.get("/chat/history/search", params={"q": "password"})
+    
+    assert response.status_code == 200
+    assert [t["session_id"] for t in response.json()["turns"]] == ["s1"]
+    assert "[password]" in response.json()["turns"][0]["snippet"]
+
+def test_metrics_endpoint_reports_requests():
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'chatbot_http_request_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert "chatbot_search_cache_hits" in response.text
+
+def test_profiler_control_is_disabled_by_default():
+    assert client.post("/metrics/profiler/start").status_code == 403
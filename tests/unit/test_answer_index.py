@@ -0,0 +1,117 @@
+import re
+import time
+
+import numpy as np
+import pytest
+from src.services.answer_index import AnswerIndex, load_answer_index
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+@pytest.fixture
+def index():
+    index = AnswerIndex(n_features=2 ** 12, tokenizer=tokenize)
+    index.add("What is Python?", "Python is a programming language.")
+    index.add("How do I reset my password?", "Use the reset link.")
+    index.add("What is the capital of France?", "Paris.")
+    return index
+
+def test_near_repeat_scores_highest(index):
+    matches = index.search("what is python", k=2)
+    
+    assert matches[0]["answer"] == "Python is a programming language."
+    assert matches[0]["score"] == pytest.approx(1.0, abs=1e-5)
+    assert matches[1]["score"] < matches[0]["score"]
+
+def test_best_match_applies_threshold_and_counts_hits(index):
+    assert index.best_match("reset my password", 0.7)["answer"] == "Use the reset link."
+    assert index.best_match("weather in Berlin", 0.7) is None
+    
+    stats = index.stats()
+    assert (stats["lookups"], stats["hits"], stats["hit_rate"]) == (2, 1, 0.5)
+
+def test_save_and_memory_mapped_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "answers")
+    index.save(path)
+    
+    loaded = AnswerIndex.load(path, tokenizer=tokenize)
+    loaded.add("Who wrote Hamlet?", "Shakespeare.")
+    
+    assert isinstance(loaded._doc_ids, np.memmap)
+    assert len(loaded) == 4
+    assert loaded.search("capital of france")[0]["answer"] == "Paris."
+    assert loaded.search("who wrote hamlet")[0]["answer"] == "Shakespeare."
+    
+    loaded.save(path)
+    reloaded = AnswerIndex.load(path, tokenizer=tokenize)
+    assert reloaded.stats()["pending"] == 0
+    assert [reloaded.search(q)[0]["answer"] for q in ("what is python", "who wrote hamlet")] == [
+        "Python is a programming language.", "Shakespeare."
+    ]
+
+def test_question_without_terms_is_not_indexed(index):
+    assert index.add("?!", "nothing") is False
+    assert index.search("...") == []
+
+def test_added_pairs_are_logged_until_saved(index, tmp_path):
+    path = str(tmp_path / "answers")
+    index.save(path)
+    loaded = load_answer_index(path, tokenizer=tokenize)
+    loaded.add("Who wrote Hamlet?", "Shakespeare.")
+    with open(f"{path}.log", "a", encoding="utf-8") as f:
+        f.write('["cut short')
+    
+    restarted = load_answer_index(path, tokenizer=tokenize)
+    assert len(restarted) == 4
+    assert restarted.search("who wrote hamlet")[0]["answer"] == "Shakespeare."
+    
+    restarted.save(path)
+    reloaded = load_answer_index(path, tokenizer=tokenize)
+    assert (len(reloaded), reloaded.stats()["pending"]) == (4, 0)
+
+def test_search_scores_only_matching_documents(index):
+    matches = index.search("python password france", k=5)
+    
+    assert len(matches) == 3
+    assert all(match["score"] > 0 for match in matches)
+    assert index.search("unrelated words", k=5) == []
+
+def test_save_keeps_pairs_added_by_other_processes(index, tmp_path):
+    path = str(tmp_path / "answers")
+    index.save(path)
+    first = load_answer_index(path, tokenizer=tokenize)
+    second = load_answer_index(path, tokenizer=tokenize)
+    first.add("Who wrote Hamlet?", "Shakespeare.")
+    second.add("How tall is Everest?", "8849 m.")
+    
+    first.save(path)
+    second.add("What is the speed of light?", "299792 km/s.")
+    second.save(path)
+    
+    reloaded = load_answer_index(path, tokenizer=tokenize)
+    assert (len(reloaded), reloaded.stats()["log_bytes"]) == (6, 0)
+    assert reloaded.search("how tall is everest")[0]["answer"] == "8849 m."
+    assert reloaded.search("speed of light")[0]["answer"] == "299792 km/s."
+
+def test_max_age_skips_old_answers(index, tmp_path):
+    index.add("What is Rust?", "A systems language.", added_at=time.time() - 3600)
+    
+    assert index.best_match("what is rust", 0.7)["answer"] == "A systems language."
+    assert index.best_match("what is rust", 0.7, max_age=60) is None
+    assert index.best_match("what is python", 0.7, max_age=60) is not None
+    
+    path = str(tmp_path / "answers")
+    index.save(path)
+    loaded = AnswerIndex.load(path, tokenizer=tokenize)
+    fresh = loaded.search("what is rust", k=5, max_age=60)
+    assert "A systems language." not in [match["answer"] for match in fresh]
+    assert loaded.search("what is rust")[0]["answer"] == "A systems language."
+
+def test_log_lines_without_time_are_replayed(tmp_path):
+    path = str(tmp_path / "answers")
+    with open(f"{path}.log", "w", encoding="utf-8") as f:
+        f.write('["Who wrote Hamlet?", "Shakespeare."]\n')
+    
+    loaded = load_answer_index(path, tokenizer=tokenize)
+    
+    assert loaded.best_match("who wrote hamlet", 0.7, max_age=60)["answer"] == "Shakespeare."
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from src.services.cache import LRUCache, SearchCache
+
+def test_lru_eviction():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry():
+    cache = LRUCache(ttl=0)
+    cache.set("a", 1)
+    
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+def test_byte_budget():
+    cache = LRUCache(max_entries=100, max_bytes=1000)
+    for i in range(20):
+        cache.set(i, "x" * 100)
+    
+    assert cache.current_bytes <= 1000
+    assert len(cache) < 20
+    assert cache.get(19) is not None
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_are_coalesced():
+    cache = SearchCache()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    results = await asyncio.gather(*(cache.get_or_fetch("q", fetch) for _ in range(10)))
+    
+    assert results == [["result"]] * 10
+    assert calls == 1
+    assert cache.stats()["coalesced"] == 9
+    assert await cache.get_or_fetch("q", fetch) == ["result"]
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_fetch_propagates_to_waiters():
+    cache = SearchCache()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        *(cache.get_or_fetch("q", fetch) for _ in range(3)),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("q") is None
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_served_while_revalidating():
+    cache = SearchCache(ttl=0.05, stale_ttl=60)
+    cache.set("key", ["old"])
+    await asyncio.sleep(0.06)
+
+    async def fetch():
+        return ["new"]
+
+    assert cache.get("key") is None
+    assert await cache.get_or_fetch("key", fetch) == ["old"]
+    await asyncio.sleep(0.01)
+    assert cache.get("key") == ["new"]
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["revalidations"] == 1
+
+@pytest.mark.asyncio
+async def test_entry_past_stale_ttl_is_refetched():
+    cache = SearchCache(ttl=0, stale_ttl=0)
+    cache.set("key", ["old"])
+
+    async def fetch():
+        return ["new"]
+
+    assert cache.get_entry("key") is None
+    assert await cache.get_or_fetch("key", fetch) == ["new"]
+    assert cache.stats()["stale_hits"] == 0
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import queue
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from src.database.config import Base, configure_sqlite
+from src.models.chat import Chat
+from src.services.chat_writer import ChatWriter, ForwardingChatWriter, run_writer_process
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'chat.db'}", connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", configure_sqlite)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+def count_rows(session_factory):
+    db = session_factory()
+    try:
+        return db.query(Chat).count()
+    finally:
+        db.close()
+
+@pytest.mark.asyncio
+async def test_every_record_lands_after_drain(session_factory):
+    writer = ChatWriter(session_factory, max_queue=100, batch_size=50)
+    writer.start()
+    
+    await asyncio.gather(*(writer.submit(f"message {i}", f"response {i}") for i in range(1000)))
+    await writer.stop()
+    
+    assert count_rows(session_factory) == 1000
+    assert writer.written == 1000
+    assert writer.batches < 1000
+    assert not writer.running
+
+@pytest.mark.asyncio
+async def test_committed_mode_waits_for_commit(session_factory):
+    writer = ChatWriter(session_factory, durability="committed")
+    writer.start()
+    
+    await writer.submit("hello", "hi")
+    
+    assert count_rows(session_factory) == 1
+    await writer.stop()
+
+@pytest.mark.asyncio
+async def test_committed_mode_reports_write_failure():
+    def broken_session():
+        raise RuntimeError("database unavailable")
+    writer = ChatWriter(broken_session, durability="committed")
+    writer.start()
+    
+    with pytest.raises(RuntimeError, match="database unavailable"):
+        await writer.submit("hello", "hi")
+    
+    assert writer.failed == 1
+    await writer.stop()
+
+@pytest.mark.asyncio
+async def test_buffered_mode_retries_then_counts_dropped_records(session_factory):
+    attempts = []
+    def flaky_session():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("database locked")
+        return session_factory()
+    writer = ChatWriter(flaky_session, retry_delay=0.01)
+    writer.start()
+    
+    await writer.submit("hello", "hi")
+    await writer.stop()
+    
+    assert count_rows(session_factory) == 1
+    assert writer.stats()["retries"] == 2
+    assert writer.stats()["dropped"] == 0
+    
+    def broken_session():
+        raise RuntimeError("database unavailable")
+    writer = ChatWriter(broken_session, max_retries=2, retry_delay=0.01)
+    writer.start()
+    
+    await writer.submit("hello", "hi")
+    await writer.stop()
+    
+    assert writer.stats()["retries"] == 2
+    assert writer.stats()["dropped"] == 1
+
+@pytest.mark.asyncio
+async def test_submit_requires_running_writer(session_factory):
+    writer = ChatWriter(session_factory)
+    
+    with pytest.raises(RuntimeError):
+        await writer.submit("hello", "hi")
+
+@pytest.mark.asyncio
+async def test_workers_forward_to_single_writer_process(session_factory):
+    context = multiprocessing.get_context("fork")
+    channel = context.Queue()
+    process = context.Process(target=run_writer_process, args=(channel, session_factory, 100))
+    process.start()
+    workers = [ForwardingChatWriter(channel, batch_size=10) for _ in range(2)]
+    for writer in workers:
+        writer.start()
+    
+    await asyncio.gather(*(
+        writer.submit(f"message {i}", f"response {i}")
+        for i in range(100) for writer in workers
+    ))
+    for writer in workers:
+        await writer.stop()
+    channel.put(None)
+    await asyncio.to_thread(process.join, 10)
+    
+    assert process.exitcode == 0
+    assert count_rows(session_factory) == 200
+    assert sum(writer.written for writer in workers) == 200
+
+@pytest.mark.asyncio
+async def test_forwarding_drops_batches_when_writer_process_stops_reading():
+    channel = queue.Queue(maxsize=1)
+    channel.put([])
+    writer = ForwardingChatWriter(channel, put_timeout=0.05)
+    writer.start()
+    
+    await writer.submit("hello", "hi")
+    await writer.stop()
+    
+    assert writer.stats()["dropped"] == 1
+    assert writer.stats()["stalled"]
+    
+    channel.get_nowait()
+    writer.start()
+    await writer.submit("hello again", "hi")
+    await writer.stop()
+    
+    assert channel.get_nowait()[0]["user_message"] == "hello again"
+    assert not writer.stats()["stalled"]
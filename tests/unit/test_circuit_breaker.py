@@ -0,0 +1,54 @@
+from src.services.circuit_breaker import CircuitBreaker
+
+def test_opens_when_error_rate_exceeded():
+    breaker = CircuitBreaker("test", failure_rate=0.5, min_calls=4, open_seconds=60)
+    for _ in range(2):
+        breaker.record_success(0.1)
+        breaker.record_failure()
+    
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["rejected"] == 1
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker("test", min_calls=5)
+    for _ in range(4):
+        breaker.record_failure()
+    
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+def test_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    
+    assert breaker.state == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == "closed"
+    assert [t["to"] for t in breaker.snapshot()["transitions"]] == ["open", "half_open", "closed"]
+
+def test_half_open_probe_reopens_on_failure():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0.5)
+    breaker.record_failure()
+    breaker._opened_at -= 1
+    
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+def test_cancelled_probe_is_released():
+    breaker = CircuitBreaker("test", min_calls=1, open_seconds=0)
+    breaker.record_failure()
+    
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("test", min_calls=2, slow_call_seconds=1.0, open_seconds=60)
+    breaker.record_success(2.0)
+    breaker.record_success(3.0)
+    
+    assert breaker.state == "open"
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from src.database.config import (
+    Base,
+    commit,
+    create_async_db_engine,
+    create_db_engine,
+    engine_options,
+    execute,
+    to_async_url
+)
+from src.models.chat import Chat
+
+def test_async_url_uses_async_driver():
+    assert to_async_url("sqlite:///./chatbot.db") == "sqlite+aiosqlite:///./chatbot.db"
+    assert to_async_url("postgresql://u:p@db/chat") == "postgresql+asyncpg://u:p@db/chat"
+
+def test_pool_options_come_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+    monkeypatch.setenv("DB_POOL_RECYCLE", "600")
+    
+    options = engine_options("sqlite:///./chatbot.db")
+    
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 0
+    assert options["pool_recycle"] == 600
+    assert options["connect_args"] == {"check_same_thread": False}
+    assert "pool_size" not in engine_options("sqlite://")
+
+@pytest.mark.asyncio
+async def test_chat_model_works_on_both_backends(tmp_path):
+    url = f"sqlite:///{tmp_path / 'chat.db'}"
+    async_engine = create_async_db_engine(to_async_url(url))
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    async with async_sessionmaker(async_engine)() as db:
+        db.add(Chat(user_message="async", bot_response="hi"))
+        await commit(db)
+        count = (await execute(db, select(func.count(Chat.id)))).scalar_one()
+    await async_engine.dispose()
+    
+    sync_engine = create_db_engine(url)
+    db = sessionmaker(bind=sync_engine)()
+    db.add(Chat(user_message="sync", bot_response="hi"))
+    await commit(db)
+    messages = (await execute(db, select(Chat.user_message).order_by(Chat.id))).scalars().all()
+    db.close()
+    sync_engine.dispose()
+    
+    assert count == 1
+    assert messages == ["async", "sync"]
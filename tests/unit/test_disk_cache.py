@@ -0,0 +1,54 @@
+import multiprocessing
+
+import pytest
+from src.services.disk_cache import DiskCache
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "search_cache.db")
+
+def test_survives_reopen(cache_path):
+    DiskCache(cache_path).set("5:python", [{"title": "Python"}])
+    
+    assert DiskCache(cache_path).get("5:python") == [{"title": "Python"}]
+
+def test_expired_entries_are_hidden_and_compacted(cache_path):
+    cache = DiskCache(cache_path)
+    cache.set("stale", ["old"], ttl=-1)
+    cache.set("fresh", ["new"])
+    
+    assert cache.get("stale") is None
+    assert cache.compact() == 1
+    assert cache.stats()["entries"] == 1
+
+def test_compaction_enforces_size_cap(cache_path):
+    cache = DiskCache(cache_path, max_entries=3)
+    for i in range(10):
+        cache.set(f"q{i}", [i], ttl=100 + i)
+    
+    cache.compact()
+    
+    assert cache.stats()["entries"] == 3
+    assert cache.get("q9") == [9]
+    assert cache.get("q0") is None
+
+def _write_entries(path, worker):
+    cache = DiskCache(path)
+    for i in range(50):
+        cache.set(f"w{worker}:{i}", [worker, i])
+
+def test_concurrent_writers(cache_path):
+    DiskCache(cache_path).stats()
+    workers = [
+        multiprocessing.Process(target=_write_entries, args=(cache_path, n))
+        for n in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    cache = DiskCache(cache_path)
+    assert all(worker.exitcode == 0 for worker in workers)
+    assert cache.stats()["entries"] == 200
+    assert cache.get("w3:49") == [3, 49]
@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+from src.database.config import Base
+from src.database.migrations import migrate
+from src.models.chat import Chat
+from src.services.history_service import (
+    ConversationCache,
+    HistorySearchUnavailableError,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    fetch_history,
+    recent_turns,
+    search_history
+)
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    started = datetime(2024, 1, 1)
+    for i in range(25):
+        session.add(Chat(
+            session_id="a",
+            user_message=f"question {i}",
+            bot_response=f"answer {i}",
+            # Pairs of turns share a timestamp to exercise the id tie-breaker.
+            timestamp=started + timedelta(seconds=i // 2)
+        ))
+    session.add(Chat(session_id="b", user_message="other", bot_response="other"))
+    session.commit()
+    migrate(engine)
+    yield session
+    session.close()
+    engine.dispose()
+
+def test_cursor_round_trip():
+    timestamp = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    
+    assert decode_cursor(encode_cursor(timestamp, 42)) == (timestamp, 42)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_session_once(db):
+    seen, cursor = [], None
+    while True:
+        turns, cursor = await fetch_history(db, "a", limit=10, cursor=cursor)
+        seen.extend(turn["user_message"] for turn in turns)
+        if cursor is None:
+            break
+    
+    assert seen == [f"question {i}" for i in reversed(range(25))]
+
+@pytest.mark.asyncio
+async def test_recent_turns_are_cached(db):
+    cache = ConversationCache(max_turns=3)
+    
+    turns = await recent_turns(db, "a", cache)
+    cache.append("a", "question 25", "answer 25")
+    db.close()
+    cached = await recent_turns(None, "a", cache)
+    
+    assert [t["user_message"] for t in turns] == ["question 22", "question 23", "question 24"]
+    assert [t["user_message"] for t in cached] == ["question 23", "question 24", "question 25"]
+
+@pytest.mark.asyncio
+async def test_zero_ttl_disables_cache(db):
+    cache = ConversationCache(max_turns=3, ttl=0)
+    
+    await recent_turns(db, "a", cache)
+    cache.append("a", "question 25", "answer 25")
+    
+    assert cache.get("a") is None
+
+def test_append_ignores_uncached_session():
+    cache = ConversationCache()
+    
+    cache.append("missing", "question", "answer")
+    
+    assert cache.get("missing") is None
+
+def test_migration_upgrades_legacy_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE chats (id INTEGER PRIMARY KEY, user_message VARCHAR, "
+            "bot_response VARCHAR, timestamp DATETIME)"
+        ))
+    
+    applied = migrate(engine)
+    
+    inspector = inspect(engine)
+    assert "session_id" in {c["name"] for c in inspector.get_columns("chats")}
+    assert "ix_chats_session_id_timestamp" in {i["name"] for i in inspector.get_indexes("chats")}
+    assert applied[0] == "add column chats.session_id"
+    assert migrate(engine) == []
+    engine.dispose()
+
+@pytest.fixture
+def searchable(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Chat(session_id="a", user_message="How do I reset my password?",
+             bot_response="Use the reset link on the login page."),
+        Chat(session_id="a", user_message="Billing question",
+             bot_response="Invoices are sent monthly."),
+        Chat(session_id="b", user_message="password rules",
+             bot_response="A password needs twelve characters; a strong password is best."),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+@pytest.mark.asyncio
+async def test_search_ranks_matches_with_snippets(searchable):
+    turns, cursor, truncated = await search_history(searchable, "password")
+    
+    assert [t["session_id"] for t in turns] == ["b", "a"]
+    assert "[password]" in turns[0]["snippet"]
+    assert cursor is None
+    assert not truncated
+
+@pytest.mark.asyncio
+async def test_search_filters_by_session_and_treats_operators_literally(searchable):
+    turns, _, _ = await search_history(searchable, "password", session_id="a")
+    
+    assert [t["user_message"] for t in turns] == ["How do I reset my password?"]
+    assert await search_history(searchable, 'password AND "(') == ([], None, False)
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(searchable):
+    billing = searchable.query(Chat).filter_by(user_message="Billing question").one()
+    billing.bot_response = "Refunds take five days."
+    searchable.delete(searchable.query(Chat).filter_by(session_id="b").one())
+    searchable.commit()
+    
+    assert (await search_history(searchable, "invoices"))[0] == []
+    assert [t["id"] for t in (await search_history(searchable, "refunds"))[0]] == [billing.id]
+    assert len((await search_history(searchable, "password"))[0]) == 1
+
+@pytest.mark.asyncio
+async def test_search_pages_cover_ranked_window_once(db):
+    seen, cursor = [], None
+    while True:
+        turns, cursor, truncated = await search_history(
+            db, "question", limit=4, cursor=cursor, rank_window=10
+        )
+        seen.extend(t["user_message"] for t in turns)
+        assert truncated
+        if cursor is None:
+            break
+    
+    # Only the ten most recent matches are ranked.
+    assert sorted(seen) == sorted(f"question {i}" for i in range(15, 25))
+
+@pytest.mark.asyncio
+async def test_search_without_window_ranks_every_match(db):
+    turns, _, truncated = await search_history(db, "question", limit=100, rank_window=0)
+    
+    assert len(turns) == 25
+    assert not truncated
+    assert not (await search_history(db, "question", limit=100, rank_window=25))[2]
+
+@pytest.mark.asyncio
+async def test_search_requires_full_text_index(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plain.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    
+    with pytest.raises(HistorySearchUnavailableError):
+        await search_history(session, "password")
+    session.close()
+    engine.dispose()
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from src.services.keyword_model import KeywordModel
+
+TEXTS = [
+    "Python programming is amazing for artificial intelligence and machine learning",
+    "the cat sat on the mat and the dog sat on the log",
+    "What is Python? Python is a programming language.",
+    "a",
+]
+
+def legacy_extract(text, top_n):
+    vectorizer = TfidfVectorizer()
+    try:
+        matrix = vectorizer.fit_transform([text])
+    except ValueError:
+        return []
+    scores = zip(matrix.toarray()[0].tolist(), vectorizer.get_feature_names_out())
+    return [term for _, term in sorted(scores, reverse=True)[:top_n]]
+
+def test_uniform_model_matches_per_call_vectorizer():
+    model = KeywordModel.uniform()
+    for text in TEXTS:
+        for top_n in (1, 3, 5, 20):
+            assert model.extract(text, top_n) == legacy_extract(text, top_n)
+
+def test_fitted_idf_downweights_common_terms():
+    corpus = [
+        "what is python", "what is java", "what is rust",
+        "what is the weather", "what is love"
+    ]
+    model = KeywordModel.fit(corpus)
+    
+    assert model.extract("what is kotlin", top_n=1) == ["kotlin"]
+    assert model.extract("what is python", top_n=1) == ["python"]
+
+def test_save_and_load(tmp_path):
+    model = KeywordModel.fit(["python programming", "java programming"])
+    path = str(tmp_path / "keywords.npz")
+    model.save(path)
+    
+    loaded = KeywordModel.load(path)
+    
+    assert loaded.vocabulary == model.vocabulary
+    assert loaded.default_idf == model.default_idf
+    assert loaded.extract("python programming python", 2) == model.extract("python programming python", 2)
+
+def test_concurrent_extraction():
+    model = KeywordModel.fit(TEXTS)
+    expected = [model.extract(text, 3) for text in TEXTS]
+    
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda t: model.extract(t, 3), TEXTS * 50))
+    
+    assert results == expected * 50
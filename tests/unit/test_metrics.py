@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+from src.services.metrics import (
+    Histogram,
+    MetricsRegistry,
+    EVENT_LOOP_LAG_SECONDS,
+    monitor_event_loop_lag
+)
+from src.services.profiler import SamplingProfiler
+
+def test_counter_renders_labelled_series():
+    registry = MetricsRegistry(prefix="test")
+    counter = registry.counter("calls_total", "Calls.", ("provider",))
+    counter.inc("google")
+    counter.inc("google", amount=2)
+    counter.inc('du"ck')
+    text = registry.render()
+    assert "# TYPE test_calls_total counter" in text
+    assert 'test_calls_total{provider="google"} 3' in text
+    assert 'test_calls_total{provider="du\\"ck"} 1' in text
+
+def test_registry_returns_existing_metric_for_same_name():
+    registry = MetricsRegistry(prefix="test")
+    assert registry.counter("a", "A.") is registry.counter("a", "A.")
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "search")
+    lines = list(histogram.samples())
+    assert 'latency_seconds_bucket{stage="search",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="search",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{stage="search",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{stage="search"} 4' in lines
+    assert histogram.snapshot("search")["sum"] == pytest.approx(3.65)
+
+def test_histogram_time_observes_duration():
+    histogram = Histogram("block_seconds", "Block.")
+    with histogram.time():
+        time.sleep(0.01)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 1
+    assert snapshot["sum"] >= 0.01
+
+def test_collectors_expose_numeric_stats():
+    registry = MetricsRegistry(prefix="test")
+    registry.register_collector("cache", lambda: {
+        "hits": 4, "hit_rate": 0.5, "running": True, "path": "/tmp/x", "limits": {}
+    })
+    text = registry.render()
+    assert "test_cache_hits 4" in text
+    assert "test_cache_hit_rate 0.5" in text
+    assert "test_cache_running 1" in text
+    assert "path" not in text and "limits" not in text
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor_sees_blocking():
+    before = EVENT_LOOP_LAG_SECONDS.snapshot()
+    monitor = asyncio.create_task(monitor_event_loop_lag(0.01))
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    monitor.cancel()
+    await asyncio.gather(monitor, return_exceptions=True)
+    after = EVENT_LOOP_LAG_SECONDS.snapshot()
+    assert after["count"] > before["count"]
+    assert after["sum"] - before["sum"] >= 0.05
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+def test_profiler_collects_collapsed_stacks():
+    profiler = SamplingProfiler(interval=0.001, slow_request_seconds=0.05)
+    profiler.start()
+    try:
+        started = time.perf_counter()
+        busy_wait(0.1)
+        profiler.record_request("POST", "/chat/chat", started, time.perf_counter())
+        profiler.record_request("GET", "/health", started, started + 0.001)
+    finally:
+        profiler.stop()
+    assert not profiler.running
+    assert "busy_wait (test_metrics.py:" in profiler.collapsed()
+    slow = profiler.slow_requests()
+    assert [request["path"] for request in slow] == ["/chat/chat"]
+    assert "busy_wait" in slow[0]["stacks"]
@@ -0,0 +1,55 @@
+import asyncio
+
+import nltk
+import pytest
+from src.services.nlp_executor import NLPExecutor, NLPOverloadedError, _init_worker
+
+TEXT = "Python programming is amazing for artificial intelligence and machine learning"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+async def test_run_returns_processor_result(mode):
+    executor = NLPExecutor(mode=mode, workers=1)
+    try:
+        keywords = await executor.run("extract_keywords", TEXT, 3)
+    finally:
+        executor.shutdown()
+    
+    assert len(keywords) == 3
+    assert executor.stats()["completed"] == 1
+    assert executor.stats()["pending"] == 0
+
+@pytest.mark.asyncio
+async def test_rejects_when_saturated():
+    executor = NLPExecutor(mode="thread", workers=1, max_pending=2)
+    try:
+        results = await asyncio.gather(
+            *(executor.run("extract_keywords", TEXT) for _ in range(4)),
+            return_exceptions=True
+        )
+    finally:
+        executor.shutdown()
+    
+    assert sum(isinstance(r, NLPOverloadedError) for r in results) == 2
+    assert executor.stats()["rejected"] == 2
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_counted_separately():
+    executor = NLPExecutor(mode="inline")
+    
+    with pytest.raises(AttributeError):
+        await executor.run("tokenize_text", None)
+    
+    assert executor.stats()["failed"] == 1
+    assert executor.stats()["completed"] == 0
+
+def test_worker_inherits_parent_data_path(monkeypatch):
+    monkeypatch.setattr(nltk.data, "path", ["/usr/share/nltk_data"])
+    
+    _init_worker(["/srv/nltk_data", "/usr/share/nltk_data"])
+    
+    assert nltk.data.path == ["/srv/nltk_data", "/usr/share/nltk_data"]
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        NLPExecutor(mode="gpu")
@@ -1,5 +1,16 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
 import pytest
-from src.services.nlp_service import NLPProcessor
+from src.services.nlp_service import (
+    NLPProcessor,
+    NLTK_RESOURCES,
+    DEFAULT_HUMANIZE_PHRASES,
+    PhraseReplacer,
+    get_nlp_processor,
+    verify_nltk_resources
+)
 
 @pytest.fixture
 def nlp_processor():
@@ -30,4 +41,102 @@ def test_humanize_response(nlp_processor):
     
     assert "additionally" not in result.lower()
     assert "furthermore" not in result.lower()
-    assert "also" in result.lower()
\ No newline at end of file
+    assert "also" in result.lower()
+
+def test_models_load_lazily():
+    processor = NLPProcessor()
+    
+    assert processor._stop_words is None
+    assert processor._tagger is None
+
+def test_shared_processor():
+    assert get_nlp_processor() is get_nlp_processor()
+
+def test_verify_nltk_resources_does_not_download(tmp_path):
+    missing = verify_nltk_resources(str(tmp_path))
+    
+    assert set(missing) <= set(NLTK_RESOURCES)
+    assert list(tmp_path.iterdir()) == []
+
+def test_batch_keywords_match_single_calls(nlp_processor):
+    texts = [
+        "Python programming is amazing for artificial intelligence",
+        "",
+        "the weather today is sunny and the weather tomorrow is rainy",
+    ]
+    
+    assert nlp_processor.format_search_query_batch(texts) == [
+        nlp_processor.format_search_query(text) for text in texts
+    ]
+
+def test_get_context_batch(nlp_processor):
+    texts = ["Hello, this is a test message!", "Python is great. It is popular."]
+    results = nlp_processor.get_context_batch(texts)
+    
+    assert len(results) == 2
+    for text, result in zip(texts, results):
+        single = nlp_processor.get_context(text)
+        assert result["keywords"] == single["keywords"]
+        assert result["pos_tags"] == single["pos_tags"]
+        assert result["sentence_count"] == single["sentence_count"]
+
+def test_repeated_text_hits_analysis_cache(nlp_processor):
+    text = "Cats chase cats. Dogs chase cats."
+    first = nlp_processor.get_context(text)
+    second = nlp_processor.get_context(text)
+    stats = nlp_processor.cache_stats()
+    
+    assert second["keywords"] == first["keywords"]
+    assert second["pos_tags"] == first["pos_tags"]
+    assert "analysis_cache" in second["timings"]
+    assert stats["analysis"]["hits"] >= 1
+    assert stats["lemma"]["hits"] >= 1
+
+def test_cached_results_are_copies(nlp_processor):
+    text = "Cats chase dogs."
+    tokens = {"words": ["cat", "chase", "dog"], "sentences": [text], "original_text": text}
+    context = {"keywords": ["cat"], "pos_tags": [("cat", "NN")], "tokens": tokens, "sentence_count": 1}
+    nlp_processor.analysis_cache.set(nlp_processor._text_key("tokens", text), tokens)
+    nlp_processor.analysis_cache.set(nlp_processor._text_key("context", text), context)
+    
+    nlp_processor.tokenize_text(text)["words"].append("mutated")
+    nlp_processor.get_context(text)["keywords"].clear()
+    nlp_processor.get_context_batch([text])[0]["tokens"]["words"].clear()
+    
+    assert nlp_processor.tokenize_text(text)["words"] == ["cat", "chase", "dog"]
+    assert nlp_processor.get_context(text)["keywords"] == ["cat"]
+    assert nlp_processor.get_context_batch([text])[0]["tokens"]["words"] == ["cat", "chase", "dog"]
+
+def test_phrase_replacer_applies_table_in_order():
+    replacer = PhraseReplacer(DEFAULT_HUMANIZE_PHRASES)
+    
+    assert replacer.replace("thus, in addition, however") == "so, also, but"
+    assert replacer.replace("additionally") == "also"
+    assert PhraseReplacer({"Utilize": "use"}).replace("we utilize it") == "we use it"
+
+def test_custom_phrase_table():
+    processor = NLPProcessor(humanize_phrases={"utilize": "use"})
+    
+    assert processor.phrase_replacer.replace("we utilize thus") == "we use thus"
+
+def test_concurrent_warm_up_loads_once():
+    processor = NLPProcessor(humanize_phrases={})
+    processor._tagger = MagicMock()
+    active = []
+    calls = []
+    
+    def tokenize_text(text):
+        active.append(text)
+        calls.append(len(active))
+        time.sleep(0.01)
+        active.pop()
+    
+    processor.tokenize_text = tokenize_text
+    processor.extract_keywords = MagicMock()
+    threads = [threading.Thread(target=processor.warm_up) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert calls == [1]
@@ -0,0 +1,31 @@
+from src.services.popularity import CountMinSketch, HeavyHitters
+
+def test_count_min_sketch_never_undercounts():
+    sketch = CountMinSketch(width=64, depth=4)
+    for i in range(500):
+        sketch.add(f"key {i % 50}")
+    
+    assert all(sketch.estimate(f"key {i}") >= 10 for i in range(50))
+    assert sketch.estimate("key 0") < 40
+
+def test_heavy_hitters_track_most_frequent_keys():
+    hitters = HeavyHitters(k=3)
+    for key, count in [("a", 5), ("b", 1), ("c", 3), ("d", 4), ("e", 2)]:
+        for _ in range(count):
+            hitters.record(key, payload=key.upper())
+    
+    top = hitters.top()
+    assert [key for key, _, _ in top] == ["a", "d", "c"]
+    assert top[0][2] == "A"
+    assert [key for key, _, _ in hitters.top(min_count=4)] == ["a", "d"]
+
+def test_decay_forgets_cold_keys():
+    hitters = HeavyHitters(k=10)
+    for _ in range(4):
+        hitters.record("hot")
+    hitters.record("cold")
+    
+    hitters.decay()
+    
+    assert hitters.top() == [("hot", 2, None)]
+    assert hitters.sketch.estimate("hot") == 2
@@ -0,0 +1,48 @@
+import pytest
+from src.services.query_normalizer import QueryNormalizer, SimilarityIndex
+
+def test_fold_mode():
+    normalizer = QueryNormalizer("fold")
+    
+    assert normalizer.normalize("  What IS\tPython? ") == "what is python?"
+
+def test_lemma_mode_drops_stopwords():
+    normalizer = QueryNormalizer("lemma")
+    
+    assert normalizer.normalize("What is Python?") == normalizer.normalize("python what is")
+
+def test_sorted_mode_ignores_word_order():
+    normalizer = QueryNormalizer("sorted")
+    
+    assert normalizer.normalize("python programming") == normalizer.normalize("programming in Python")
+
+def test_lemma_mode_falls_back_to_fold_without_nltk_data():
+    class MissingData:
+        def tokenize_text(self, text):
+            raise LookupError("punkt")
+
+    normalizer = QueryNormalizer("lemma", MissingData())
+    
+    assert normalizer.normalize("  What IS Python? ") == "what is python?"
+    assert normalizer.fallbacks == 1
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        QueryNormalizer("stem")
+
+def test_similarity_lookup():
+    index = SimilarityIndex(threshold=0.6)
+    index.add("3:language programming python", "language programming python", 3)
+    index.add("3:java programming", "java programming", 3)
+    
+    assert index.lookup("programming python", 3) == "3:language programming python"
+    assert index.lookup("programming python", 5) is None
+    assert index.lookup("rust", 3) is None
+
+def test_similarity_index_is_bounded():
+    index = SimilarityIndex(max_keys=2)
+    for i in range(5):
+        index.add(f"3:term{i}", f"term{i}", 3)
+    
+    assert len(index) == 2
+    assert index.lookup("term0", 3) is None
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+from src.middleware.rate_limit import (
+    MemoryRateLimitBackend,
+    RateLimiter,
+    RateLimitMiddleware,
+    rate_limiter_from_env
+)
+
+def http_scope(path, client="10.0.0.1", headers=()):
+    return {"type": "http", "path": path, "client": (client, 1234), "headers": list(headers)}
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+async def call(middleware, scope):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    start, body = messages[0], messages[-1]
+    return start["status"], dict(start["headers"]), body["body"]
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_reports_wait():
+    backend = MemoryRateLimitBackend()
+    assert [await backend.acquire("k", 1.0, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = await backend.acquire("k", 1.0, 3)
+    assert 0 < wait <= 1.0
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time():
+    backend = MemoryRateLimitBackend()
+    assert await backend.acquire("k", 50.0, 1) == 0.0
+    assert await backend.acquire("k", 50.0, 1) > 0
+    await asyncio.sleep(0.05)
+    assert await backend.acquire("k", 50.0, 1) == 0.0
+
+@pytest.mark.asyncio
+async def test_backend_forgets_least_recent_keys():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for key in ("a", "b", "c"):
+        await backend.acquire(key, 1.0, 1)
+    assert list(backend._buckets) == ["b", "c"]
+
+@pytest.mark.asyncio
+async def test_exhausted_bucket_returns_429_with_retry_after():
+    limiter = RateLimiter({"/chat": (0.5, 2)})
+    middleware = RateLimitMiddleware(ok_app, limiter)
+    statuses = [(await call(middleware, http_scope("/chat/chat")))[0] for _ in range(2)]
+    status, headers, body = await call(middleware, http_scope("/chat/chat"))
+    assert statuses == [200, 200]
+    assert status == 429
+    assert headers[b"retry-after"] == b"2"
+    assert json.loads(body) == {"detail": "Rate limit exceeded"}
+    assert limiter.stats()["limited"] == 1
+
+@pytest.mark.asyncio
+async def test_groups_and_clients_have_separate_buckets():
+    limiter = RateLimiter({"/chat": (0.1, 1), "/nlp": (0.1, 1)}, api_keys=["secret"])
+    middleware = RateLimitMiddleware(ok_app, limiter)
+    assert (await call(middleware, http_scope("/chat/chat")))[0] == 200
+    assert (await call(middleware, http_scope("/chat/chat")))[0] == 429
+    assert (await call(middleware, http_scope("/nlp/analyze")))[0] == 200
+    assert (await call(middleware, http_scope("/chat/chat", client="10.0.0.2")))[0] == 200
+    keyed = http_scope("/chat/chat", headers=[(b"x-api-key", b"secret")])
+    assert (await call(middleware, keyed))[0] == 200
+    assert (await call(middleware, keyed))[0] == 429
+
+@pytest.mark.asyncio
+async def test_unknown_api_keys_share_the_ip_bucket():
+    limiter = RateLimiter({"/search": (0.1, 20)}, api_keys=["secret"])
+    middleware = RateLimitMiddleware(ok_app, limiter)
+    statuses = [
+        (await call(middleware, http_scope("/search/search", headers=[(b"x-api-key", f"random-{i}".encode())])))[0]
+        for i in range(40)
+    ]
+    assert statuses.count(429) == 20
+    assert len(limiter.backend._buckets) == 1
+
+@pytest.mark.asyncio
+async def test_websocket_messages_are_charged_to_the_bucket():
+    received = []
+
+    async def echo_app(scope, receive, send):
+        await send({"type": "websocket.accept"})
+        while True:
+            message = await receive()
+            received.append(message["type"])
+            if message["type"] == "websocket.disconnect":
+                return
+
+    incoming = [{"type": "websocket.connect"}] + [{"type": "websocket.receive", "text": "hi"}] * 5
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    limiter = RateLimiter({"/chat": (0.1, 3)})
+    scope = dict(http_scope("/chat/ws"), type="websocket")
+    await RateLimitMiddleware(echo_app, limiter)(scope, receive, send)
+    assert received == ["websocket.connect", "websocket.receive", "websocket.receive", "websocket.disconnect"]
+    assert sent[-1] == {"type": "websocket.close", "code": 1008, "reason": "Rate limit exceeded"}
+    assert limiter.active == 0
+
+    sent.clear()
+    await RateLimitMiddleware(echo_app, limiter)(scope, receive, send)
+    assert sent == [{"type": "websocket.close", "code": 1008, "reason": "Rate limit exceeded"}]
+
+@pytest.mark.asyncio
+async def test_unlisted_and_exempt_paths_are_not_limited():
+    limiter = RateLimiter({"/chat": (0.1, 1)}, max_concurrency=0)
+    middleware = RateLimitMiddleware(ok_app, limiter)
+    assert limiter.group("/chatter") is None
+    assert (await call(middleware, http_scope("/health")))[0] == 200
+
+@pytest.mark.asyncio
+async def test_requests_over_concurrency_limit_are_shed():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await ok_app(scope, receive, send)
+
+    limiter = RateLimiter({}, max_concurrency=1)
+    middleware = RateLimitMiddleware(slow_app, limiter)
+    first = asyncio.create_task(call(middleware, http_scope("/search/")))
+    await asyncio.sleep(0)
+    status, headers, _ = await call(middleware, http_scope("/search/"))
+    release.set()
+    assert (await first)[0] == 200
+    assert status == 503
+    assert headers[b"retry-after"] == b"1"
+    assert limiter.stats()["shed"] == 1
+    assert limiter.active == 0
+
+def test_limiter_from_env(monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_CHAT", "1,4")
+    monkeypatch.setenv("MAX_CONCURRENT_REQUESTS", "0")
+    limiter = rate_limiter_from_env()
+    assert limiter.limits["/chat"] == (1.0, 4.0)
+    assert limiter.max_concurrency is None
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "0")
+    assert rate_limiter_from_env() is None
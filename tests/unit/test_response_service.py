@@ -1,5 +1,12 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
 import pytest
+from src.services.answer_index import AnswerIndex
+from src.services.nlp_executor import NLPExecutor
 from src.services.response_service import ResponseGenerator
+from src.services.search_providers import SearchResult
 
 @pytest.fixture
 def response_generator():
@@ -14,4 +21,193 @@ async def test_generate_response(response_generator):
     assert "context" in result
     assert "sources" in result
     assert isinstance(result["sources"], list)
-    assert isinstance(result["response"], str)
\ No newline at end of file
+    assert isinstance(result["response"], str)
+
+class StubSearchService:
+    def __init__(self, results):
+        self.results = results
+
+    async def stream_search_results(self, query, num_results=5):
+        for result in self.results[:num_results]:
+            yield result
+
+@pytest.mark.asyncio
+async def test_stream_response_emits_events_in_order(monkeypatch):
+    processor = MagicMock()
+    processor.get_context.return_value = {"keywords": ["python"]}
+    processor.humanize_response.return_value = "First point. Well, second point. Last point."
+    monkeypatch.setattr("src.services.nlp_executor.get_nlp_processor", lambda: processor)
+    executor = NLPExecutor(mode="inline")
+    search = StubSearchService([
+        SearchResult("A", "http://a.test", "a", "stub"),
+        SearchResult("B", "http://b.test", "b", "stub"),
+    ])
+    generator = ResponseGenerator(
+        nlp_processor=processor, search_service=search, nlp_executor=executor
+    )
+    
+    events = [event async for event in generator.stream_response("python")]
+    
+    assert [e["event"] for e in events] == [
+        "context", "source", "source", "chunk", "chunk", "chunk", "done"
+    ]
+    assert events[0]["data"] == {"keywords": ["python"]}
+    assert [e["data"] for e in events[3:6]] == ["First point.", "Well, second point.", "Last point."]
+    assert events[-1]["data"]["response"] == "First point. Well, second point. Last point."
+    assert events[-1]["data"]["sources"] == [
+        {"title": "A", "link": "http://a.test"},
+        {"title": "B", "link": "http://b.test"},
+    ]
+
+class SlowSearchService:
+    def __init__(self, delay, results):
+        self.delay = delay
+        self.results = results
+
+    async def aggregate_search_results(self, query, num_results=5):
+        await asyncio.sleep(self.delay)
+        return self.results[:num_results]
+
+def _slow_processor(delay):
+    processor = MagicMock()
+    processor.get_context.side_effect = lambda text: time.sleep(delay) or {"keywords": [text]}
+    processor.humanize_response.side_effect = lambda text: text.strip().capitalize()
+    return processor
+
+SOURCES = [SearchResult("A", "http://a.test", "python is great", "stub")]
+
+@pytest.mark.asyncio
+async def test_generate_response_overlaps_nlp_and_search(monkeypatch):
+    processor = _slow_processor(0.2)
+    monkeypatch.setattr("src.services.nlp_executor.get_nlp_processor", lambda: processor)
+    generator = ResponseGenerator(
+        nlp_processor=processor,
+        search_service=SlowSearchService(0.2, SOURCES),
+        nlp_executor=NLPExecutor(mode="thread", workers=1)
+    )
+    
+    start = time.perf_counter()
+    result = await generator.generate_response("python")
+    elapsed = time.perf_counter() - start
+    
+    assert elapsed < 0.35
+    assert result["context"] == {"keywords": ["python"]}
+    assert result["response"] == "Python is great"
+    assert result["metadata"]["partial"] == []
+    assert set(result["metadata"]["timings"]) == {"search", "context", "humanize", "total"}
+    generator.nlp_executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_generate_response_returns_partial_results_on_stage_timeout(monkeypatch):
+    processor = _slow_processor(0.5)
+    monkeypatch.setattr("src.services.nlp_executor.get_nlp_processor", lambda: processor)
+    generator = ResponseGenerator(
+        nlp_processor=processor,
+        search_service=SlowSearchService(0.01, SOURCES),
+        nlp_executor=NLPExecutor(mode="thread", workers=2)
+    )
+    generator.context_timeout = 0.1
+    
+    start = time.perf_counter()
+    result = await generator.generate_response("python")
+    
+    assert time.perf_counter() - start < 0.4
+    assert result["context"] is None
+    assert result["sources"] == [{"title": "A", "link": "http://a.test"}]
+    assert result["metadata"]["partial"] == ["context"]
+    generator.nlp_executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_generate_response_skips_search_when_budget_runs_out(monkeypatch):
+    processor = _slow_processor(0.0)
+    monkeypatch.setattr("src.services.nlp_executor.get_nlp_processor", lambda: processor)
+    generator = ResponseGenerator(
+        nlp_processor=processor,
+        search_service=SlowSearchService(1.0, SOURCES),
+        nlp_executor=NLPExecutor(mode="inline")
+    )
+    generator.response_budget = 0.1
+    
+    result = await generator.generate_response("python")
+    
+    assert result["context"] == {"keywords": ["python"]}
+    assert result["sources"] == []
+    assert result["metadata"]["partial"] == ["search"]
+
+def test_follow_up_queries_include_previous_message():
+    generator = ResponseGenerator(
+        nlp_processor=MagicMock(), search_service=MagicMock(), nlp_executor=MagicMock()
+    )
+    history = [{"user_message": "What is Python?", "bot_response": "A language."}]
+    
+    assert generator.search_query("and Java?", history) == "and Java?"
+    
+    generator.follow_up_max_words = 3
+    assert generator.search_query("and Java?", history) == "What is Python? and Java?"
+    assert generator.search_query("who created it?", history) == "What is Python? who created it?"
+    assert generator.search_query("Java...", history) == "What is Python? Java..."
+    assert generator.search_query("Rust ownership rules", history) == "Rust ownership rules"
+    assert generator.search_query("Kubernetes", history) == "Kubernetes"
+    assert generator.search_query("and what about its history?", history) == (
+        "and what about its history?"
+    )
+    assert generator.search_query("and Java?") == "and Java?"
+
+@pytest.mark.asyncio
+async def test_repeat_question_is_answered_from_index():
+    index = AnswerIndex(n_features=2 ** 12, tokenizer=lambda text: text.lower().split())
+    index.add("what is python", "Python is a language.")
+    search = MagicMock()
+    search.aggregate_search_results.side_effect = AssertionError("search should be skipped")
+    generator = ResponseGenerator(
+        nlp_processor=MagicMock(),
+        search_service=search,
+        nlp_executor=MagicMock(),
+        answer_index=index
+    )
+    
+    result = await generator.generate_response("What is Python")
+    
+    assert result["response"] == "Python is a language."
+    assert result["metadata"]["local_answer"]["question"] == "what is python"
+    assert index.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_stream_response_answers_from_index_and_adds_new_answers(monkeypatch):
+    processor = MagicMock()
+    processor.get_context.return_value = {"keywords": ["python"]}
+    processor.humanize_response.return_value = "Python is a language. It is popular."
+    monkeypatch.setattr("src.services.nlp_executor.get_nlp_processor", lambda: processor)
+    index = AnswerIndex(n_features=2 ** 12, tokenizer=lambda text: text.lower().split())
+    generator = ResponseGenerator(
+        nlp_processor=processor,
+        search_service=StubSearchService([SearchResult("A", "http://a.test", "a", "stub")]),
+        nlp_executor=NLPExecutor(mode="inline"),
+        answer_index=index
+    )
+    
+    first = [event async for event in generator.stream_response("what is python")]
+    generator.search_service = StubSearchService([])
+    repeat = [event async for event in generator.stream_response("What is Python")]
+    
+    assert first[-1]["data"]["sources"] == [{"title": "A", "link": "http://a.test"}]
+    assert [e["event"] for e in repeat] == ["context", "chunk", "chunk", "done"]
+    assert repeat[-1]["data"] == {"response": "Python is a language. It is popular.", "sources": []}
+    assert processor.get_context.call_count == 1
+
+@pytest.mark.asyncio
+async def test_expired_answers_are_not_served():
+    index = AnswerIndex(n_features=2 ** 12, tokenizer=lambda text: text.lower().split())
+    index.add("what is python", "Python is a language.", added_at=time.time() - 3600)
+    search = MagicMock()
+    search.aggregate_search_results.side_effect = AssertionError("search called")
+    generator = ResponseGenerator(
+        nlp_processor=MagicMock(),
+        search_service=search,
+        nlp_executor=MagicMock(),
+        answer_index=index
+    )
+    generator.answer_max_age = 60
+    
+    with pytest.raises(AssertionError, match="search called"):
+        await generator.generate_response("What is Python")
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from src.services.cache import SearchCache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.popularity import HeavyHitters
+from src.services.query_normalizer import QueryNormalizer
+from src.services.search_providers import ProviderBudget, SearchProvider, SearchResult
+from src.services.search_refresh import SearchRefresher, load_warm_up_queries
+from src.services.search_service import SearchService
+
+class CountingProvider(SearchProvider):
+    def __init__(self, name):
+        self.name = name
+        super().__init__(None, "http://stub.test", CircuitBreaker(name))
+        self.calls = 0
+
+    async def search(self, query, num_results):
+        self.calls += 1
+        return [SearchResult(query, f"http://{self.name}.test/{self.calls}", query, self.name)]
+
+def make_service(*providers, ttl=3600):
+    return SearchService(
+        cache=SearchCache(ttl=ttl, stale_ttl=60),
+        normalizer=QueryNormalizer("fold"),
+        providers=providers,
+        popularity=HeavyHitters(k=10)
+    )
+
+def test_budget_refills_over_time():
+    budget = ProviderBudget(rate=0, burst=1)
+    
+    assert budget.available("google")
+    budget.spend("google")
+    assert not budget.available("google")
+    assert budget.available("duckduckgo")
+    assert budget.wait_time(["google"]) == float("inf")
+
+@pytest.mark.asyncio
+async def test_search_skips_provider_without_budget():
+    primary, secondary = CountingProvider("primary"), CountingProvider("secondary")
+    service = make_service(primary, secondary)
+    service.strategy = "sequential"
+    budget = ProviderBudget(rate=0, burst=1)
+    budget.spend("primary")
+    
+    results = await service.search("query", num_results=1, budget=budget)
+    
+    assert [r.source for r in results] == ["secondary"]
+    assert primary.calls == 0
+    assert budget.spent == {"primary": 1, "secondary": 1}
+
+@pytest.mark.asyncio
+async def test_popular_key_is_refreshed_before_expiry():
+    provider = CountingProvider("stub")
+    service = make_service(provider, ttl=30)
+    for _ in range(3):
+        await service.aggregate_search_results("hot query", num_results=1)
+    await service.aggregate_search_results("cold query", num_results=1)
+    refresher = SearchRefresher(
+        service, ProviderBudget(rate=1, burst=5), interval=60, refresh_ahead=60, min_hits=3
+    )
+    
+    assert await refresher.refresh_once() == 1
+    
+    assert provider.calls == 3
+    assert service.cache.get("1:hot query")[0].link == "http://stub.test/3"
+    assert refresher.stats()["upstream_calls"] == {"stub": 1}
+
+@pytest.mark.asyncio
+async def test_refresh_stops_when_budget_is_spent():
+    provider = CountingProvider("stub")
+    service = make_service(provider, ttl=30)
+    for query in ("first", "second"):
+        for _ in range(3):
+            await service.aggregate_search_results(query, num_results=1)
+    refresher = SearchRefresher(
+        service, ProviderBudget(rate=0.001, burst=1), refresh_ahead=60, min_hits=3
+    )
+    
+    assert await refresher.refresh_once() == 1
+    
+    assert provider.calls == 3
+    assert refresher.stats()["budget_skips"] == 1
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_cache_without_counting_popularity():
+    provider = CountingProvider("stub")
+    service = make_service(provider)
+    refresher = SearchRefresher(service, ProviderBudget(rate=10, burst=10))
+    
+    assert await refresher.warm_up(["python", "java", "python"], num_results=3) == 2
+    
+    assert provider.calls == 2
+    assert service.cache.get("3:java", count=False) is not None
+    assert len(service.popularity) == 0
+
+@pytest.mark.asyncio
+async def test_warm_up_stops_when_budget_never_refills():
+    provider = CountingProvider("stub")
+    service = make_service(provider)
+    refresher = SearchRefresher(service, ProviderBudget(rate=0, burst=2))
+    
+    warmed = await asyncio.wait_for(refresher.warm_up(["a", "b", "c", "d"], num_results=3), timeout=1)
+    
+    assert warmed == 2
+    assert provider.calls == 2
+
+def test_load_warm_up_queries(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("# popular\npython tutorial\n\n  fastapi  \n", encoding="utf-8")
+    
+    assert load_warm_up_queries(str(path)) == ["python tutorial", "fastapi"]
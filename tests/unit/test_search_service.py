@@ -1,4 +1,13 @@
+import asyncio
+import time
+
+import httpx
 import pytest
+from src.services.cache import SearchCache
+from src.services.circuit_breaker import CircuitBreaker
+from src.services.disk_cache import DiskCache
+from src.services.query_normalizer import QueryNormalizer, SimilarityIndex
+from src.services.search_providers import SearchProvider, SearchProviderError, SearchResult
 from src.services.search_service import SearchService
 
 @pytest.fixture
@@ -7,21 +16,286 @@ def search_service():
 
 @pytest.mark.asyncio
 async def test_search_fallback(search_service):
-    results = search_service.search_fallback("python programming")
+    results = await search_service.search_fallback("python programming")
     
     assert isinstance(results, list)
     for result in results:
-        assert "title" in result
-        assert "link" in result
-        assert "snippet" in result
-        assert "source" in result
+        assert isinstance(result, SearchResult)
 
 @pytest.mark.asyncio
 async def test_cache_mechanism(search_service):
     query = "test query"
-    test_results = [{"title": "Test", "link": "http://test.com", "snippet": "Test"}]
+    test_results = [SearchResult("Test", "http://test.com", "Test", "google")]
     
     search_service.cache_results(query, test_results)
     cached = search_service.get_cached_results(query)
     
-    assert cached == test_results
\ No newline at end of file
+    assert cached == test_results
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_overlap(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "key")
+    monkeypatch.setenv("GOOGLE_CX", "cx")
+
+    async def slow_upstream(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, json={"items": [
+            {"title": "Stub", "link": "http://stub.test", "snippet": request.url.params["q"]}
+        ]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(slow_upstream)) as client:
+        service = SearchService(http_client=client)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            service.search_google(f"query {i}") for i in range(10)
+        ))
+        elapsed = time.perf_counter() - start
+
+    assert [r[0].snippet for r in results] == [f"query {i}" for i in range(10)]
+    assert elapsed < 1.0
+
+@pytest.mark.asyncio
+async def test_disk_cache_serves_results_after_restart(tmp_path):
+    path = str(tmp_path / "search_cache.db")
+    results = [SearchResult("Test", "http://test.com", "Test", "google")]
+    normalizer = QueryNormalizer("fold")
+    SearchService(
+        cache=SearchCache(), disk_cache=DiskCache(path), normalizer=normalizer
+    ).cache_results("Test  Query", results, 3)
+    
+    restarted = SearchService(cache=SearchCache(), disk_cache=DiskCache(path), normalizer=normalizer)
+    
+    assert await restarted.aggregate_search_results("test query", num_results=3) == results
+    assert restarted.get_cached_results("test query", 5) is None
+
+@pytest.mark.asyncio
+async def test_similar_query_reuses_cached_results():
+    results = [SearchResult("Python", "http://python.org", "Python", "google")]
+    service = SearchService(
+        cache=SearchCache(),
+        normalizer=QueryNormalizer("sorted"),
+        similarity_index=SimilarityIndex(threshold=0.7)
+    )
+    service.cache_results("python programming language tutorial", results, 3)
+
+    async def fail_upstream(query, num_results=5):
+        raise AssertionError("upstream should not be called")
+
+    service.search = fail_upstream
+    
+    assert await service.aggregate_search_results("Python programming tutorials", 3) == results
+    assert service.similar_hits == 1
+
+class StubProvider(SearchProvider):
+    def __init__(self, name, links, delay=0.0, fail=False, breaker=None):
+        self.name = name
+        super().__init__(None, "http://stub.test", breaker or CircuitBreaker(name))
+        self.links = links
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    async def search(self, query, num_results):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise SearchProviderError("stub failure")
+        return [SearchResult(link, link, link, self.name) for link in self.links[:num_results]]
+
+@pytest.mark.asyncio
+async def test_parallel_returns_first_sufficient_provider():
+    fast = StubProvider("fast", ["http://a.test", "http://b.test"], delay=0.01)
+    slow = StubProvider("slow", ["http://c.test"], delay=1.0)
+    service = SearchService(providers=[slow, fast])
+    service.strategy = "parallel"
+    
+    start = time.perf_counter()
+    results = await service.search("query", num_results=2)
+    
+    assert [r.link for r in results] == ["http://a.test", "http://b.test"]
+    assert time.perf_counter() - start < 0.5
+    assert slow.cancelled
+
+@pytest.mark.asyncio
+async def test_hedged_request_beats_slow_primary():
+    primary = StubProvider("primary", ["http://a.test"], delay=1.0)
+    secondary = StubProvider("secondary", ["http://b.test"], delay=0.01)
+    service = SearchService(providers=[primary, secondary])
+    service.strategy = "hedged"
+    service.hedge_delay = 0.05
+    
+    start = time.perf_counter()
+    results = await service.search("query", num_results=1)
+    
+    assert [r.source for r in results] == ["secondary"]
+    assert time.perf_counter() - start < 0.5
+    assert primary.cancelled
+
+@pytest.mark.asyncio
+async def test_sequential_falls_back_on_failure():
+    primary = StubProvider("primary", [], fail=True)
+    secondary = StubProvider("secondary", ["http://b.test"])
+    service = SearchService(providers=[primary, secondary])
+    service.strategy = "sequential"
+    
+    results = await service.search("query", num_results=1)
+    
+    assert [r.source for r in results] == ["secondary"]
+
+@pytest.mark.asyncio
+async def test_results_are_deduplicated_and_merged_by_rank():
+    first = StubProvider("first", ["https://www.a.test/", "http://b.test"])
+    second = StubProvider("second", ["http://a.test", "http://c.test"])
+    service = SearchService(providers=[first, second])
+    service.strategy = "parallel"
+    
+    results = await service.search("query", num_results=5)
+    
+    assert [r.link for r in results] == ["https://www.a.test/", "http://b.test", "http://c.test"]
+
+@pytest.mark.asyncio
+async def test_open_breaker_skips_provider():
+    breaker = CircuitBreaker("primary", min_calls=2, open_seconds=60)
+    primary = StubProvider("primary", [], delay=1.0, fail=True, breaker=breaker)
+    secondary = StubProvider("secondary", ["http://b.test"])
+    service = SearchService(providers=[primary, secondary])
+    service.strategy = "sequential"
+    breaker.record_failure()
+    breaker.record_failure()
+    
+    start = time.perf_counter()
+    results = await service.search("query", num_results=1)
+    
+    assert [r.source for r in results] == ["secondary"]
+    assert time.perf_counter() - start < 0.5
+    assert service.provider_status()[0]["breaker"]["state"] == "open"
+
+class BrokenProvider(StubProvider):
+    async def search(self, query, num_results):
+        raise AttributeError("'list' object has no attribute 'get'")
+
+@pytest.mark.asyncio
+async def test_unexpected_provider_error_fails_half_open_probe_and_falls_back():
+    breaker = CircuitBreaker("primary", min_calls=1, open_seconds=0.05)
+    primary = BrokenProvider("primary", [], breaker=breaker)
+    secondary = StubProvider("secondary", ["http://b.test"])
+    service = SearchService(providers=[primary, secondary])
+    service.strategy = "sequential"
+    breaker.record_failure()
+    await asyncio.sleep(0.06)
+    assert breaker.state == "half_open"
+    
+    results = await service.search("query", num_results=1)
+    
+    assert [r.source for r in results] == ["secondary"]
+    assert breaker.state == "open"
+
+@pytest.mark.asyncio
+async def test_timeout_adapts_to_observed_latency():
+    provider = StubProvider("adaptive", ["http://a.test"])
+    service = SearchService(providers=[provider])
+    
+    assert service.provider_timeout(provider) == service.request_timeout
+    for _ in range(service.hedge_min_samples):
+        provider.latency.record(1.5)
+    
+    assert service.provider_timeout(provider) == pytest.approx(1.5 * service.timeout_multiplier)
+
+@pytest.mark.asyncio
+async def test_slow_provider_times_out_and_records_failure():
+    breaker = CircuitBreaker("slow")
+    provider = StubProvider("slow", ["http://a.test"], delay=1.0, breaker=breaker)
+    service = SearchService(providers=[provider])
+    service.request_timeout = 0.05
+    
+    assert await service.search("query", num_results=1) == []
+    assert breaker.snapshot()["error_rate"] == 1.0
+
+@pytest.mark.asyncio
+async def test_stream_yields_each_provider_as_it_completes():
+    fast = StubProvider("fast", ["http://a.test"], delay=0.01)
+    slow = StubProvider("slow", ["https://www.a.test/", "http://b.test"], delay=0.2)
+    service = SearchService(
+        cache=SearchCache(), normalizer=QueryNormalizer("fold"), providers=[slow, fast]
+    )
+    service.strategy = "parallel"
+    
+    start = time.perf_counter()
+    arrivals = []
+    async for result in service.stream_search_results("query", num_results=2):
+        arrivals.append((result.link, time.perf_counter() - start))
+    
+    assert [link for link, _ in arrivals] == ["http://a.test", "http://b.test"]
+    assert arrivals[0][1] < 0.15
+    assert service.get_cached_results("query", num_results=2) is not None
+
+@pytest.mark.asyncio
+async def test_stream_serves_cached_results():
+    provider = StubProvider("only", ["http://a.test"])
+    service = SearchService(
+        cache=SearchCache(), normalizer=QueryNormalizer("fold"), providers=[provider]
+    )
+    cached = [SearchResult("t", "http://cached.test", "s", "x")]
+    service.cache_results("query", cached, num_results=1)
+    
+    results = [r async for r in service.stream_search_results("query", num_results=1)]
+    
+    assert results == cached
+
+class CountingProvider(StubProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def search(self, query, num_results):
+        self.calls += 1
+        return await super().search(query, num_results)
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_and_searches_share_one_fetch():
+    provider = CountingProvider("only", ["http://a.test", "http://b.test"], delay=0.05)
+    service = SearchService(
+        cache=SearchCache(), normalizer=QueryNormalizer("fold"), providers=[provider]
+    )
+
+    async def stream():
+        return [r.link async for r in service.stream_search_results("query", num_results=2)]
+
+    async def search():
+        return [r.link for r in await service.aggregate_search_results("query", num_results=2)]
+
+    results = await asyncio.gather(stream(), stream(), search(), search())
+    
+    assert results == [["http://a.test", "http://b.test"]] * 4
+    assert provider.calls == 1
+    assert service.cache.stats()["coalesced"] == 3
+    assert service.cache.stats()["inflight"] == 0
+
+@pytest.mark.asyncio
+async def test_closed_stream_lets_waiters_fetch_on_their_own():
+    provider = CountingProvider("only", ["http://a.test", "http://b.test"], delay=0.05)
+    service = SearchService(
+        cache=SearchCache(), normalizer=QueryNormalizer("fold"), providers=[provider]
+    )
+    stream = service.stream_search_results("query", num_results=2)
+    first = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(service.aggregate_search_results("query", num_results=2))
+    await first
+    await stream.aclose()
+    
+    assert [r.link for r in await waiter] == ["http://a.test", "http://b.test"]
+    assert provider.calls == 2
+
+def test_search_result_is_compact_and_interns_source():
+    decoded = SearchResult.from_dict({
+        "title": "t", "link": "http://a.test", "snippet": "s", "source": "".join(["goo", "gle"])
+    })
+    
+    assert decoded == SearchResult("t", "http://a.test", "s", "google")
+    assert decoded.source is SearchResult("x", "y", "z", "google").source
+    assert not hasattr(decoded, "__dict__")
+    assert SearchResult.from_dict(decoded.to_dict()) == decoded